@@ -1,53 +1,42 @@
+from collections import namedtuple
 from database import Database
 from datetime import datetime
 
 
+# Правило достижения: название, счётчик из Database.get_entry_counters() и порог
+AchievementRule = namedtuple('AchievementRule', ['name', 'counter', 'threshold'])
+
+ACHIEVEMENT_RULES = [
+    AchievementRule("Первый шаг", 'entries', 1),
+    AchievementRule("Командный игрок", 'coauthored', 3),
+    AchievementRule("Разносторонний", 'distinct_types', 3),
+    AchievementRule("Подготовленный год", 'entries_this_year', 3),
+    AchievementRule("Словобог", 'description_length', 5000),
+]
+
+
 class AchievementTracker:
-    def __init__(self, db):
+    def __init__(self, db, rules=None):
         self.db = db
+        self.rules = rules if rules is not None else ACHIEVEMENT_RULES
 
     def check_achievements(self):
-        """Проверка всех достижений"""
+        """Проверка всех достижений по счётчикам, которые БД ведёт инкрементально"""
         new_achievements = []
 
-        # Проверка "Первый шаг"
-        if not self.db.get_achievement_status("Первый шаг"):
-            entries = self.db.get_all_entries()
-            if len(entries) >= 1:
-                if self.db.unlock_achievement("Первый шаг"):
-                    new_achievements.append("Первый шаг")
-
-        # Проверка "Командный игрок"
-        if not self.db.get_achievement_status("Командный игрок"):
-            team_entries = self.db.count_entries_with_authors()
-            if team_entries >= 3:
-                if self.db.unlock_achievement("Командный игрок"):
-                    new_achievements.append("Командный игрок")
-
-        # Проверка "Разносторонний"
-        if not self.db.get_achievement_status("Разносторонний"):
-            types_count = self.db.get_entry_types_count()
-            if types_count >= 3:
-                if self.db.unlock_achievement("Разносторонний"):
-                    new_achievements.append("Разносторонний")
-
-        # Проверка "Подготовленный год"
-        if not self.db.get_achievement_status("Подготовленный год"):
-            current_year = datetime.now().year
-            entries_this_year = self.db.get_entries_by_year(current_year)
-            if entries_this_year >= 3:
-                if self.db.unlock_achievement("Подготовленный год"):
-                    new_achievements.append("Подготовленный год")
-
-        # Проверка "Словобог"
-        if not self.db.get_achievement_status("Словобог"):
-            total_length = self.db.get_total_description_length()
-            if total_length >= 5000:
-                if self.db.unlock_achievement("Словобог"):
-                    new_achievements.append("Словобог")
+        unlocked = self.db.get_unlocked_achievements()
+        pending = [rule for rule in self.rules if rule.name not in unlocked]
+        if not pending:
+            return new_achievements
+
+        counters = self.db.get_entry_counters(datetime.now().year)
+        for rule in pending:
+            if counters[rule.counter] >= rule.threshold:
+                if self.db.unlock_achievement(rule.name):
+                    new_achievements.append(rule.name)
 
         return new_achievements
 
     def get_all_achievements(self):
         """Получение всех достижений"""
-        return self.db.get_achievements()
\ No newline at end of file
+        return self.db.get_achievements()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк экспорта в Word: пиковая память (tracemalloc) и время
+для разного числа записей.
+
+Запуск: python benchmarks/bench_export.py [--sizes 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from export import ReportExporter
+
+
+def fill_db(db, count):
+    """Заполнение базы синтетическими записями"""
+    rnd = random.Random(42)
+    types = ['Проект', 'Публикация', 'Конференция', 'Практика', 'Грант']
+    db.import_entries(
+        (f"Запись {i}", rnd.choice(types), f"20{rnd.randint(18, 25)}-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}",
+         "Описание работы. " * rnd.randint(1, 20), "Иванов, Петров" if i % 3 == 0 else "",
+         [f"ключ{rnd.randint(0, 300)}" for _ in range(3)], [("Анализ данных", rnd.randint(1, 5))])
+        for i in range(count)
+    )
+
+
+def measure(func):
+    """Время выполнения и пиковая память Python-объектов"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'записей':>10}{'чтение списком, МБ':>22}{'чтение курсором, МБ':>22}{'экспорт, с':>14}{'экспорт, МБ':>14}")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "portfolio.db"))
+            fill_db(db, count)
+
+            _, list_peak = measure(db.get_all_entries_with_keywords)
+            _, cursor_peak = measure(lambda: sum(1 for _ in db.iter_entries_with_keywords()))
+            export_time, export_peak = measure(
+                lambda: ReportExporter(db).export_to_word(os.path.join(tmp, "отчет.docx")))
+
+            print(f"{count:>10}{list_peak:>22.1f}{cursor_peak:>22.1f}{export_time:>14.1f}{export_peak:>14.1f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
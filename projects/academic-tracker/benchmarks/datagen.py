@@ -0,0 +1,38 @@
+"""
+Генератор синтетической базы портфолио: записи с ключевыми словами,
+компетенциями, соавторами и цели
+"""
+import random
+
+ENTRY_TYPES = ['Проект', 'Публикация', 'Конференция', 'Практика', 'Грант', 'Курс']
+COMPETENCIES = ['Анализ данных', 'Программирование', 'Базы данных', 'Публичные выступления',
+                'Научное письмо', 'Работа в команде', 'Управление проектами', 'Статистика']
+WORDS = ['исследование', 'модель', 'данные', 'система', 'анализ', 'метод', 'алгоритм', 'эксперимент',
+         'оптимизация', 'сеть', 'обучение', 'прогноз', 'интерфейс', 'платформа', 'архитектура']
+
+
+def generate_entries(count, seed=42, keywords=None, people=None):
+    """Кортежи записей для Database.import_entries
+
+    keywords и people - размеры словарей ключевых слов и соавторов (по умолчанию от count)
+    """
+    rnd = random.Random(seed)
+    keywords = keywords or max(50, count // 20)
+    people = people or max(20, count // 50)
+    for i in range(count):
+        title = f"{rnd.choice(WORDS).capitalize()} {rnd.choice(WORDS)} {i}"
+        date = f"{rnd.randint(2015, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+        description = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 80)))
+        authors = ', '.join(f"Автор {rnd.randint(1, people)}" for _ in range(rnd.randint(0, 3)))
+        entry_keywords = list(dict.fromkeys(f"ключ{rnd.randint(1, keywords)}" for _ in range(rnd.randint(0, 5))))
+        entry_competencies = [(name, rnd.randint(1, 5))
+                              for name in rnd.sample(COMPETENCIES, rnd.randint(0, 3))]
+        yield (title, rnd.choice(ENTRY_TYPES), date, description, authors, entry_keywords, entry_competencies)
+
+
+def fill_db(db, entries, seed=42, goals=20):
+    """Заполнение базы: записи одним импортом и цели"""
+    db.import_entries(generate_entries(entries, seed))
+    rnd = random.Random(seed)
+    for i in range(goals):
+        db.add_goal(rnd.choice(ENTRY_TYPES), f"Цель {i}", rnd.randint(1, 50))
@@ -0,0 +1,102 @@
+"""
+Бенчмарки публичных методов Database на синтетической базе
+"""
+import itertools
+
+import pytest
+
+from database import Database
+from datagen import generate_entries, fill_db
+
+
+def _filled_db(request, tmp_path_factory, name):
+    db = Database(str(tmp_path_factory.mktemp(name) / "portfolio.db"))
+    fill_db(db, request.config.getoption('--bench-size'))
+    request.addfinalizer(db.close)
+    return db
+
+
+@pytest.fixture(scope='session')
+def read_db(request, tmp_path_factory):
+    return _filled_db(request, tmp_path_factory, 'read')
+
+
+@pytest.fixture(scope='session')
+def write_db(request, tmp_path_factory):
+    return _filled_db(request, tmp_path_factory, 'write')
+
+
+READS = {
+    'get_all_entries': lambda db: db.get_all_entries(),
+    'get_all_entries_with_keywords': lambda db: db.get_all_entries_with_keywords(),
+    'iter_entries_with_keywords': lambda db: sum(1 for _ in db.iter_entries_with_keywords()),
+    'get_entries_page': lambda db: db.get_entries_page(limit=200),
+    'get_entries_page_after': lambda db: db.get_entries_page(after=('2020-06-15', 1 << 62), limit=200),
+    'search_entries': lambda db: db.search_entries("модель данные", limit=100),
+    'search_entries_prefix': lambda db: db.search_entries("алгор", limit=100),
+    'search_entries_by_author': lambda db: db.search_entries_by_author("Автор 1", limit=100),
+    'get_all_keywords': lambda db: db.get_all_keywords(),
+    'get_keywords_statistics': lambda db: db.get_keywords_statistics(),
+    'get_authors_statistics': lambda db: db.get_authors_statistics(),
+    'get_coauthors': lambda db: db.get_coauthors("Автор 1"),
+    'get_coauthorship_graph': lambda db: db.get_coauthorship_graph(min_shared=2),
+    'count_entries_with_authors': lambda db: db.count_entries_with_authors(),
+    'get_achievements': lambda db: db.get_achievements(),
+    'get_unlocked_achievements': lambda db: db.get_unlocked_achievements(),
+    'get_achievement_status': lambda db: db.get_achievement_status("Первая запись"),
+    'get_entry_counters': lambda db: db.get_entry_counters(2024),
+    'get_total_description_length': lambda db: db.get_total_description_length(),
+    'get_entry_types_count': lambda db: db.get_entry_types_count(),
+    'get_entries_by_year': lambda db: db.get_entries_by_year(2024),
+    'get_competencies_statistics': lambda db: db.get_competencies_statistics(),
+    'get_recommendations': lambda db: db.get_recommendations(),
+    'get_goals': lambda db: db.get_goals(),
+    'get_schema_version': lambda db: db.get_schema_version(),
+    'verify_statistics': lambda db: db.verify_statistics(repair=False),
+    'parse_authors': lambda db: Database.parse_authors("Иванов, Петров; Сидоров, Иванов"),
+}
+
+
+@pytest.mark.benchmark(group='чтение')
+@pytest.mark.parametrize('name', READS)
+def test_read(benchmark, read_db, name):
+    benchmark(READS[name], read_db)
+
+
+@pytest.mark.benchmark(group='запись')
+class TestWrites:
+    def test_add_entry(self, benchmark, write_db):
+        benchmark(write_db.add_entry, "Статья", "Публикация", "2024-03-01", "Описание", "Иванов, Петров")
+
+    def test_add_entry_full(self, benchmark, write_db):
+        benchmark(write_db.add_entry_full, ("Статья", "Публикация", "2024-03-01", "Описание", "Иванов"),
+                  ["SQL", "Python"], [("Базы данных", 4)])
+
+    def test_import_entries_100(self, benchmark, write_db):
+        seeds = itertools.count(1000)
+        benchmark.pedantic(lambda: write_db.import_entries(generate_entries(100, next(seeds))),
+                           rounds=20, iterations=1)
+
+    def test_delete_entry(self, benchmark, write_db):
+        def setup():
+            entry_id = write_db.add_entry_full(("Удаляемая", "Проект", "2024-01-01", "", "Иванов"),
+                                               ["ключ1"], [("Статистика", 3)])
+            return (entry_id,), {}
+        benchmark.pedantic(write_db.delete_entry, setup=setup, rounds=100)
+
+    def test_add_keyword_to_entry(self, benchmark, write_db):
+        keywords = (f"новый{i}" for i in itertools.count())
+        benchmark(lambda: write_db.add_keyword_to_entry(1, next(keywords)))
+
+    def test_add_competency_to_entry(self, benchmark, write_db):
+        benchmark(write_db.add_competency_to_entry, 1, "Статистика", 4)
+
+    def test_unlock_achievement(self, benchmark, write_db):
+        benchmark(write_db.unlock_achievement, "Первая запись")
+
+    def test_add_goal(self, benchmark, write_db):
+        benchmark(write_db.add_goal, "Проект", "Цель", 10)
+
+    def test_update_goal_progress(self, benchmark, write_db):
+        progress = itertools.count()
+        benchmark(lambda: write_db.update_goal_progress(1, next(progress) % 50))
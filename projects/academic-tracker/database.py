@@ -1,14 +1,208 @@
 import sqlite3
 import json
+import re
+from contextlib import contextmanager
 from datetime import datetime
 
+# Максимальное число параметров в одном IN (...) при поиске id
+ID_LOOKUP_CHUNK = 500
+
+# Колонки записи в порядке таблицы entries (без вычисляемой колонки год)
+ENTRY_COLUMNS = "e.id, e.название, e.тип, e.дата, e.описание, e.соавторы"
+
+# Материализованная статистика: таблица -> (колонки, запрос, вычисляющий значения с нуля)
+STATISTICS = {
+    'keyword_stats': (
+        "keyword_id, count",
+        "SELECT keyword_id, COUNT(*) FROM entry_keywords GROUP BY keyword_id"
+    ),
+    'competency_stats': (
+        "competency_id, level_sum, level_count",
+        "SELECT competency_id, SUM(уровень), COUNT(уровень) FROM entry_competencies "
+        "GROUP BY competency_id HAVING COUNT(уровень) > 0"
+    ),
+    'author_stats': (
+        "person_id, count",
+        "SELECT person_id, COUNT(*) FROM entry_authors GROUP BY person_id"
+    ),
+}
+
+# Разделитель имён в строке соавторов
+AUTHORS_SEPARATOR = ','
+
+# Рекурсивный разбор строки соавторов в SQL (для миграции существующих записей)
+AUTHORS_SPLIT = f"""
+split (entry_id, name, rest) AS (
+    SELECT id, '', соавторы || '{AUTHORS_SEPARATOR}' FROM entries WHERE COALESCE(соавторы, '') != ''
+    UNION ALL
+    SELECT entry_id, trim(substr(rest, 1, instr(rest, '{AUTHORS_SEPARATOR}') - 1)),
+           substr(rest, instr(rest, '{AUTHORS_SEPARATOR}') + 1)
+    FROM split WHERE rest != ''
+)"""
+
+# Миграции схемы: номер версии и SQL-команды.
+# Номер последней применённой миграции хранится в PRAGMA user_version
+MIGRATIONS = [
+    (1, [
+        # Сортировка и keyset-пагинация по дате
+        "CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (дата, id)",
+        # Статистика соавторов читает только индекс
+        "CREATE INDEX IF NOT EXISTS idx_entries_authors ON entries (соавторы) "
+        "WHERE соавторы IS NOT NULL AND соавторы != ''",
+        "CREATE INDEX IF NOT EXISTS idx_entry_keywords_keyword ON entry_keywords (keyword_id, entry_id)",
+        "CREATE INDEX IF NOT EXISTS idx_entry_competencies_entry ON entry_competencies (entry_id)",
+        "CREATE INDEX IF NOT EXISTS idx_entry_competencies_competency "
+        "ON entry_competencies (competency_id, уровень)",
+    ]),
+    (2, [
+        # Вычисляемый год для get_entries_by_year
+        "ALTER TABLE entries ADD COLUMN год TEXT GENERATED ALWAYS AS (strftime('%Y', дата)) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_entries_year ON entries (год)",
+    ]),
+    (3, [
+        # Статистика исследовательской карты и компетенций, которую ведут триггеры
+        "CREATE TABLE IF NOT EXISTS keyword_stats ("
+        "keyword_id INTEGER PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)",
+        "CREATE TABLE IF NOT EXISTS competency_stats ("
+        "competency_id INTEGER PRIMARY KEY, level_sum INTEGER NOT NULL DEFAULT 0, "
+        "level_count INTEGER NOT NULL DEFAULT 0)",
+        "CREATE TABLE IF NOT EXISTS author_stats ("
+        "соавторы TEXT PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS keyword_stats_insert AFTER INSERT ON entry_keywords BEGIN
+            INSERT INTO keyword_stats (keyword_id, count) VALUES (new.keyword_id, 1)
+            ON CONFLICT (keyword_id) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS keyword_stats_delete AFTER DELETE ON entry_keywords BEGIN
+            UPDATE keyword_stats SET count = count - 1 WHERE keyword_id = old.keyword_id;
+            DELETE FROM keyword_stats WHERE keyword_id = old.keyword_id AND count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS competency_stats_insert AFTER INSERT ON entry_competencies
+        WHEN new.уровень IS NOT NULL BEGIN
+            INSERT INTO competency_stats (competency_id, level_sum, level_count)
+            VALUES (new.competency_id, new.уровень, 1)
+            ON CONFLICT (competency_id) DO UPDATE SET
+                level_sum = level_sum + excluded.level_sum,
+                level_count = level_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS competency_stats_delete AFTER DELETE ON entry_competencies
+        WHEN old.уровень IS NOT NULL BEGIN
+            UPDATE competency_stats SET level_sum = level_sum - old.уровень, level_count = level_count - 1
+            WHERE competency_id = old.competency_id;
+            DELETE FROM competency_stats WHERE competency_id = old.competency_id AND level_count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS competency_stats_update AFTER UPDATE OF competency_id, уровень
+        ON entry_competencies BEGIN
+            UPDATE competency_stats SET level_sum = level_sum - old.уровень, level_count = level_count - 1
+            WHERE competency_id = old.competency_id AND old.уровень IS NOT NULL;
+            DELETE FROM competency_stats WHERE competency_id = old.competency_id AND level_count <= 0;
+            INSERT INTO competency_stats (competency_id, level_sum, level_count)
+            SELECT new.competency_id, new.уровень, 1 WHERE new.уровень IS NOT NULL
+            ON CONFLICT (competency_id) DO UPDATE SET
+                level_sum = level_sum + excluded.level_sum,
+                level_count = level_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS author_stats_insert AFTER INSERT ON entries
+        WHEN COALESCE(new.соавторы, '') != '' BEGIN
+            INSERT INTO author_stats (соавторы, count) VALUES (new.соавторы, 1)
+            ON CONFLICT (соавторы) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS author_stats_delete AFTER DELETE ON entries
+        WHEN COALESCE(old.соавторы, '') != '' BEGIN
+            UPDATE author_stats SET count = count - 1 WHERE соавторы = old.соавторы;
+            DELETE FROM author_stats WHERE соавторы = old.соавторы AND count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS author_stats_update AFTER UPDATE OF соавторы ON entries BEGIN
+            UPDATE author_stats SET count = count - 1 WHERE соавторы = old.соавторы;
+            DELETE FROM author_stats WHERE соавторы = old.соавторы AND count <= 0;
+            INSERT INTO author_stats (соавторы, count)
+            SELECT new.соавторы, 1 WHERE COALESCE(new.соавторы, '') != ''
+            ON CONFLICT (соавторы) DO UPDATE SET count = count + 1;
+        END
+        """,
+        "INSERT INTO keyword_stats (keyword_id, count) "
+        "SELECT keyword_id, COUNT(*) FROM entry_keywords GROUP BY keyword_id",
+        "INSERT INTO competency_stats (competency_id, level_sum, level_count) "
+        "SELECT competency_id, SUM(уровень), COUNT(уровень) FROM entry_competencies "
+        "GROUP BY competency_id HAVING COUNT(уровень) > 0",
+        "INSERT INTO author_stats (соавторы, count) "
+        "SELECT соавторы, COUNT(*) FROM entries WHERE соавторы IS NOT NULL AND соавторы != '' "
+        "GROUP BY соавторы",
+    ]),
+    (4, [
+        # Соавторы хранятся нормализованно: люди и связи записей с ними.
+        # Строка entries.соавторы остаётся текстом для отображения
+        "DROP TRIGGER IF EXISTS author_stats_insert",
+        "DROP TRIGGER IF EXISTS author_stats_delete",
+        "DROP TRIGGER IF EXISTS author_stats_update",
+        "DROP TABLE IF EXISTS author_stats",
+        "DROP INDEX IF EXISTS idx_entries_authors",
+        "CREATE TABLE IF NOT EXISTS people ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, имя TEXT UNIQUE NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS entry_authors ("
+        "entry_id INTEGER NOT NULL, person_id INTEGER NOT NULL, "
+        "PRIMARY KEY (entry_id, person_id), "
+        "FOREIGN KEY (entry_id) REFERENCES entries (id), "
+        "FOREIGN KEY (person_id) REFERENCES people (id)) WITHOUT ROWID",
+        # Записи человека и граф соавторства читаются по индексу
+        "CREATE INDEX IF NOT EXISTS idx_entry_authors_person ON entry_authors (person_id, entry_id)",
+        "CREATE TABLE IF NOT EXISTS author_stats ("
+        "person_id INTEGER PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS author_stats_insert AFTER INSERT ON entry_authors BEGIN
+            INSERT INTO author_stats (person_id, count) VALUES (new.person_id, 1)
+            ON CONFLICT (person_id) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS author_stats_delete AFTER DELETE ON entry_authors BEGIN
+            UPDATE author_stats SET count = count - 1 WHERE person_id = old.person_id;
+            DELETE FROM author_stats WHERE person_id = old.person_id AND count <= 0;
+        END
+        """,
+        # Разбор существующих строк "Иванов, Петров" на отдельных людей
+        f"""
+        WITH RECURSIVE {AUTHORS_SPLIT}
+        INSERT OR IGNORE INTO people (имя)
+        SELECT name FROM split WHERE name != '' ORDER BY entry_id
+        """,
+        f"""
+        WITH RECURSIVE {AUTHORS_SPLIT}
+        INSERT OR IGNORE INTO entry_authors (entry_id, person_id)
+        SELECT s.entry_id, p.id FROM split s JOIN people p ON p.имя = s.name
+        WHERE s.name != ''
+        """,
+    ]),
+]
+
 
 class Database:
-    def __init__(self, db_name="portfolio.db"):
+    def __init__(self, db_name="portfolio.db", setup_schema=True):
+        """setup_schema=False - только соединение с уже подготовленной базой (рабочие потоки)"""
+        self.db_name = db_name
         self.conn = sqlite3.connect(db_name)
+        # WAL: чтение в одних потоках не блокируется записью в другом
+        self.conn.execute("PRAGMA journal_mode=WAL")
         self.cursor = self.conn.cursor()
-        self.create_tables()
-        self.init_achievements()
+        self._in_transaction = False
+        if setup_schema:
+            self.create_tables()
+            self.migrate()
+            self.init_achievements()
 
     def create_tables(self):
         """Создание всех таблиц базы данных"""
@@ -88,8 +282,206 @@ class Database:
             )
         ''')
 
+        self.create_search_index()
+        self.create_entry_counters()
+
         self.conn.commit()
 
+    def create_entry_counters(self):
+        """Счётчики по записям для достижений, обновляемые триггерами при вставке и удалении"""
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entry_counters'")
+        counters_exist = self.cursor.fetchone() is not None
+
+        # counter: entries, coauthored, description_length, type (key = тип), year (key = год)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entry_counters (
+                counter TEXT NOT NULL,
+                key TEXT NOT NULL DEFAULT '',
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (counter, key)
+            )
+        ''')
+
+        self.cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS entry_counters_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO entry_counters (counter, key, value) VALUES
+                    ('entries', '', 1),
+                    ('coauthored', '', COALESCE(new.соавторы, '') != ''),
+                    ('description_length', '', COALESCE(LENGTH(new.описание), 0)),
+                    ('type', new.тип, 1),
+                    ('year', COALESCE(strftime('%Y', new.дата), ''), 1)
+                ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entry_counters_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO entry_counters (counter, key, value) VALUES
+                    ('entries', '', -1),
+                    ('coauthored', '', -(COALESCE(old.соавторы, '') != '')),
+                    ('description_length', '', -COALESCE(LENGTH(old.описание), 0)),
+                    ('type', old.тип, -1),
+                    ('year', COALESCE(strftime('%Y', old.дата), ''), -1)
+                ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entry_counters_update AFTER UPDATE ON entries BEGIN
+                INSERT INTO entry_counters (counter, key, value) VALUES
+                    ('coauthored', '', -(COALESCE(old.соавторы, '') != '')),
+                    ('description_length', '', -COALESCE(LENGTH(old.описание), 0)),
+                    ('type', old.тип, -1),
+                    ('year', COALESCE(strftime('%Y', old.дата), ''), -1)
+                ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+                INSERT INTO entry_counters (counter, key, value) VALUES
+                    ('coauthored', '', COALESCE(new.соавторы, '') != ''),
+                    ('description_length', '', COALESCE(LENGTH(new.описание), 0)),
+                    ('type', new.тип, 1),
+                    ('year', COALESCE(strftime('%Y', new.дата), ''), 1)
+                ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+            END;
+        ''')
+
+        # Начальные значения для записей, созданных до появления счётчиков
+        if not counters_exist:
+            self.cursor.executescript('''
+                INSERT INTO entry_counters (counter, key, value)
+                SELECT 'entries', '', COUNT(*) FROM entries;
+                INSERT INTO entry_counters (counter, key, value)
+                SELECT 'coauthored', '', COUNT(*) FROM entries WHERE соавторы IS NOT NULL AND соавторы != '';
+                INSERT INTO entry_counters (counter, key, value)
+                SELECT 'description_length', '', COALESCE(SUM(LENGTH(описание)), 0) FROM entries;
+                INSERT INTO entry_counters (counter, key, value)
+                SELECT 'type', тип, COUNT(*) FROM entries GROUP BY тип;
+                INSERT INTO entry_counters (counter, key, value)
+                SELECT 'year', COALESCE(strftime('%Y', дата), ''), COUNT(*) FROM entries GROUP BY 2;
+            ''')
+
+    def create_search_index(self):
+        """Полнотекстовый индекс FTS5 по названию, описанию и ключевым словам"""
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'")
+        index_exists = self.cursor.fetchone() is not None
+
+        # unicode61 приводит к нижнему регистру и кириллицу, remove_diacritics 2 уравнивает ё и е
+        self.cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                название, описание, keywords,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+
+        # Флаг отложенной индексации для массового импорта
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS search_index_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                deferred INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self.cursor.execute("INSERT OR IGNORE INTO search_index_state (id, deferred) VALUES (1, 0)")
+
+        # Триггеры синхронизации индекса с записями и ключевыми словами
+        self.cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries
+            WHEN (SELECT deferred FROM search_index_state) = 0 BEGIN
+                INSERT INTO entries_fts (rowid, название, описание, keywords)
+                VALUES (new.id, new.название, new.описание, '');
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF название, описание ON entries BEGIN
+                UPDATE entries_fts SET название = new.название, описание = new.описание
+                WHERE rowid = new.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+                DELETE FROM entries_fts WHERE rowid = old.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entry_keywords_fts_insert AFTER INSERT ON entry_keywords
+            WHEN (SELECT deferred FROM search_index_state) = 0 BEGIN
+                UPDATE entries_fts SET keywords = (
+                    SELECT GROUP_CONCAT(k.keyword, ' ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = new.entry_id
+                ) WHERE rowid = new.entry_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS entry_keywords_fts_delete AFTER DELETE ON entry_keywords BEGIN
+                UPDATE entries_fts SET keywords = (
+                    SELECT GROUP_CONCAT(k.keyword, ' ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = old.entry_id
+                ) WHERE rowid = old.entry_id;
+            END;
+        ''')
+
+        # Индексация записей, созданных до появления индекса
+        if not index_exists:
+            self._index_entries()
+
+    def _index_entries(self, first_id=1, last_id=2 ** 63 - 1):
+        """Добавление записей из диапазона id в полнотекстовый индекс одним запросом"""
+        self.cursor.execute('''
+            INSERT INTO entries_fts (rowid, название, описание, keywords)
+            SELECT e.id, e.название, e.описание,
+                   (SELECT GROUP_CONCAT(k.keyword, ' ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = e.id)
+            FROM entries e
+            WHERE e.id BETWEEN ? AND ?
+        ''', (first_id, last_id))
+
+    def get_schema_version(self):
+        """Номер последней применённой миграции"""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+
+    def migrate(self):
+        """Применение недостающих миграций схемы, каждой в своей транзакции"""
+        current = self.get_schema_version()
+        pending = [(version, statements) for version, statements in MIGRATIONS if version > current]
+        if not pending:
+            return
+
+        for version, statements in pending:
+            self.cursor.execute("BEGIN")
+            try:
+                for statement in statements:
+                    self.cursor.execute(statement)
+                self.cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+        # Обновление статистики для планировщика запросов
+        self.cursor.execute("ANALYZE")
+        self.conn.commit()
+
+    def verify_statistics(self, repair=True):
+        """Сверка материализованной статистики с исходными таблицами
+
+        Возвращает число расходящихся строк по каждой таблице статистики;
+        при repair=True расходящиеся таблицы пересчитываются заново
+        """
+        mismatches = {}
+        for table, (columns, query) in STATISTICS.items():
+            self.cursor.execute(f'''
+                SELECT COUNT(*) FROM (
+                    SELECT * FROM ({query} EXCEPT SELECT {columns} FROM {table})
+                    UNION ALL
+                    SELECT * FROM (SELECT {columns} FROM {table} EXCEPT {query})
+                )
+            ''')
+            mismatches[table] = self.cursor.fetchone()[0]
+
+        if repair and any(mismatches.values()):
+            with self.transaction():
+                for table, (columns, query) in STATISTICS.items():
+                    if mismatches[table]:
+                        self.cursor.execute(f"DELETE FROM {table}")
+                        self.cursor.execute(f"INSERT INTO {table} ({columns}) {query}")
+        return mismatches
+
     def init_achievements(self):
         """Инициализация достижений"""
         achievements = [
@@ -108,6 +500,30 @@ class Database:
 
         self.conn.commit()
 
+    # ============ ТРАНЗАКЦИИ ============
+
+    @contextmanager
+    def transaction(self):
+        """Единица работы: все изменения внутри блока фиксируются одним коммитом"""
+        if self._in_transaction:
+            yield self.cursor
+            return
+
+        self._in_transaction = True
+        try:
+            yield self.cursor
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def _commit(self):
+        """Коммит, если изменения не выполняются внутри transaction()"""
+        if not self._in_transaction:
+            self.conn.commit()
+
     # ============ МЕТОДЫ ДЛЯ ЗАПИСЕЙ ============
 
     def add_entry(self, title, entry_type, date, description, authors):
@@ -116,48 +532,211 @@ class Database:
             INSERT INTO entries (название, тип, дата, описание, соавторы)
             VALUES (?, ?, ?, ?, ?)
         ''', (title, entry_type, date, description, authors))
-        self.conn.commit()
-        return self.cursor.lastrowid
+        entry_id = self.cursor.lastrowid
+        self._link_authors([(entry_id, authors)])
+        self._commit()
+        return entry_id
+
+    def add_entry_full(self, entry, keywords=(), competencies=()):
+        """Добавление записи с ключевыми словами и компетенциями одной транзакцией
+
+        entry - кортеж (название, тип, дата, описание, соавторы),
+        competencies - список пар (название компетенции, уровень)
+        """
+        with self.transaction():
+            entry_id = self.add_entry(*entry)
+            self._link_entries([(entry_id, keywords, competencies)])
+        return entry_id
+
+    def import_entries(self, rows, batch_size=5000):
+        """Массовый импорт записей одной транзакцией
+
+        rows - итерируемый набор кортежей
+        (название, тип, дата, описание, соавторы, ключевые_слова, компетенции)
+        """
+        total = 0
+        with self.transaction():
+            # Построчные триггеры индекса отключаются: пачка индексируется одним запросом
+            self.cursor.execute("UPDATE search_index_state SET deferred = 1")
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    total += self._insert_entries_batch(batch)
+                    batch = []
+            if batch:
+                total += self._insert_entries_batch(batch)
+            self.cursor.execute("UPDATE search_index_state SET deferred = 0")
+        return total
+
+    def _insert_entries_batch(self, batch):
+        """Вставка пачки записей через executemany и создание их связей"""
+        self.cursor.executemany('''
+            INSERT INTO entries (название, тип, дата, описание, соавторы)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [row[:5] for row in batch])
+
+        # Внутри транзакции id новых записей идут подряд
+        self.cursor.execute("SELECT last_insert_rowid()")
+        first_id = self.cursor.fetchone()[0] - len(batch) + 1
+
+        self._link_entries([(first_id + i, row[5], row[6]) for i, row in enumerate(batch)])
+        self._link_authors([(first_id + i, row[4]) for i, row in enumerate(batch)])
+        self._index_entries(first_id, first_id + len(batch) - 1)
+        return len(batch)
+
+    def _link_entries(self, links):
+        """Пакетное связывание записей с ключевыми словами и компетенциями
+
+        links - список кортежей (entry_id, ключевые_слова, компетенции)
+        """
+        keyword_ids = self._resolve_ids(
+            'keywords', 'keyword',
+            [keyword for _, keywords, _ in links for keyword in keywords])
+        competency_ids = self._resolve_ids(
+            'competencies', 'название',
+            [name for _, _, competencies in links for name, _ in competencies])
+
+        self.cursor.executemany('''
+            INSERT OR IGNORE INTO entry_keywords (entry_id, keyword_id)
+            VALUES (?, ?)
+        ''', [(entry_id, keyword_ids[keyword])
+              for entry_id, keywords, _ in links for keyword in keywords])
+
+        self.cursor.executemany('''
+            INSERT INTO entry_competencies (entry_id, competency_id, уровень)
+            VALUES (?, ?, ?)
+        ''', [(entry_id, competency_ids[name], level)
+              for entry_id, _, competencies in links for name, level in competencies])
+
+    def _link_authors(self, links):
+        """Пакетное связывание записей с людьми из строки соавторов
+
+        links - список пар (entry_id, соавторы)
+        """
+        links = [(entry_id, self.parse_authors(authors)) for entry_id, authors in links]
+        person_ids = self._resolve_ids('people', 'имя', [name for _, names in links for name in names])
+
+        self.cursor.executemany('''
+            INSERT OR IGNORE INTO entry_authors (entry_id, person_id)
+            VALUES (?, ?)
+        ''', [(entry_id, person_ids[name]) for entry_id, names in links for name in names])
+
+    @staticmethod
+    def parse_authors(authors):
+        """Список имён из строки соавторов "Иванов, Петров" без пустых и повторов"""
+        names = (name.strip() for name in (authors or '').split(AUTHORS_SEPARATOR))
+        return list(dict.fromkeys(name for name in names if name))
+
+    def _resolve_ids(self, table, column, names):
+        """Получение id по названиям с добавлением отсутствующих одним пакетом"""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        self.cursor.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)",
+                                [(name,) for name in names])
+
+        ids = {}
+        for i in range(0, len(names), ID_LOOKUP_CHUNK):
+            chunk = names[i:i + ID_LOOKUP_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            self.cursor.execute(f"SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})", chunk)
+            ids.update(self.cursor.fetchall())
+        return ids
 
     def get_all_entries(self):
         """Получение всех записей"""
-        self.cursor.execute("SELECT * FROM entries ORDER BY дата DESC")
+        self.cursor.execute(f"SELECT {ENTRY_COLUMNS} FROM entries e ORDER BY e.дата DESC, e.id DESC")
         return self.cursor.fetchall()
 
     def get_all_entries_with_keywords(self):
         """Получение записей с ключевыми словами"""
-        self.cursor.execute('''
-            SELECT e.*, GROUP_CONCAT(k.keyword, ', ') as keywords
+        self.cursor.execute(f'''
+            SELECT {ENTRY_COLUMNS},
+                   (SELECT GROUP_CONCAT(k.keyword, ', ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = e.id) as keywords
             FROM entries e
-            LEFT JOIN entry_keywords ek ON e.id = ek.entry_id
-            LEFT JOIN keywords k ON ek.keyword_id = k.id
-            GROUP BY e.id
-            ORDER BY e.дата DESC
+            ORDER BY e.дата DESC, e.id DESC
         ''')
         return self.cursor.fetchall()
 
-    def search_entries(self, search_text):
-        """Поиск записей"""
-        self.cursor.execute('''
-            SELECT e.*, GROUP_CONCAT(k.keyword, ', ') as keywords
+    def iter_entries_with_keywords(self, chunk_size=500):
+        """Потоковое чтение записей с ключевыми словами пачками через отдельный курсор"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+                SELECT {ENTRY_COLUMNS},
+                       (SELECT GROUP_CONCAT(k.keyword, ', ') FROM entry_keywords ek
+                        JOIN keywords k ON k.id = ek.keyword_id
+                        WHERE ek.entry_id = e.id) as keywords
+                FROM entries e
+                ORDER BY e.дата DESC, e.id DESC
+            ''')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def get_entries_page(self, after=None, limit=100):
+        """Страница записей с ключевыми словами (keyset-пагинация по дате и id)
+
+        after - пара (дата, id) последней записи предыдущей страницы
+        """
+        where = "WHERE (e.дата, e.id) < (?, ?)" if after else ""
+        params = (*after, limit) if after else (limit,)
+        self.cursor.execute(f'''
+            SELECT {ENTRY_COLUMNS},
+                   (SELECT GROUP_CONCAT(k.keyword, ', ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = e.id) as keywords
             FROM entries e
-            LEFT JOIN entry_keywords ek ON e.id = ek.entry_id
-            LEFT JOIN keywords k ON ek.keyword_id = k.id
-            WHERE LOWER(e.название) LIKE ? OR LOWER(e.описание) LIKE ? OR LOWER(k.keyword) LIKE ?
-            GROUP BY e.id
-            ORDER BY e.дата DESC
-        ''', (f'%{search_text}%', f'%{search_text}%', f'%{search_text}%'))
+            {where}
+            ORDER BY e.дата DESC, e.id DESC
+            LIMIT ?
+        ''', params)
         return self.cursor.fetchall()
 
+    def search_entries(self, search_text, limit=None, offset=0):
+        """Полнотекстовый поиск записей с ранжированием bm25 и поиском по префиксу"""
+        query = self._build_fts_query(search_text)
+        if not query:
+            return []
+
+        self.cursor.execute(f'''
+            SELECT {ENTRY_COLUMNS},
+                   (SELECT GROUP_CONCAT(k.keyword, ', ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = e.id) as keywords
+            FROM entries_fts
+            JOIN entries e ON e.id = entries_fts.rowid
+            WHERE entries_fts MATCH ?
+            ORDER BY bm25(entries_fts, 10.0, 1.0, 5.0), e.дата DESC
+            LIMIT ? OFFSET ?
+        ''', (query, limit if limit is not None else -1, offset))
+        return self.cursor.fetchall()
+
+    @staticmethod
+    def _build_fts_query(search_text):
+        """Преобразование строки поиска в запрос FTS5: каждое слово ищется по префиксу"""
+        words = re.findall(r'\w+', search_text)
+        return ' '.join(f'"{word}"*' for word in words)
+
     def delete_entry(self, entry_id):
         """Удаление записи"""
         # Удаляем связи с ключевыми словами
         self.cursor.execute("DELETE FROM entry_keywords WHERE entry_id = ?", (entry_id,))
         # Удаляем связи с компетенциями
         self.cursor.execute("DELETE FROM entry_competencies WHERE entry_id = ?", (entry_id,))
+        # Удаляем связи с соавторами
+        self.cursor.execute("DELETE FROM entry_authors WHERE entry_id = ?", (entry_id,))
         # Удаляем запись
         self.cursor.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
-        self.conn.commit()
+        self._commit()
 
     # ============ МЕТОДЫ ДЛЯ КЛЮЧЕВЫХ СЛОВ ============
 
@@ -178,7 +757,7 @@ class Database:
             VALUES (?, ?)
         ''', (entry_id, keyword_id))
 
-        self.conn.commit()
+        self._commit()
 
     def get_all_keywords(self):
         """Получение всех ключевых слов"""
@@ -188,35 +767,80 @@ class Database:
     def get_keywords_statistics(self):
         """Статистика по ключевым словам"""
         self.cursor.execute('''
-            SELECT k.keyword, COUNT(ek.entry_id) as count
-            FROM keywords k
-            LEFT JOIN entry_keywords ek ON k.id = ek.keyword_id
-            GROUP BY k.id
-            HAVING count > 0
-            ORDER BY count DESC
+            SELECT k.keyword, s.count
+            FROM keyword_stats s
+            JOIN keywords k ON k.id = s.keyword_id
+            WHERE s.count > 0
+            ORDER BY s.count DESC
         ''')
         return self.cursor.fetchall()
 
     # ============ МЕТОДЫ ДЛЯ СОАВТОРОВ ============
 
     def get_authors_statistics(self):
-        """Статистика по соавторам"""
+        """Статистика по соавторам: число записей каждого человека"""
         self.cursor.execute('''
-            SELECT соавторы, COUNT(*) as count
-            FROM entries
-            WHERE соавторы IS NOT NULL AND соавторы != ''
-            GROUP BY соавторы
-            ORDER BY count DESC
+            SELECT p.имя, s.count
+            FROM author_stats s
+            JOIN people p ON p.id = s.person_id
+            WHERE s.count > 0
+            ORDER BY s.count DESC, p.имя
         ''')
         return self.cursor.fetchall()
 
+    def get_coauthors(self, name):
+        """Соавторы человека и число их совместных записей"""
+        self.cursor.execute('''
+            SELECT p2.имя, COUNT(*) as shared
+            FROM people p
+            JOIN entry_authors a1 ON a1.person_id = p.id
+            JOIN entry_authors a2 ON a2.entry_id = a1.entry_id AND a2.person_id != a1.person_id
+            JOIN people p2 ON p2.id = a2.person_id
+            WHERE p.имя = ?
+            GROUP BY p2.id
+            ORDER BY shared DESC, p2.имя
+        ''', (name,))
+        return self.cursor.fetchall()
+
+    def get_coauthorship_graph(self, min_shared=1):
+        """Рёбра графа соавторства: (имя, имя, число совместных записей)"""
+        self.cursor.execute('''
+            SELECT p1.имя, p2.имя, COUNT(*) as shared
+            FROM entry_authors a1
+            JOIN entry_authors a2 ON a2.entry_id = a1.entry_id AND a2.person_id > a1.person_id
+            JOIN people p1 ON p1.id = a1.person_id
+            JOIN people p2 ON p2.id = a2.person_id
+            GROUP BY a1.person_id, a2.person_id
+            HAVING shared >= ?
+            ORDER BY shared DESC, p1.имя, p2.имя
+        ''', (min_shared,))
+        return self.cursor.fetchall()
+
+    def search_entries_by_author(self, name, limit=None, offset=0):
+        """Записи людей, чьё имя начинается с name (диапазон по индексу имён)"""
+        name = name.strip()
+        if not name:
+            return []
+
+        self.cursor.execute(f'''
+            SELECT {ENTRY_COLUMNS},
+                   (SELECT GROUP_CONCAT(k.keyword, ', ') FROM entry_keywords ek
+                    JOIN keywords k ON k.id = ek.keyword_id
+                    WHERE ek.entry_id = e.id) as keywords
+            FROM entries e
+            WHERE e.id IN (
+                SELECT a.entry_id FROM people p
+                JOIN entry_authors a ON a.person_id = p.id
+                WHERE p.имя >= ? AND p.имя < ?
+            )
+            ORDER BY e.дата DESC, e.id DESC
+            LIMIT ? OFFSET ?
+        ''', (name, name + '\U0010ffff', limit if limit is not None else -1, offset))
+        return self.cursor.fetchall()
+
     def count_entries_with_authors(self):
         """Количество записей с соавторами"""
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM entries 
-            WHERE соавторы IS NOT NULL AND соавторы != ''
-        ''')
-        return self.cursor.fetchone()[0]
+        return self.get_entry_counters()['coauthored']
 
     # ============ МЕТОДЫ ДЛЯ ДОСТИЖЕНИЙ ============
 
@@ -236,9 +860,35 @@ class Database:
             SET получено = TRUE, дата_получения = CURRENT_DATE
             WHERE название = ? AND получено = FALSE
         ''', (achievement_name,))
-        self.conn.commit()
+        self._commit()
         return self.cursor.rowcount > 0
 
+    def get_unlocked_achievements(self):
+        """Названия уже полученных достижений"""
+        self.cursor.execute("SELECT название FROM achievements WHERE получено")
+        return {row[0] for row in self.cursor.fetchall()}
+
+    def get_entry_counters(self, year=None):
+        """Значения счётчиков по записям одним запросом к таблице entry_counters"""
+        year = str(year if year is not None else datetime.now().year)
+        self.cursor.execute('''
+            SELECT
+                COALESCE(SUM(CASE WHEN counter = 'entries' THEN value END), 0),
+                COALESCE(SUM(CASE WHEN counter = 'coauthored' THEN value END), 0),
+                COALESCE(SUM(CASE WHEN counter = 'description_length' THEN value END), 0),
+                COUNT(CASE WHEN counter = 'type' AND value > 0 THEN 1 END),
+                COALESCE(SUM(CASE WHEN counter = 'year' AND key = ? THEN value END), 0)
+            FROM entry_counters
+        ''', (year,))
+        entries, coauthored, description_length, distinct_types, entries_this_year = self.cursor.fetchone()
+        return {
+            'entries': entries,
+            'coauthored': coauthored,
+            'description_length': description_length,
+            'distinct_types': distinct_types,
+            'entries_this_year': entries_this_year
+        }
+
     def get_achievement_status(self, achievement_name):
         """Получение статуса достижения"""
         self.cursor.execute('''
@@ -249,24 +899,17 @@ class Database:
 
     def get_total_description_length(self):
         """Общая длина всех описаний"""
-        self.cursor.execute('''
-            SELECT SUM(LENGTH(описание)) FROM entries
-        ''')
-        result = self.cursor.fetchone()[0]
-        return result if result else 0
+        return self.get_entry_counters()['description_length']
 
     def get_entry_types_count(self):
         """Количество уникальных типов записей"""
-        self.cursor.execute('''
-            SELECT COUNT(DISTINCT тип) FROM entries
-        ''')
-        return self.cursor.fetchone()[0]
+        return self.get_entry_counters()['distinct_types']
 
     def get_entries_by_year(self, year):
         """Количество записей за год"""
         self.cursor.execute('''
-            SELECT COUNT(*) FROM entries 
-            WHERE strftime('%Y', дата) = ?
+            SELECT COUNT(*) FROM entries
+            WHERE год = ?
         ''', (str(year),))
         return self.cursor.fetchone()[0]
 
@@ -289,18 +932,17 @@ class Database:
             VALUES (?, ?, ?)
         ''', (entry_id, competency_id, level))
 
-        self.conn.commit()
+        self._commit()
 
     def get_competencies_statistics(self):
         """Статистика по компетенциям"""
         self.cursor.execute('''
-            SELECT c.название, 
-                   AVG(ec.уровень) as средний_уровень,
-                   COUNT(ec.id) as количество_оценок
-            FROM competencies c
-            LEFT JOIN entry_competencies ec ON c.id = ec.competency_id
-            GROUP BY c.id
-            HAVING количество_оценок > 0
+            SELECT c.название,
+                   CAST(s.level_sum AS REAL) / s.level_count as средний_уровень,
+                   s.level_count as количество_оценок
+            FROM competency_stats s
+            JOIN competencies c ON c.id = s.competency_id
+            WHERE s.level_count > 0
             ORDER BY средний_уровень DESC
         ''')
         return self.cursor.fetchall()
@@ -311,11 +953,10 @@ class Database:
 
         # Находим компетенции с низким уровнем
         self.cursor.execute('''
-            SELECT c.название, AVG(ec.уровень) as avg_level
-            FROM competencies c
-            JOIN entry_competencies ec ON c.id = ec.competency_id
-            GROUP BY c.id
-            HAVING avg_level < 3
+            SELECT c.название, CAST(s.level_sum AS REAL) / s.level_count as avg_level
+            FROM competency_stats s
+            JOIN competencies c ON c.id = s.competency_id
+            WHERE s.level_count > 0 AND s.level_sum < 3 * s.level_count
         ''')
 
         weak_competencies = self.cursor.fetchall()
@@ -351,7 +992,7 @@ class Database:
             INSERT INTO goals (тип, описание, цель)
             VALUES (?, ?, ?)
         ''', (goal_type, description, target))
-        self.conn.commit()
+        self._commit()
 
     def get_goals(self):
         """Получение всех целей"""
@@ -370,10 +1011,11 @@ class Database:
                 выполнено = CASE WHEN ? >= цель THEN TRUE ELSE FALSE END
             WHERE id = ?
         ''', (current_value, current_value, goal_id))
-        self.conn.commit()
+        self._commit()
 
     # ============ ЗАКРЫТИЕ СОЕДИНЕНИЯ ============
 
     def close(self):
         """Закрытие соединения с БД"""
+        self.conn.execute("PRAGMA optimize")
         self.conn.close()
\ No newline at end of file
@@ -8,8 +8,12 @@ class ReportExporter:
     def __init__(self, db):
         self.db = db
 
-    def export_to_word(self, filename="отчет.docx"):
-        """Экспорт отчета в Word"""
+    def export_to_word(self, filename="отчет.docx", progress_callback=None, chunk_size=500):
+        """Экспорт отчета в Word
+
+        Записи читаются из БД пачками по chunk_size, после каждой пачки
+        вызывается progress_callback(обработано, всего)
+        """
         doc = Document()
 
         # Настройки стиля
@@ -35,35 +39,42 @@ class ReportExporter:
 
         # Раздел 1: Записи портфолио
         doc.add_heading('1. Записи портфолио', level=1)
-        entries = self.db.get_all_entries_with_keywords()
+        total = self.db.get_entry_counters()['entries']
+        done = 0
 
-        if entries:
-            for entry in entries:
-                doc.add_heading(entry[1], level=2)  # название
+        for entry in self.db.iter_entries_with_keywords(chunk_size):
+            doc.add_heading(entry[1], level=2)  # название
 
-                info = doc.add_paragraph()
-                info_run = info.add_run(f"Тип: {entry[2]}")
-                info_run.bold = True
-                info.add_run(f" | Дата: {entry[3]}")
+            info = doc.add_paragraph()
+            info_run = info.add_run(f"Тип: {entry[2]}")
+            info_run.bold = True
+            info.add_run(f" | Дата: {entry[3]}")
 
-                if entry[5]:  # соавторы
-                    info.add_run(f" | Соавторы: {entry[5]}")
+            if entry[5]:  # соавторы
+                info.add_run(f" | Соавторы: {entry[5]}")
 
-                if entry[6]:  # ключевые слова
-                    kw_para = doc.add_paragraph()
-                    kw_run = kw_para.add_run("Ключевые слова: ")
-                    kw_run.bold = True
-                    kw_para.add_run(entry[6])
+            if entry[6]:  # ключевые слова
+                kw_para = doc.add_paragraph()
+                kw_run = kw_para.add_run("Ключевые слова: ")
+                kw_run.bold = True
+                kw_para.add_run(entry[6])
 
-                if entry[4]:  # описание
-                    desc_para = doc.add_paragraph("Описание:")
-                    desc_run = desc_para.runs[0]
-                    desc_run.bold = True
-                    doc.add_paragraph(entry[4])
+            if entry[4]:  # описание
+                desc_para = doc.add_paragraph("Описание:")
+                desc_run = desc_para.runs[0]
+                desc_run.bold = True
+                doc.add_paragraph(entry[4])
 
-                doc.add_paragraph()  # пустая строка
-        else:
+            doc.add_paragraph()  # пустая строка
+
+            done += 1
+            if progress_callback and done % chunk_size == 0:
+                progress_callback(done, total)
+
+        if done == 0:
             doc.add_paragraph("Записей пока нет")
+        elif progress_callback:
+            progress_callback(done, total)
 
         doc.add_page_break()
 
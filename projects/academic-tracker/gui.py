@@ -3,9 +3,14 @@ from tkinter import ttk, messagebox, scrolledtext
 from database import Database
 from achievements import AchievementTracker
 from export import ReportExporter
+from tasks import TaskExecutor
+from widgets import PagedTreeview
 import json
 from datetime import datetime
 
+# Префикс строки поиска для поиска записей по соавтору
+AUTHOR_SEARCH_PREFIX = "автор:"
+
 
 class AcademicTrackerApp:
     def __init__(self, root):
@@ -13,10 +18,12 @@ class AcademicTrackerApp:
         self.root.title("Личный трекер академической школы")
         self.root.geometry("1100x750")
 
-        # Инициализация компонентов
+        # Инициализация компонентов: схема создаётся и мигрирует до запуска рабочих потоков,
+        # дальше все запросы к БД выполняются в пуле, у каждого потока своё соединение
         self.db = Database()
-        self.achievement_tracker = AchievementTracker(self.db)
-        self.exporter = ReportExporter(self.db)
+        self.executor = TaskExecutor(self.root, self.db.db_name,
+                                     on_busy=self.set_busy, on_error=self.show_task_error)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Загрузка компетенций
         self.competencies = self.load_competencies()
@@ -24,6 +31,7 @@ class AcademicTrackerApp:
 
         # Создание интерфейса
         self.create_menu()
+        self.create_status_bar()
         self.create_notebook()
         self.update_achievements()
 
@@ -37,13 +45,48 @@ class AcademicTrackerApp:
         menubar.add_cascade(label="Файл", menu=file_menu)
         file_menu.add_command(label="Экспорт отчёта", command=self.export_report)
         file_menu.add_separator()
-        file_menu.add_command(label="Выход", command=self.root.quit)
+        file_menu.add_command(label="Выход", command=self.close)
 
         # Меню Настройки
         settings_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Настройки", menu=settings_menu)
         settings_menu.add_command(label="Выбор специальности", command=self.select_specialty)
 
+    def create_status_bar(self):
+        """Строка состояния с индикатором фоновых задач"""
+        self.status_frame = ttk.Frame(self.root)
+        self.status_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
+
+        self.status_label = ttk.Label(self.status_frame, text="Готово")
+        self.status_label.pack(side='left')
+        self.cancel_button = ttk.Button(self.status_frame, text="Отменить", command=self.executor.cancel_all)
+        self.busy_bar = ttk.Progressbar(self.status_frame, length=150, mode='indeterminate')
+
+    def set_busy(self, busy):
+        """Показ индикатора, пока в пуле есть незавершённые задачи"""
+        if busy:
+            self.status_label.config(text="Выполняется...")
+            self.cancel_button.pack(side='right')
+            self.busy_bar.pack(side='right', padx=5)
+            self.busy_bar.start(15)
+            self.root.config(cursor='watch')
+        else:
+            self.status_label.config(text="Готово")
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+            self.cancel_button.pack_forget()
+            self.root.config(cursor='')
+
+    def show_task_error(self, error):
+        """Ошибка фоновой задачи"""
+        messagebox.showerror("Ошибка", f"Не удалось выполнить операцию: {error}")
+
+    def close(self):
+        """Остановка фоновых задач и закрытие приложения"""
+        self.executor.shutdown()
+        self.db.close()
+        self.root.destroy()
+
     def create_notebook(self):
         """Создание вкладок"""
         self.notebook = ttk.Notebook(self.root)
@@ -163,7 +206,7 @@ class AcademicTrackerApp:
 
         # Таблица записей
         columns = ("ID", "Название", "Тип", "Дата", "Соавторы", "Ключевые слова")
-        self.tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        self.tree = PagedTreeview(frame, self.executor, columns=columns, show="headings", height=20)
 
         # Настройка колонок
         col_widths = [50, 200, 100, 100, 150, 150]
@@ -174,7 +217,8 @@ class AcademicTrackerApp:
         # Полосы прокрутки
         scrollbar_y = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
         scrollbar_x = ttk.Scrollbar(frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        self.tree.attach_scrollbar(scrollbar_y)
+        self.tree.configure(xscrollcommand=scrollbar_x.set)
 
         # Размещение
         self.tree.pack(side="top", fill="both", expand=True)
@@ -337,20 +381,16 @@ class AcademicTrackerApp:
                 messagebox.showerror("Ошибка", "Неверный формат даты! Используйте ГГГГ-ММ-ДД")
                 return
 
-            # Сохранение записи в БД
-            entry_id = self.db.add_entry(title, entry_type, date, description, authors)
-
-            # Сохранение ключевых слов
+            # Ключевые слова
+            keywords = []
             if keywords_str:
                 keywords = [k.strip() for k in keywords_str.split(',') if k.strip()]
                 if len(keywords) > 5:
                     keywords = keywords[:5]
                     messagebox.showwarning("Предупреждение", "Сохраняется только первые 5 ключевых слов")
 
-                for keyword in keywords:
-                    self.db.add_keyword_to_entry(entry_id, keyword)
-
-            # Сохранение компетенций
+            # Компетенции
+            competencies = []
             for i in range(3):
                 comp_name = self.competency_vars[i].get().strip()
                 level_str = self.competency_levels[i].get().strip()
@@ -359,25 +399,39 @@ class AcademicTrackerApp:
                     try:
                         level = int(level_str)
                         if 1 <= level <= 5:
-                            self.db.add_competency_to_entry(entry_id, comp_name, level)
+                            competencies.append((comp_name, level))
                     except ValueError:
                         pass
 
-            # Проверка достижений
-            new_achievements = self.achievement_tracker.check_achievements()
-            if new_achievements:
-                achievements_text = "\n".join([f"🏆 {a}" for a in new_achievements])
-                messagebox.showinfo("Новые достижения!", f"Разблокированы:\n{achievements_text}")
-
-            messagebox.showinfo("Успех", "Запись успешно сохранена!")
-            self.clear_form()
-            self.load_entries()
-            self.update_research_map()
-            self.update_competencies_profile()
-            self.load_achievements()
-
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось сохранить запись: {str(e)}")
+            return
+
+        def save(db, task):
+            # Сохранение записи со связями одной транзакцией и проверка достижений
+            db.add_entry_full((title, entry_type, date, description, authors), keywords, competencies)
+            return AchievementTracker(db).check_achievements()
+
+        self.executor.submit(
+            save, on_done=self._on_entry_saved,
+            on_error=lambda e: messagebox.showerror("Ошибка", f"Не удалось сохранить запись: {e}"))
+
+    def _on_entry_saved(self, new_achievements):
+        """Сообщения и обновление вкладок после сохранения записи"""
+        if new_achievements:
+            achievements_text = "\n".join([f"🏆 {a}" for a in new_achievements])
+            messagebox.showinfo("Новые достижения!", f"Разблокированы:\n{achievements_text}")
+
+        messagebox.showinfo("Успех", "Запись успешно сохранена!")
+        self.clear_form()
+        self.refresh_views()
+
+    def refresh_views(self):
+        """Обновление вкладок, зависящих от записей"""
+        self.load_entries()
+        self.update_research_map()
+        self.update_competencies_profile()
+        self.load_achievements()
 
     def clear_form(self):
         """Очистка формы добавления записи"""
@@ -395,57 +449,45 @@ class AcademicTrackerApp:
             level_var.set('1')
 
     def load_entries(self):
-        """Загрузка записей в таблицу"""
-        # Очистка таблицы
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Получение данных из БД
-        entries = self.db.get_all_entries_with_keywords()
-
-        # Заполнение таблицы
-        for entry in entries:
-            entry_id, title, entry_type, date, description, authors, keywords = entry
-            short_desc = description[:50] + "..." if len(description) > 50 else description
-            keywords_display = keywords if keywords else "нет"
-
-            self.tree.insert("", "end", values=(
-                entry_id,
-                title,
-                entry_type,
-                date,
-                authors if authors else "нет",
-                keywords_display
-            ))
+        """Загрузка записей в таблицу (страницами по мере прокрутки)"""
+        def fetch_page(db, last_row, offset, limit):
+            after = (last_row[3], last_row[0]) if last_row else None
+            return db.get_entries_page(after, limit)
+
+        self.tree.load(fetch_page, self._entry_row_values)
 
     def search_entries(self):
         """Поиск записей"""
-        search_text = self.search_entry.get().strip().lower()
+        search_text = self.search_entry.get().strip()
         if not search_text:
             self.load_entries()
             return
 
-        # Очистка таблицы
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Поиск в БД
-        entries = self.db.search_entries(search_text)
-
-        # Заполнение таблицы
-        for entry in entries:
-            entry_id, title, entry_type, date, description, authors, keywords = entry
-            short_desc = description[:50] + "..." if len(description) > 50 else description
-            keywords_display = keywords if keywords else "нет"
+        # "автор: Иванов" - поиск записей по соавтору
+        if search_text.lower().startswith(AUTHOR_SEARCH_PREFIX):
+            author = search_text[len(AUTHOR_SEARCH_PREFIX):]
+            self.tree.load(lambda db, last_row, offset, limit: db.search_entries_by_author(author, limit, offset),
+                           self._entry_row_values)
+            return
 
-            self.tree.insert("", "end", values=(
-                entry_id,
-                title,
-                entry_type,
-                date,
-                authors if authors else "нет",
-                keywords_display
-            ))
+        # Поиск в БД страницами
+        self.tree.load(lambda db, last_row, offset, limit: db.search_entries(search_text, limit, offset),
+                       self._entry_row_values)
+
+    @staticmethod
+    def _entry_row_values(entry):
+        """Значения колонок таблицы для записи"""
+        entry_id, title, entry_type, date, description, authors, keywords = entry
+        keywords_display = keywords if keywords else "нет"
+
+        return (
+            entry_id,
+            title,
+            entry_type,
+            date,
+            authors if authors else "нет",
+            keywords_display
+        )
 
     def delete_selected_entry(self):
         """Удаление выбранной записи"""
@@ -458,17 +500,24 @@ class AcademicTrackerApp:
             item = self.tree.item(selected[0])
             entry_id = item['values'][0]
 
-            self.db.delete_entry(entry_id)
-            messagebox.showinfo("Успех", "Запись удалена")
-            self.load_entries()
-            self.update_research_map()
-            self.update_competencies_profile()
-            self.load_achievements()
+            def deleted(_):
+                messagebox.showinfo("Успех", "Запись удалена")
+                self.refresh_views()
+
+            self.executor.submit(lambda db, task: db.delete_entry(entry_id), on_done=deleted)
 
     def update_research_map(self):
         """Обновление исследовательской карты"""
+        self.executor.submit(
+            lambda db, task: (db.get_keywords_statistics(), db.get_authors_statistics(),
+                              db.get_coauthorship_graph(min_shared=2)),
+            on_done=self._show_research_map)
+
+    def _show_research_map(self, stats):
+        """Отображение статистики исследовательской карты"""
+        keywords_stats, authors_stats, coauthorship = stats
+
         # Ключевые слова
-        keywords_stats = self.db.get_keywords_statistics()
         self.keywords_text.delete("1.0", tk.END)
 
         if keywords_stats:
@@ -478,18 +527,25 @@ class AcademicTrackerApp:
             self.keywords_text.insert(tk.END, "Нет данных о ключевых словах\n")
 
         # Соавторы
-        authors_stats = self.db.get_authors_statistics()
         self.authors_text.delete("1.0", tk.END)
 
         if authors_stats:
             for author, count in authors_stats:
                 self.authors_text.insert(tk.END, f"{author} — {count} работ\n")
+
+            if coauthorship:
+                self.authors_text.insert(tk.END, "\nСовместные работы:\n")
+                for first, second, shared in coauthorship:
+                    self.authors_text.insert(tk.END, f"{first} и {second} — {shared}\n")
         else:
             self.authors_text.insert(tk.END, "Нет данных о соавторах\n")
 
     def load_achievements(self):
         """Загрузка достижений"""
-        achievements = self.db.get_achievements()
+        self.executor.submit(lambda db, task: db.get_achievements(), on_done=self._show_achievements)
+
+    def _show_achievements(self, achievements):
+        """Отображение достижений"""
         self.achievements_text.delete("1.0", tk.END)
 
         if achievements:
@@ -503,17 +559,23 @@ class AcademicTrackerApp:
 
     def check_new_achievements(self):
         """Проверка новых достижений"""
-        new_achievements = self.achievement_tracker.check_achievements()
-        if new_achievements:
-            messagebox.showinfo("Поздравляем!", f"Получены новые достижения!\n" + "\n".join(new_achievements))
-            self.load_achievements()
-        else:
-            messagebox.showinfo("Информация", "Новых достижений пока нет")
+        def checked(new_achievements):
+            if new_achievements:
+                messagebox.showinfo("Поздравляем!", f"Получены новые достижения!\n" + "\n".join(new_achievements))
+                self.load_achievements()
+            else:
+                messagebox.showinfo("Информация", "Новых достижений пока нет")
+
+        self.executor.submit(lambda db, task: AchievementTracker(db).check_achievements(), on_done=checked)
 
     def update_competencies_profile(self):
         """Обновление профиля компетенций"""
-        stats = self.db.get_competencies_statistics()
-        recommendations = self.db.get_recommendations()
+        self.executor.submit(lambda db, task: (db.get_competencies_statistics(), db.get_recommendations()),
+                             on_done=self._show_competencies_profile)
+
+    def _show_competencies_profile(self, profile):
+        """Отображение статистики компетенций и рекомендаций"""
+        stats, recommendations = profile
 
         # Статистика
         self.competencies_stats_text.delete("1.0", tk.END)
@@ -535,7 +597,10 @@ class AcademicTrackerApp:
 
     def load_goals(self):
         """Загрузка целей"""
-        goals = self.db.get_goals()
+        self.executor.submit(lambda db, task: db.get_goals(), on_done=self._show_goals)
+
+    def _show_goals(self, goals):
+        """Отображение целей"""
         self.goals_text.delete("1.0", tk.END)
 
         if goals:
@@ -559,7 +624,11 @@ class AcademicTrackerApp:
 
         try:
             target_value = int(target)
-            self.db.add_goal(goal_type, description, target_value)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Целевое значение должно быть числом!")
+            return
+
+        def added(_):
             messagebox.showinfo("Успех", "Цель добавлена")
             self.load_goals()
 
@@ -567,18 +636,19 @@ class AcademicTrackerApp:
             self.goal_desc_entry.delete(0, tk.END)
             self.goal_target_entry.delete(0, tk.END)
 
-        except ValueError:
-            messagebox.showerror("Ошибка", "Целевое значение должно быть числом!")
+        self.executor.submit(lambda db, task: db.add_goal(goal_type, description, target_value), on_done=added)
 
     def show_keywords_suggestions(self):
         """Показать подсказки по ключевым словам"""
-        keywords = self.db.get_all_keywords()
-        if keywords:
-            suggestions = ", ".join(keywords[:10])  # Первые 10 ключевых слов
-            messagebox.showinfo("Предыдущие ключевые слова",
-                                f"Используемые ранее:\n{suggestions}")
-        else:
-            messagebox.showinfo("Информация", "Ключевые слова еще не использовались")
+        def show(keywords):
+            if keywords:
+                suggestions = ", ".join(keywords[:10])  # Первые 10 ключевых слов
+                messagebox.showinfo("Предыдущие ключевые слова",
+                                    f"Используемые ранее:\n{suggestions}")
+            else:
+                messagebox.showinfo("Информация", "Ключевые слова еще не использовались")
+
+        self.executor.submit(lambda db, task: db.get_all_keywords(), on_done=show)
 
     def get_current_competencies(self):
         """Получение списка компетенций для текущей специальности"""
@@ -617,13 +687,47 @@ class AcademicTrackerApp:
         ttk.Button(dialog, text="Сохранить", command=save_specialty).pack(pady=20)
 
     def export_report(self):
-        """Экспорт отчета в Word"""
-        try:
-            filename = f"отчет_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-            self.exporter.export_to_word(filename)
+        """Экспорт отчета в Word в фоновом потоке с отображением прогресса"""
+        filename = f"отчет_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+
+        # Окно прогресса
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Экспорт отчёта")
+        progress_window.transient(self.root)
+        progress_label = ttk.Label(progress_window, text="Подготовка отчёта...")
+        progress_label.pack(padx=20, pady=(15, 5))
+        progress_bar = ttk.Progressbar(progress_window, length=300, mode='determinate')
+        progress_bar.pack(padx=20, pady=(0, 5))
+
+        def on_progress(done, total):
+            progress_bar['maximum'] = max(total, 1)
+            progress_bar['value'] = done
+            progress_label.config(text=f"Записей обработано: {done} из {total}")
+
+        def close_window():
+            # Окно могло быть уже закрыто кнопкой "Отменить"
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+
+        def on_done(_):
+            close_window()
             messagebox.showinfo("Успех", f"Отчёт сохранён в файл:\n{filename}")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось создать отчёт: {str(e)}")
+
+        def on_error(error):
+            close_window()
+            messagebox.showerror("Ошибка", f"Не удалось создать отчёт: {error}")
+
+        # on_cancel - экспорт отменён кнопкой в строке состояния (отмена всех задач)
+        task = self.executor.submit(
+            lambda db, task: ReportExporter(db).export_to_word(filename, task.report_progress),
+            on_done=on_done, on_error=on_error, on_progress=on_progress, on_cancel=close_window)
+
+        def cancel():
+            task.cancel()
+            close_window()
+
+        ttk.Button(progress_window, text="Отменить", command=cancel).pack(pady=(0, 15))
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
 
     def load_competencies(self):
         """Загрузка компетенций из JSON файла"""
@@ -641,4 +745,5 @@ class AcademicTrackerApp:
 
     def update_achievements(self):
         """Проверка достижений при запуске"""
-        self.achievement_tracker.check_achievements()
\ No newline at end of file
+        self.executor.submit(lambda db, task: AchievementTracker(db).check_achievements(),
+                             on_done=lambda new: new and self.load_achievements())
\ No newline at end of file
@@ -0,0 +1,159 @@
+import queue
+import threading
+from database import Database
+
+
+class TaskCancelled(Exception):
+    """Задача отменена пользователем"""
+
+
+class Task:
+    """Фоновая задача: func(db, task) выполняется в рабочем потоке со своим соединением"""
+
+    def __init__(self, executor, func, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        self.func = func
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self._executor = executor
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Отмена: ещё не начатая задача не запустится, начатая остановится на check_cancelled"""
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        """Прерывание выполнения, если задачу отменили"""
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def report_progress(self, *args):
+        """Передача прогресса в поток Tk (подходит как progress_callback)"""
+        self.check_cancelled()
+        self._executor._events.put((self, 'progress', args))
+
+
+class TaskExecutor:
+    """Пул рабочих потоков для запросов к БД и экспорта
+
+    Результаты складываются в очередь, которую поток Tk опрашивает через root.after,
+    поэтому колбэки on_done/on_error/on_progress/on_cancel вызываются в потоке интерфейса.
+    Схема базы db_name должна быть подготовлена до создания пула (Database(db_name) в потоке Tk).
+    """
+
+    def __init__(self, root, db_name, workers=2, poll_interval=100, on_busy=None, on_error=None):
+        self.root = root
+        self.db_name = db_name
+        self.poll_interval = poll_interval
+        self.on_busy = on_busy
+        self.on_error = on_error
+
+        self._tasks = queue.Queue()
+        self._events = queue.Queue()
+        self._active = set()
+        self._poll_id = None
+
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def submit(self, func, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        """Постановка задачи в очередь, возвращает Task для отмены"""
+        task = Task(self, func, on_done, on_error, on_progress, on_cancel)
+        self._active.add(task)
+        if len(self._active) == 1:
+            self._set_busy(True)
+        self._tasks.put(task)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self.poll)
+        return task
+
+    def cancel_all(self):
+        """Отмена всех незавершённых задач"""
+        for task in self._active:
+            task.cancel()
+
+    def poll(self):
+        """Обработка результатов задач в потоке Tk"""
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    task, kind, value = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                self._dispatch(task, kind, value)
+        finally:
+            if self._active:
+                self._poll_id = self.root.after(self.poll_interval, self.poll)
+
+    def _dispatch(self, task, kind, value):
+        """Вызов колбэка задачи; у отменённых задач результат отбрасывается и вызывается on_cancel"""
+        if kind == 'progress':
+            if task.on_progress and not task.cancelled:
+                task.on_progress(*value)
+            return
+
+        self._active.discard(task)
+        if not self._active:
+            self._set_busy(False)
+
+        if task.cancelled:
+            if task.on_cancel:
+                task.on_cancel()
+            return
+        if kind == 'done':
+            if task.on_done:
+                task.on_done(value)
+        else:
+            handler = task.on_error or self.on_error
+            if handler:
+                handler(value)
+
+    def _set_busy(self, busy):
+        if self.on_busy:
+            self.on_busy(busy)
+
+    def _work(self):
+        """Цикл рабочего потока"""
+        # Соединение SQLite нельзя использовать из другого потока - у каждого потока своё.
+        # Схему уже подготовил поток Tk до создания пула, рабочие потоки только подключаются
+        db = Database(self.db_name, setup_schema=False)
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                if task.cancelled:
+                    self._events.put((task, 'cancelled', None))
+                    continue
+
+                try:
+                    self._events.put((task, 'done', task.func(db, task)))
+                except TaskCancelled:
+                    self._events.put((task, 'cancelled', None))
+                except Exception as e:
+                    self._events.put((task, 'error', e))
+        finally:
+            db.close()
+
+    def shutdown(self, timeout=5):
+        """Отмена задач, остановка потоков и закрытие их соединений"""
+        self.cancel_all()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
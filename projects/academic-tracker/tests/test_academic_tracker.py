@@ -0,0 +1,538 @@
+"""
+Тесты для Личного трекера академической школы
+"""
+import pytest
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, MIGRATIONS
+from tasks import TaskExecutor
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Временная база данных"""
+    database = Database(str(tmp_path / "portfolio.db"))
+    yield database
+    database.close()
+
+
+class TestTransactions:
+    def test_add_entry_full_saves_links(self, db):
+        """Запись сохраняется вместе с ключевыми словами и компетенциями"""
+        entry_id = db.add_entry_full(
+            ("Статья", "Публикация", "2024-03-01", "Описание", "Иванов"),
+            ["SQL", "Python"],
+            [("Базы данных", 4), ("Программирование", 5)]
+        )
+
+        entries = db.get_all_entries_with_keywords()
+        assert entries[0][0] == entry_id
+        assert set(entries[0][6].split(', ')) == {"SQL", "Python"}
+        assert len(db.get_competencies_statistics()) == 2
+
+    def test_transaction_rolls_back_on_error(self, db):
+        """При ошибке внутри transaction() изменения откатываются"""
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.add_entry("Черновик", "Проект", "2024-01-01", "", "")
+                raise RuntimeError("сбой")
+
+        assert db.get_all_entries() == []
+
+    def test_import_entries_bulk(self, db):
+        """Массовый импорт связывает каждую запись со своими ключевыми словами"""
+        rows = [
+            (f"Запись {i}", "Проект", "2024-01-01", "", "", [f"kw{i % 7}"], [("Анализ данных", 3)])
+            for i in range(1200)
+        ]
+        assert db.import_entries(rows, batch_size=500) == 1200
+
+        db.cursor.execute('''
+            SELECT e.название, k.keyword FROM entries e
+            JOIN entry_keywords ek ON ek.entry_id = e.id
+            JOIN keywords k ON k.id = ek.keyword_id
+            WHERE e.название = 'Запись 999'
+        ''')
+        assert db.cursor.fetchall() == [("Запись 999", "kw5")]
+        assert dict(db.get_keywords_statistics())["kw0"] == 172
+
+
+class TestFullTextSearch:
+    def test_search_is_case_insensitive_for_cyrillic(self, db):
+        """Поиск не зависит от регистра кириллицы"""
+        db.add_entry("Нейронные сети", "Проект", "2024-01-01", "", "")
+        assert len(db.search_entries("НЕЙРОННЫЕ")) == 1
+
+    def test_search_by_prefix_and_keyword(self, db):
+        """Слова ищутся по префиксу, в том числе среди ключевых слов"""
+        db.add_entry_full(("Отчёт", "Практика", "2024-01-01", "", ""), ["Кластеризация"], [])
+        assert len(db.search_entries("класт")) == 1
+
+    def test_search_ranks_title_matches_first(self, db):
+        """Совпадения в названии ранжируются выше совпадений в описании"""
+        db.add_entry("Обзор", "Публикация", "2024-05-01", "Про графы и алгоритмы", "")
+        db.add_entry("Графы", "Публикация", "2024-01-01", "", "")
+        assert db.search_entries("графы")[0][1] == "Графы"
+
+    def test_index_follows_updates_and_deletes(self, db):
+        """Индекс синхронизируется триггерами при изменении и удалении"""
+        entry_id = db.add_entry_full(("Доклад", "Конференция", "2024-01-01", "", ""), ["SQL"], [])
+        db.delete_entry(entry_id)
+        assert db.search_entries("доклад") == []
+        assert db.search_entries("sql") == []
+
+
+class TestAchievements:
+    def test_counters_follow_inserts_and_deletes(self, db):
+        """Счётчики обновляются триггерами при вставке и удалении"""
+        first = db.add_entry("А", "Проект", "2023-02-01", "12345", "Иванов")
+        db.add_entry("Б", "Грант", "2023-03-01", "123", "")
+        db.delete_entry(first)
+
+        counters = db.get_entry_counters(2023)
+        assert counters == {
+            'entries': 1,
+            'coauthored': 0,
+            'description_length': 3,
+            'distinct_types': 1,
+            'entries_this_year': 1
+        }
+
+    def test_counters_match_bulk_import(self, db):
+        """Массовый импорт учитывается в счётчиках"""
+        rows = [(f"З{i}", ["Проект", "Грант", "Практика"][i % 3], "2022-01-01", "ab", "Петров", [], [])
+                for i in range(30)]
+        db.import_entries(rows)
+
+        assert db.count_entries_with_authors() == 30
+        assert db.get_entry_types_count() == 3
+        assert db.get_total_description_length() == 60
+
+    def test_rules_unlock_once(self, db):
+        """Правила разблокируют достижения один раз"""
+        from achievements import AchievementTracker
+
+        tracker = AchievementTracker(db)
+        db.add_entry("Первая", "Проект", "2020-01-01", "", "")
+        assert tracker.check_achievements() == ["Первый шаг"]
+        assert tracker.check_achievements() == []
+
+
+class TestPagination:
+    def test_pages_cover_all_entries_in_order(self, db):
+        """Keyset-страницы покрывают все записи без пропусков и повторов"""
+        rows = [(f"З{i}", "Проект", f"2024-01-{i % 28 + 1:02d}", "", "", [f"kw{i}"], []) for i in range(250)]
+        db.import_entries(rows)
+
+        pages = []
+        after = None
+        while True:
+            page = db.get_entries_page(after, limit=40)
+            if not page:
+                break
+            pages.extend(page)
+            after = (page[-1][3], page[-1][0])
+
+        expected = sorted(db.get_all_entries_with_keywords(), key=lambda row: (row[3], row[0]), reverse=True)
+        assert pages == expected
+
+    def test_search_pages_with_offset(self, db):
+        """Поиск возвращает результаты страницами"""
+        db.import_entries([(f"Отчёт {i}", "Практика", "2024-01-01", "", "", [], []) for i in range(30)])
+
+        first = db.search_entries("отчёт", limit=20)
+        second = db.search_entries("отчёт", limit=20, offset=20)
+        assert len(first) == 20 and len(second) == 10
+        assert not {row[0] for row in first} & {row[0] for row in second}
+
+    def test_iter_entries_streams_all_rows(self, db):
+        """Потоковое чтение отдаёт те же записи, что и полный список"""
+        db.import_entries([(f"З{i}", "Проект", "2024-02-01", "", "", ["kw"], []) for i in range(120)])
+
+        streamed = list(db.iter_entries_with_keywords(chunk_size=25))
+        assert sorted(streamed) == sorted(db.get_all_entries_with_keywords())
+
+
+class TestMigrations:
+    def test_new_database_is_at_latest_version(self, db):
+        """Новая БД сразу получает все миграции"""
+        assert db.get_schema_version() == MIGRATIONS[-1][0]
+
+    def test_legacy_database_is_migrated(self, tmp_path):
+        """Старая БД без индексов мигрирует с сохранением данных"""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute('''
+            CREATE TABLE entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                название TEXT NOT NULL,
+                тип TEXT NOT NULL,
+                дата DATE NOT NULL,
+                описание TEXT,
+                соавторы TEXT
+            )
+        ''')
+        conn.execute("INSERT INTO entries (название, тип, дата, описание, соавторы) "
+                     "VALUES ('Старая', 'Грант', '2021-05-05', 'текст', 'Иванов, Петров')")
+        conn.commit()
+        conn.close()
+
+        db = Database(path)
+        try:
+            assert db.get_schema_version() == MIGRATIONS[-1][0]
+            assert db.get_entries_by_year(2021) == 1
+            assert db.search_entries("старая")[0][1] == "Старая"
+            assert db.get_entry_counters(2021)['entries_this_year'] == 1
+            assert db.get_coauthors("Петров") == [("Иванов", 1)]
+        finally:
+            db.close()
+
+
+class TestQueryPlans:
+    # Полный перебор таблиц, растущих вместе с числом записей
+    FULL_SCAN = re.compile(r'^SCAN (entries|e|entry_keywords|ek|entry_competencies|ec)$')
+
+    QUERIES = [
+        ('get_all_entries', ()),
+        ('get_all_entries_with_keywords', ()),
+        ('get_entries_page', (None, 50)),
+        ('get_entries_page', (('2020-06-01', 500), 50)),
+        ('search_entries', ('отчёт',)),
+        ('delete_entry', (7,)),
+        ('get_all_keywords', ()),
+        ('get_keywords_statistics', ()),
+        ('get_authors_statistics', ()),
+        ('count_entries_with_authors', ()),
+        ('get_coauthors', ('Автор 3',)),
+        ('search_entries_by_author', ('Автор 3', 20)),
+        ('get_total_description_length', ()),
+        ('get_entry_types_count', ()),
+        ('get_entries_by_year', (2020,)),
+        ('get_competencies_statistics', ()),
+        ('get_recommendations', ()),
+        ('get_achievements', ()),
+        ('get_unlocked_achievements', ()),
+        ('get_goals', ()),
+    ]
+
+    @pytest.fixture
+    def filled_db(self, db):
+        """БД с данными и собранной статистикой ANALYZE"""
+        db.import_entries([
+            (f"Отчёт {i}", ["Проект", "Грант", "Практика"][i % 3], f"{2000 + i % 25}-0{i % 9 + 1}-15", "текст",
+             f"Автор {i % 40}, Автор {i % 7}" if i % 2 else "", [f"kw{i % 50}"], [(f"Комп {i % 10}", i % 5 + 1)])
+            for i in range(3000)
+        ])
+        db.cursor.execute("ANALYZE")
+        return db
+
+    def query_plans(self, db, method, args):
+        """Планы всех запросов, выполненных методом Database"""
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        try:
+            getattr(db, method)(*args)
+        finally:
+            db.conn.set_trace_callback(None)
+
+        plans = {}
+        for sql in dict.fromkeys(statements):
+            if sql.lstrip().upper().startswith(('SELECT', 'DELETE', 'UPDATE')):
+                plans[sql] = [row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        return plans
+
+    @pytest.mark.parametrize('method, args', QUERIES)
+    def test_no_full_scans(self, filled_db, method, args):
+        """Запросы класса не перебирают большие таблицы без индекса"""
+        plans = self.query_plans(filled_db, method, args)
+        assert plans
+        for sql, plan in plans.items():
+            assert not [step for step in plan if self.FULL_SCAN.match(step)], (sql, plan)
+
+    def test_year_filter_uses_generated_column_index(self, filled_db):
+        """Фильтр по году использует индекс по вычисляемой колонке"""
+        plans = self.query_plans(filled_db, 'get_entries_by_year', (2020,))
+        assert any('idx_entries_year' in step for plan in plans.values() for step in plan)
+
+    def test_keyset_page_seeks_date_index(self, filled_db):
+        """Следующая страница ищется по индексу даты, а не перебором"""
+        plans = self.query_plans(filled_db, 'get_entries_page', (('2020-06-01', 500), 50))
+        assert any(step.startswith('SEARCH e USING INDEX idx_entries_date')
+                   for plan in plans.values() for step in plan)
+
+
+class TestStatistics:
+    def fill(self, db):
+        """Записи с ключевыми словами, соавторами и компетенциями"""
+        db.add_entry_full(("А", "Проект", "2024-01-01", "", "Иванов"), ["SQL", "Python"], [("Базы данных", 2)])
+        db.add_entry_full(("Б", "Грант", "2024-01-02", "", "Иванов"), ["SQL"], [("Базы данных", 4)])
+        return db.add_entry_full(("В", "Проект", "2024-01-03", "", "Петров"), ["ML"], [("Анализ данных", 1)])
+
+    def test_materialized_statistics_follow_writes(self, db):
+        """Триггеры поддерживают статистику при добавлении и удалении"""
+        last_id = self.fill(db)
+        db.delete_entry(last_id)
+
+        assert db.get_keywords_statistics()[0] == ("SQL", 2)
+        assert dict(db.get_keywords_statistics()) == {"SQL": 2, "Python": 1}
+        assert db.get_authors_statistics() == [("Иванов", 2)]
+        assert db.get_competencies_statistics() == [("Базы данных", 3.0, 2)]
+        assert db.get_recommendations() == []
+
+    def test_verify_statistics_repairs_drift(self, db):
+        """Проверка находит расхождения и пересчитывает статистику"""
+        self.fill(db)
+        assert db.verify_statistics() == {'keyword_stats': 0, 'competency_stats': 0, 'author_stats': 0}
+
+        db.cursor.execute("UPDATE keyword_stats SET count = 100")
+        db.cursor.execute("DELETE FROM author_stats")
+        db.conn.commit()
+
+        mismatches = db.verify_statistics()
+        assert mismatches['keyword_stats'] > 0 and mismatches['author_stats'] > 0
+        assert not any(db.verify_statistics(repair=False).values())
+        assert dict(db.get_keywords_statistics())["SQL"] == 2
+
+
+class TestCoauthors:
+    def test_authors_are_split_into_people(self, db):
+        """Строка соавторов разбирается на отдельных людей без учёта порядка"""
+        db.add_entry_full(("А", "Проект", "2024-01-01", "", "Иванов, Петров"))
+        db.add_entry_full(("Б", "Грант", "2024-01-02", "", " Петров ,Иванов,"))
+        db.add_entry_full(("В", "Проект", "2024-01-03", "", "Сидоров, Иванов"))
+
+        assert db.get_authors_statistics() == [("Иванов", 3), ("Петров", 2), ("Сидоров", 1)]
+        assert db.get_coauthors("Иванов") == [("Петров", 2), ("Сидоров", 1)]
+        assert db.get_coauthorship_graph(min_shared=2) == [("Иванов", "Петров", 2)]
+
+    def test_search_by_author_prefix(self, db):
+        """Поиск по автору находит записи по началу имени"""
+        db.add_entry_full(("А", "Проект", "2024-01-01", "", "Иванов, Петров"))
+        db.add_entry_full(("Б", "Грант", "2024-01-02", "", "Иванова"))
+        db.add_entry_full(("В", "Проект", "2024-01-03", "", "Петров"))
+
+        assert [row[1] for row in db.search_entries_by_author("Иванов")] == ["Б", "А"]
+        assert [row[1] for row in db.search_entries_by_author("Петров", limit=1, offset=1)] == ["А"]
+        assert db.search_entries_by_author("  ") == []
+
+    def test_delete_entry_removes_author_links(self, db):
+        """Удаление записи убирает её из статистики соавторов"""
+        entry_id = db.add_entry_full(("А", "Проект", "2024-01-01", "", "Иванов, Петров"))
+        db.add_entry_full(("Б", "Грант", "2024-01-02", "", "Иванов"))
+        db.delete_entry(entry_id)
+
+        assert db.get_authors_statistics() == [("Иванов", 1)]
+        assert db.get_coauthors("Иванов") == []
+        assert not any(db.verify_statistics(repair=False).values())
+
+
+class FakeRoot:
+    """Замена Tk: after только запоминает запланированный опрос"""
+
+    def after(self, delay, callback):
+        return callback
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class TestTaskExecutor:
+    @pytest.fixture
+    def executor(self, db):
+        busy = []
+        executor = TaskExecutor(FakeRoot(), db.db_name, on_busy=busy.append)
+        executor.busy_log = busy
+        yield executor
+        executor.shutdown()
+
+    def wait(self, executor, timeout=5):
+        """Опрос очереди результатов, как это делает root.after"""
+        deadline = time.monotonic() + timeout
+        while executor.busy and time.monotonic() < deadline:
+            executor.poll()
+            time.sleep(0.01)
+        assert not executor.busy
+
+    def test_tasks_run_in_workers_with_own_connection(self, db, executor):
+        """Задача выполняется в рабочем потоке со своим соединением, результат приходит в poll"""
+        results = []
+        executor.submit(
+            lambda worker_db, task: (threading.current_thread() is not threading.main_thread(),
+                                     worker_db is not db,
+                                     worker_db.add_entry("А", "Проект", "2024-01-01", "", "")),
+            on_done=results.append)
+        self.wait(executor)
+
+        assert results == [(True, True, 1)]
+        assert executor.busy_log == [True, False]
+        assert len(db.get_all_entries()) == 1
+
+    def test_workers_skip_schema_setup(self, db, monkeypatch):
+        """Рабочие потоки только подключаются: схему и миграции готовит поток Tk"""
+        setup_threads = []
+        monkeypatch.setattr(Database, 'migrate', lambda self: setup_threads.append(threading.current_thread()))
+        executor = TaskExecutor(FakeRoot(), db.db_name)
+        try:
+            results = []
+            executor.submit(lambda worker_db, task: worker_db.add_entry("А", "Проект", "2024-01-01", "", ""),
+                            on_done=results.append)
+            self.wait(executor)
+        finally:
+            executor.shutdown()
+
+        assert results == [1]
+        assert setup_threads == []
+
+    def test_errors_go_to_handler(self, executor):
+        """Исключение задачи передаётся в on_error в потоке опроса"""
+        errors = []
+        executor.submit(lambda db, task: 1 / 0, on_error=errors.append)
+        self.wait(executor)
+        assert isinstance(errors[0], ZeroDivisionError)
+
+    def test_cancel_stops_running_task(self, executor):
+        """Отменённая задача останавливается на report_progress и не вызывает on_done"""
+        started = threading.Event()
+        progress, results = [], []
+
+        def work(db, task):
+            task.report_progress(1, 10)
+            started.set()
+            while True:
+                task.report_progress(2, 10)
+                time.sleep(0.01)
+
+        task = executor.submit(work, on_done=results.append, on_progress=lambda *args: progress.append(args))
+        assert started.wait(5)
+        executor.poll()
+        task.cancel()
+        self.wait(executor)
+
+        assert progress[0] == (1, 10)
+        assert results == []
+
+    def test_cancel_all_reports_cancelled_export(self, executor):
+        """Отмена всех задач во время экспорта вызывает on_cancel (закрытие окна прогресса)"""
+        started = threading.Event()
+        results, cancelled = [], []
+
+        def export(db, task):
+            started.set()
+            for done in range(1000):
+                task.report_progress(done, 1000)
+                time.sleep(0.01)
+
+        executor.submit(export, on_done=results.append, on_cancel=lambda: cancelled.append(True))
+        assert started.wait(5)
+        executor.cancel_all()
+        self.wait(executor)
+
+        assert cancelled == [True]
+        assert results == []
+
+    def test_cancel_before_start_calls_on_cancel(self, executor):
+        """Задача, отменённая до запуска, тоже сообщает об отмене"""
+        release = threading.Event()
+        cancelled = []
+        executor.submit(lambda db, task: release.wait(5))
+        executor.submit(lambda db, task: release.wait(5))
+        waiting = executor.submit(lambda db, task: None, on_cancel=lambda: cancelled.append(True))
+        waiting.cancel()
+        release.set()
+        self.wait(executor)
+
+        assert cancelled == [True]
+
+
+@pytest.fixture
+def tk_root():
+    """Скрытое окно Tk; без дисплея тесты виджетов пропускаются"""
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("нет дисплея для Tk")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+class TestPagedTreeview:
+    @pytest.fixture
+    def executor(self, db):
+        executor = TaskExecutor(FakeRoot(), db.db_name)
+        yield executor
+        executor.shutdown()
+
+    def wait(self, executor, timeout=5):
+        deadline = time.monotonic() + timeout
+        while executor.busy and time.monotonic() < deadline:
+            executor.poll()
+            time.sleep(0.01)
+        assert not executor.busy
+
+    def test_cancel_all_during_paging_keeps_loading(self, db, executor, tk_root):
+        """После отмены всех задач подгрузка страницы не блокируется"""
+        from widgets import PagedTreeview
+
+        for day in range(1, 6):
+            db.add_entry(f"Запись {day}", "Проект", f"2024-01-0{day}", "", "")
+
+        release = threading.Event()
+
+        def fetch_page(worker_db, last_row, offset, limit):
+            release.wait(5)
+            after = (last_row[3], last_row[0]) if last_row else None
+            return worker_db.get_entries_page(after, limit)
+
+        tree = PagedTreeview(tk_root, executor, page_size=2, columns=("id",))
+        tree.load(fetch_page, lambda row: (row[0],))
+        executor.cancel_all()
+        release.set()
+        self.wait(executor)
+        assert tree.get_children() == ()
+
+        tree.load_more()
+        self.wait(executor)
+        assert len(tree.get_children()) == 2
+
+    def test_window_keeps_max_pages(self, db, executor, tk_root):
+        """В списке не больше max_pages страниц, удалённые страницы перечитываются при прокрутке назад"""
+        from widgets import PagedTreeview
+
+        for day in range(1, 8):
+            db.add_entry(f"Запись {day}", "Проект", f"2024-01-0{day}", "", "")
+
+        def fetch_page(worker_db, last_row, offset, limit):
+            after = (last_row[3], last_row[0]) if last_row else None
+            return worker_db.get_entries_page(after, limit)
+
+        tree = PagedTreeview(tk_root, executor, page_size=2, max_pages=2, columns=("id",))
+
+        def shown():
+            return [int(tree.item(item, "values")[0]) for item in tree.get_children()]
+
+        tree.load(fetch_page, lambda row: (row[0],))
+        self.wait(executor)
+        for _ in range(3):
+            tree.load_more()
+            self.wait(executor)
+        assert shown() == [3, 2, 1]
+
+        tree.load_previous()
+        self.wait(executor)
+        assert shown() == [5, 4, 3, 2]
+        tree.load_previous()
+        self.wait(executor)
+        assert shown() == [7, 6, 5, 4]
+
+        tree.load_more()
+        self.wait(executor)
+        assert shown() == [5, 4, 3, 2]
@@ -0,0 +1,146 @@
+from tkinter import ttk
+
+
+class PagedTreeview(ttk.Treeview):
+    """Treeview, который загружает строки страницами по мере прокрутки
+
+    Страницы читаются в фоновом потоке через TaskExecutor. В списке держится
+    не больше max_pages страниц: страницы, далёкие от видимой области, удаляются
+    и перечитываются с того же места (ключа или смещения) при прокрутке назад.
+    """
+
+    def __init__(self, master, executor, page_size=200, max_pages=5, **kwargs):
+        super().__init__(master, **kwargs)
+        self.executor = executor
+        self.page_size = page_size
+        self.max_pages = max_pages
+        # Доля прокрутки, после которой подгружается следующая страница
+        self.prefetch_at = 0.9
+
+        self._fetch_page = None
+        self._format_row = None
+        # Загруженные страницы: (строка перед страницей, смещение, элементы, последняя строка)
+        self._pages = []
+        # Начала страниц, удалённых над окном, - от первой к последней
+        self._dropped_above = []
+        self._last_row = None
+        self._loaded = 0
+        self._has_more = False
+        self._pending = None
+        self._task = None
+        self._scrollbar_set = None
+
+        super().configure(yscrollcommand=self._on_yscroll)
+
+    def attach_scrollbar(self, scrollbar):
+        """Подключение вертикальной полосы прокрутки"""
+        self._scrollbar_set = scrollbar.set
+
+    def load(self, fetch_page, format_row):
+        """Смена источника данных и загрузка первой страницы
+
+        fetch_page(db, last_row, offset, limit) возвращает строки из БД после last_row
+        (на позиции offset), format_row(row) - значения колонок для строки
+        """
+        self._cancel_pending()
+        self.delete(*self.get_children())
+
+        self._fetch_page = fetch_page
+        self._format_row = format_row
+        self._pages = []
+        self._dropped_above = []
+        self._last_row = None
+        self._loaded = 0
+        self._has_more = True
+        self.load_more()
+
+    def load_more(self):
+        """Запрос следующей страницы в фоновом потоке"""
+        self._pending = None
+        if not self._has_more or self._fetch_page is None or self._task is not None:
+            return
+        start = (self._last_row, self._loaded)
+        self._request(start, lambda rows: self._append_rows(rows, start))
+
+    def load_previous(self):
+        """Повторное чтение страницы, удалённой над окном"""
+        self._pending = None
+        if not self._dropped_above or self._fetch_page is None or self._task is not None:
+            return
+        start = self._dropped_above[-1]
+        self._request(start, lambda rows: self._prepend_rows(rows, start))
+
+    def _request(self, start, on_done):
+        """Чтение страницы, начинающейся после start = (строка, смещение)"""
+        fetch_page, limit = self._fetch_page, self.page_size
+        last_row, offset = start
+        self._task = task = self.executor.submit(lambda db, task: fetch_page(db, last_row, offset, limit),
+                                                 on_done=on_done, on_error=self._on_fetch_error,
+                                                 on_cancel=lambda: self._on_fetch_cancelled(task))
+
+    def _append_rows(self, rows, start):
+        """Добавление загруженной страницы в конец списка"""
+        self._task = None
+        if rows:
+            items = [self.insert("", "end", values=self._format_row(row)) for row in rows]
+            self._pages.append((*start, items, rows[-1]))
+            self._last_row = rows[-1]
+            self._loaded = start[1] + len(rows)
+        self._has_more = len(rows) == self.page_size
+
+        if len(self._pages) > self.max_pages:
+            row_before, offset, items, _ = self._pages.pop(0)
+            self._dropped_above.append((row_before, offset))
+            self.delete(*items)
+            # Строки над видимой областью исчезли - возвращаем её на прежние записи
+            self.yview_scroll(-len(items), 'units')
+
+    def _prepend_rows(self, rows, start):
+        """Возврат удалённой страницы в начало списка"""
+        self._task = None
+        self._dropped_above.pop()
+        items = [self.insert("", index, values=self._format_row(row)) for index, row in enumerate(rows)]
+        self._pages.insert(0, (*start, items, rows[-1] if rows else start[0]))
+        self.yview_scroll(len(items), 'units')
+
+        if len(self._pages) > self.max_pages:
+            _, _, items, _ = self._pages.pop()
+            self.delete(*items)
+            # Нижняя страница перечитывается по ключу последней оставшейся строки
+            _, offset, items, last_row = self._pages[-1]
+            self._last_row = last_row
+            self._loaded = offset + len(items)
+            self._has_more = True
+
+    def _on_yscroll(self, first, last):
+        """Передача позиции полосе прокрутки и подгрузка у краёв списка"""
+        if self._scrollbar_set:
+            self._scrollbar_set(first, last)
+
+        if self._pending is not None or self._task is not None:
+            return
+        if self._has_more and float(last) >= self.prefetch_at:
+            self._pending = self.after_idle(self.load_more)
+        elif self._dropped_above and float(first) <= 1 - self.prefetch_at:
+            self._pending = self.after_idle(self.load_previous)
+
+    def _on_fetch_error(self, error):
+        """Ошибка чтения: подгрузка прекращается, ошибка передаётся обработчику пула"""
+        self._task = None
+        self._has_more = False
+        if self.executor.on_error:
+            self.executor.on_error(error)
+
+    def _on_fetch_cancelled(self, task):
+        """Страницу отменили извне (например, отмена всех задач): следующая прокрутка запросит её снова"""
+        if self._task is task:
+            self._task = None
+
+    def _cancel_pending(self):
+        """Отмена запланированной и уже запущенной подгрузки"""
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
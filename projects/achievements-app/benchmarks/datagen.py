@@ -0,0 +1,33 @@
+"""
+Генератор синтетической базы достижений
+"""
+import random
+import sqlite3
+
+from src import database
+
+TYPES = ["Олимпиада", "Сертификат", "Проект", "Экзамен", "Конференция",
+         "Конкурс", "Научная работа", "Курс", "Публикация", "Творческий проект"]
+LEVELS = ["Школьный", "Городской", "Региональный", "Всероссийский", "Международный", "Другой"]
+
+
+def generate_achievements(count: int, seed: int = 42):
+    """Строки (название, дата, тип, уровень, описание) для таблицы достижения"""
+    rnd = random.Random(seed)
+    for i in range(count):
+        yield (f"Достижение {i}", f"{rnd.randint(2010, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+               rnd.choice(TYPES), rnd.choice(LEVELS), "Описание достижения. " * rnd.randint(0, 10))
+
+
+def fill_db(db_path: str, count: int, seed: int = 42) -> None:
+    """Создание таблицы и вставка достижений одной транзакцией"""
+    database.init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO достижения (название, дата, тип, уровень, описание) VALUES (?, ?, ?, ?, ?)",
+                generate_achievements(count, seed)
+            )
+    finally:
+        conn.close()
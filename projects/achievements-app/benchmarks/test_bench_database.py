@@ -0,0 +1,37 @@
+"""
+Бенчмарки функций src.database на синтетической базе
+"""
+import itertools
+
+import pytest
+
+from src import database
+from datagen import fill_db
+
+
+@pytest.fixture(scope='session')
+def db_path(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('bench') / "достижения.db")
+    fill_db(path, request.config.getoption('--bench-size'))
+    return path
+
+
+@pytest.mark.benchmark(group='чтение')
+def test_load_all_achievements(benchmark, db_path):
+    benchmark(database.load_all_achievements, db_path)
+
+
+@pytest.mark.benchmark(group='запись')
+class TestWrites:
+    def test_init_db(self, benchmark, db_path):
+        benchmark(database.init_db, db_path)
+
+    def test_save_achievement(self, benchmark, db_path):
+        names = (f"Новое достижение {i}" for i in itertools.count())
+        benchmark(lambda: database.save_achievement(next(names), "2024-03-15", "Олимпиада", "Городской",
+                                                    "Описание", db_path))
+
+    def test_delete_achievement(self, benchmark, db_path):
+        # Удаляются достижения, созданные генератором: id с 1 подряд
+        ids = itertools.count(1)
+        benchmark.pedantic(lambda: database.delete_achievement(next(ids), db_path), rounds=200)
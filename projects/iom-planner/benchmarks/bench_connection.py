@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк: задержка одного вызова при соединении на каждый вызов
+и при долгоживущем соединении потока (database.get_connection).
+
+Запуск: python benchmarks/bench_connection.py [--goals 50000] [--calls 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import database
+
+
+def fill_db(db_path: str, goals: int) -> None:
+    """Заполнение базы синтетическими целями с навыками и компетенциями"""
+    database.init_db(db_path)
+    rnd = random.Random(42)
+    types = ['Курс', 'Проект', 'Самообразование', 'Семинар', 'Другое']
+    statuses = ['Новая', 'В процессе', 'Завершена', 'Отменена']
+
+    conn = database.get_connection(db_path)
+    with conn:
+        conn.executemany("INSERT INTO навыка (название) VALUES (?)",
+                         [(f"Навык {i}",) for i in range(200)])
+        conn.executemany("INSERT INTO компетенции (название, категория) VALUES (?, ?)",
+                         [(f"Компетенция {i}", "Общие") for i in range(20)])
+        conn.executemany('''
+            INSERT INTO цели (название, тип, статус, план_дата, факт_дата, темп, описание)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(f"Цель {i}", rnd.choice(types), rnd.choice(statuses),
+               "2025-06-01", "2025-05-20", "", "Описание") for i in range(goals)])
+        conn.executemany("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)",
+                         [(i, rnd.randint(1, 200)) for i in range(1, goals + 1)])
+        conn.executemany('''
+            INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень) VALUES (?, ?, ?)
+        ''', [(i, rnd.randint(1, 20), rnd.randint(1, 5)) for i in range(1, goals + 1)])
+
+
+def legacy_get_goal_by_id(db_path: str, goal_id: int):
+    """Прежняя схема: новое соединение на каждый вызов"""
+    with sqlite3.connect(db_path) as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM цели WHERE id = ?", (goal_id,))
+        return c.fetchone()
+
+
+def legacy_get_goal_skills(db_path: str, goal_id: int):
+    """Прежняя схема: новое соединение на каждый вызов"""
+    with sqlite3.connect(db_path) as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT н.название
+            FROM навыка н
+            JOIN цель_навыки цн ON н.id = цн.навык_id
+            WHERE цн.цель_id = ?
+        ''', (goal_id,))
+        return [row[0] for row in c.fetchall()]
+
+
+def measure(func, db_path: str, ids) -> float:
+    """Средняя задержка одного вызова в микросекундах"""
+    start = time.perf_counter()
+    for goal_id in ids:
+        func(db_path, goal_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--goals', type=int, default=50000)
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        fill_db(db_path, args.goals)
+        ids = [random.randint(1, args.goals) for _ in range(args.calls)]
+
+        cases = [
+            ("get_goal_by_id", legacy_get_goal_by_id, database.get_goal_by_id),
+            ("get_goal_skills", legacy_get_goal_skills, database.get_goal_skills),
+        ]
+        print(f"Целей: {args.goals}, вызовов: {args.calls}")
+        print(f"{'функция':<20}{'до, мкс':>12}{'после, мкс':>14}{'ускорение':>12}")
+        for name, before, after in cases:
+            t_before = measure(before, db_path, ids)
+            t_after = measure(after, db_path, ids)
+            print(f"{name:<20}{t_before:>12.1f}{t_after:>14.1f}{t_before / t_after:>11.1f}x")
+
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
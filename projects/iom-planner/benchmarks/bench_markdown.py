@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разметки описаний: разбор в дерево, вывод обычным текстом
+и добавление описаний в Word, как в export_to_word.
+
+Запуск: python benchmarks/bench_markdown.py [--descriptions 10000] [--lines 40]
+Часть с Word выполняется, если установлен python-docx.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import markup
+
+
+def legacy_parse_simple_markdown(text: str) -> str:
+    """Прежний построчный разбор (одна ссылка на строку) для сравнения"""
+    result_lines = []
+    for line in text.split('\n'):
+        if line.startswith('- '):
+            result_lines.append('• ' + line[2:])
+        elif line.startswith('# '):
+            result_lines.append('ЗАГОЛОВОК: ' + line[2:])
+        else:
+            line = line.replace('**', '')
+            if '[' in line and ']' in line and '(' in line and ')' in line:
+                start = line.find('[')
+                end = line.find(']')
+                link_start = line.find('(')
+                link_end = line.find(')')
+                line = line[:start] + line[start + 1:end] + ' (' + line[link_start + 1:link_end] + ')' \
+                    + line[link_end + 1:]
+            result_lines.append(line)
+    return '\n'.join(result_lines)
+
+
+def make_descriptions(count: int, lines: int) -> list:
+    """Синтетические длинные описания со всеми элементами разметки"""
+    rnd = random.Random(42)
+    templates = [
+        "# Этап {n}",
+        "- пункт {n} с **важным** шагом",
+        "Читать [статью {n}](https://example.org/{n}) и [доклад](https://example.org/t{n})",
+        "Обычный текст описания номер {n}, *курсив* и __подчёркнутый курсив__",
+        "",
+    ]
+    return ['\n'.join(rnd.choice(templates).format(n=i * lines + j) for j in range(lines))
+            for i in range(count)]
+
+
+def measure(func) -> float:
+    """Время вызова в миллисекундах"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--descriptions', type=int, default=10000)
+    parser.add_argument('--lines', type=int, default=40)
+    args = parser.parse_args()
+
+    descriptions = make_descriptions(args.descriptions, args.lines)
+    # Повторный просмотр помещающихся в кэш описаний
+    recent = descriptions[-markup.PARSE_CACHE_SIZE:]
+
+    markup.parse.cache_clear()
+    cases = [
+        ("текст: прежний разбор", lambda: [legacy_parse_simple_markdown(d) for d in descriptions]),
+        ("разбор в дерево", lambda: [markup.parse(d) for d in descriptions]),
+        ("текст: дерево из кэша", lambda: [markup.render_plain(markup.parse(d)) for d in recent]),
+    ]
+
+    try:
+        from docx import Document
+        from src import utils
+    except ImportError:
+        print("python-docx не установлен: экспорт в Word пропущен")
+    else:
+        def export(texts):
+            doc = Document()
+            for text in texts:
+                utils.add_formatted_text_to_doc(doc, text)
+
+        cases += [
+            ("Word: без кэша", lambda: (markup.parse.cache_clear(), export(descriptions))),
+            ("Word: дерево из кэша", lambda: export(recent)),
+        ]
+
+    print(f"Описаний: {args.descriptions}, строк в описании: {args.lines}, кэш: {markup.PARSE_CACHE_SIZE}")
+    print(f"{'этап':<26}{'время, мс':>12}")
+    for name, func in cases:
+        print(f"{name:<26}{measure(func):>12.1f}")
+    print(markup.parse.cache_info())
+
+
+if __name__ == "__main__":
+    main()
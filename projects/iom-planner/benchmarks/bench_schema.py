@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк запросов вкладок "Мой профиль" и "Компетенции" до и после миграции
+схемы (составные ключи связей, индексы, каскадное удаление).
+
+Запуск: python benchmarks/bench_schema.py [--goals 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import database
+
+# Схема до миграций: связи без ключей и индексов
+LEGACY_SCHEMA = '''
+    CREATE TABLE цели (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT NOT NULL, тип TEXT NOT NULL,
+                       статус TEXT DEFAULT 'Новая', план_дата TEXT, факт_дата TEXT, темп TEXT, описание TEXT);
+    CREATE TABLE навыка (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT UNIQUE NOT NULL);
+    CREATE TABLE цель_навыки (цель_id INTEGER, навык_id INTEGER);
+    CREATE TABLE компетенции (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT NOT NULL, категория TEXT);
+    CREATE TABLE цель_компетенции (цель_id INTEGER, компетенция_id INTEGER,
+                                   уровень INTEGER CHECK (уровень BETWEEN 1 AND 5));
+'''
+
+
+def fill_legacy_db(db_path: str, goals: int) -> None:
+    """Синтетические цели со связями (и дублями связей, как в старых базах)"""
+    rnd = random.Random(42)
+    types = ['Курс', 'Проект', 'Самообразование', 'Семинар', 'Другое']
+    statuses = ['Новая', 'В процессе', 'Завершена', 'Отменена']
+
+    conn = database.get_connection(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    with conn:
+        conn.executemany("INSERT INTO навыка (название) VALUES (?)", [(f"Навык {i}",) for i in range(200)])
+        conn.executemany("INSERT INTO компетенции (название, категория) VALUES (?, ?)",
+                         [(f"Компетенция {i}", "Общие") for i in range(20)])
+        conn.executemany('''
+            INSERT INTO цели (название, тип, статус, план_дата, факт_дата, темп, описание)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(f"Цель {i}", rnd.choice(types), rnd.choice(statuses), "2025-06-01",
+               rnd.choice(["2025-05-20", "2025-06-10"]), "", "Описание") for i in range(goals)])
+        conn.executemany("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)",
+                         [(rnd.randint(1, goals), rnd.randint(1, 200)) for _ in range(goals * 2)])
+        conn.executemany("INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень) VALUES (?, ?, ?)",
+                         [(rnd.randint(1, goals), rnd.randint(1, 20), rnd.randint(1, 5)) for _ in range(goals * 2)])
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--goals', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        fill_legacy_db(db_path, args.goals)
+        ids = [random.randint(1, args.goals) for _ in range(200)]
+
+        cases = [
+            ("профиль: навыки", lambda: database.get_skill_statistics(db_path)),
+            ("профиль: типы", lambda: database.get_goal_type_statistics(db_path)),
+            ("профиль: в срок", lambda: database.get_timely_completion(db_path)),
+            ("компетенции", lambda: database.get_competency_averages(db_path)),
+            ("навыки 200 целей", lambda: [database.get_goal_skills(db_path, i) for i in ids]),
+            ("компетенции 200 целей", lambda: [database.get_goal_competencies(db_path, i) for i in ids]),
+        ]
+
+        before = {name: measure(func, args.repeat) for name, func in cases}
+        start = time.perf_counter()
+        database.init_db(db_path)
+        migration_time = time.perf_counter() - start
+        after = {name: measure(func, args.repeat) for name, func in cases}
+
+        print(f"Целей: {args.goals}, миграция: {migration_time:.1f} с")
+        print(f"{'запрос':<24}{'до, мс':>12}{'после, мс':>12}{'ускорение':>12}")
+        for name, _ in cases:
+            print(f"{name:<24}{before[name]:>12.1f}{after[name]:>12.1f}{before[name] / after[name]:>11.1f}x")
+
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+def pytest_addoption(parser):
+    parser.addoption('--bench-size', type=int, default=10000,
+                     help='число целей в синтетической базе бенчмарков')
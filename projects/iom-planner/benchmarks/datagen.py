@@ -0,0 +1,45 @@
+"""
+Генератор синтетической базы ИОМ: цели с навыками и компетенциями, цели на семестр
+"""
+import random
+from typing import Any, Dict, Iterator
+
+from src import database
+
+GOAL_TYPES = ['Курс', 'Проект', 'Самообразование', 'Семинар', 'Другое']
+STATUSES = ['Новая', 'В процессе', database.COMPLETED_STATUS, 'Отменена']
+COMPETENCIES = ['Работа с БД', 'Презентация результатов', 'Управление проектами',
+                'Анализ данных', 'Командная работа', 'Тайм-менеджмент']
+SEMESTER_GOALS = [
+    ("Пройти 5 курсов", 'Количество', '', 5),
+    ("Завершить 3 проекта", 'Количество', 'проект', 3),
+    ("Завершить 20 целей", 'Количество', '', 20),
+    ("Поднять работу с БД", 'Повышение компетенции', 'Работа с БД', 4),
+    ("Поднять анализ данных", 'Повышение компетенции', 'Анализ данных', 4),
+]
+
+
+def generate_goals(count: int, seed: int = 42, skills: int = 300) -> Iterator[Dict[str, Any]]:
+    """Записи целей в формате database.import_goals"""
+    rnd = random.Random(seed)
+    for i in range(count):
+        plan = f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+        status = rnd.choice(STATUSES)
+        fact = f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" if status == database.COMPLETED_STATUS else ''
+        yield {
+            'название': f"Цель {i}", 'тип': rnd.choice(GOAL_TYPES), 'статус': status,
+            'план_дата': plan, 'факт_дата': fact, 'темп': rnd.choice(['', 'Быстрый', 'Средний']),
+            'описание': f"# План\n- **шаг** по [материалу](https://example.org/{i})\n" * rnd.randint(0, 5),
+            'навыки': list(dict.fromkeys(f"Навык {rnd.randint(1, skills)}" for _ in range(rnd.randint(0, 3)))),
+            'компетенции': [(name, rnd.randint(1, 5)) for name in rnd.sample(COMPETENCIES, rnd.randint(0, 3))],
+        }
+
+
+def fill_db(db_path: str, goals: int, seed: int = 42, skills: int = 300) -> None:
+    """Создание схемы и заполнение базы одним импортом"""
+    database.init_db(db_path)
+    database.import_goals(db_path, generate_goals(goals, seed, skills))
+    for text, goal_type, param, target in SEMESTER_GOALS:
+        database.add_semester_goal(db_path, text, goal_type, param, target)
+    database.recalculate_semester_progress(db_path)
+    database.check_achievements(db_path)
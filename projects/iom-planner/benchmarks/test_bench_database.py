@@ -0,0 +1,148 @@
+"""
+Бенчмарки публичных функций src.database, src.analytics и снимка отчёта на синтетической базе
+
+Функции с кэшем результатов замеряются дважды: с попаданием в кэш и без кэша (__wrapped__).
+"""
+import itertools
+
+import pytest
+
+from src import analytics, database, report
+from datagen import fill_db, generate_goals
+
+
+def _filled_db(request, tmp_path_factory, name):
+    path = str(tmp_path_factory.mktemp(name) / "iom.db")
+    fill_db(path, request.config.getoption('--bench-size'))
+    request.addfinalizer(database.close_connections)
+    return path
+
+
+@pytest.fixture(scope='session')
+def read_db(request, tmp_path_factory):
+    return _filled_db(request, tmp_path_factory, 'read')
+
+
+@pytest.fixture(scope='session')
+def write_db(request, tmp_path_factory):
+    return _filled_db(request, tmp_path_factory, 'write')
+
+
+READS = {
+    'get_all_goals': lambda db: database.get_all_goals(db),
+    'get_goal_by_id': lambda db: database.get_goal_by_id(db, 1),
+    'get_goal_skills': lambda db: database.get_goal_skills(db, 1),
+    'get_all_skills': lambda db: database.get_all_skills(db),
+    'get_goal_competencies': lambda db: database.get_goal_competencies(db, 1),
+    'get_all_competencies': lambda db: database.get_all_competencies(db),
+    'get_semester_goals': lambda db: database.get_semester_goals(db),
+    'get_schema_version': lambda db: database.get_schema_version(db),
+    'data_version': lambda db: database.data_version(db),
+    'get_cache_stats': lambda db: database.get_cache_stats(),
+    'iter_goals_with_links': lambda db: sum(1 for _ in database.iter_goals_with_links(db)),
+    'check_achievements': lambda db: database.check_achievements(db),
+    'report.take_snapshot': lambda db: report.take_snapshot(db),
+}
+
+CACHED_READS = {
+    'get_competency_averages': database.get_competency_averages,
+    'get_skill_statistics': database.get_skill_statistics,
+    'get_goal_type_statistics': database.get_goal_type_statistics,
+    'get_timely_completion': database.get_timely_completion,
+    'get_all_achievements': database.get_all_achievements,
+    'get_monthly_completion': analytics.get_monthly_completion,
+    'get_lateness_summary': analytics.get_lateness_summary,
+    'get_type_throughput': analytics.get_type_throughput,
+}
+
+
+@pytest.mark.benchmark(group='чтение')
+@pytest.mark.parametrize('name', READS)
+def test_read(benchmark, read_db, name):
+    benchmark(READS[name], read_db)
+
+
+@pytest.mark.benchmark(group='чтение: кэш')
+@pytest.mark.parametrize('name', CACHED_READS)
+def test_cached_read(benchmark, read_db, name):
+    benchmark(CACHED_READS[name], read_db)
+
+
+@pytest.mark.benchmark(group='чтение: без кэша')
+@pytest.mark.parametrize('name', CACHED_READS)
+def test_uncached_read(benchmark, read_db, name):
+    benchmark(CACHED_READS[name].__wrapped__, read_db)
+
+
+GOAL = ("Цель", "Курс", database.COMPLETED_STATUS, "2025-06-01", "2025-05-20", "", "Описание")
+
+
+@pytest.mark.benchmark(group='запись')
+class TestWrites:
+    def test_add_goal(self, benchmark, write_db):
+        benchmark(database.add_goal, write_db, *GOAL)
+
+    def test_update_goal(self, benchmark, write_db):
+        benchmark(database.update_goal, write_db, 1, *GOAL)
+
+    def test_delete_goal(self, benchmark, write_db):
+        benchmark.pedantic(database.delete_goal, setup=lambda: ((write_db, database.add_goal(write_db, *GOAL)), {}),
+                           rounds=100)
+
+    def test_save_goal_aggregate_new(self, benchmark, write_db):
+        goal = dict(zip(database.GOAL_FIELDS, GOAL))
+        benchmark(database.save_goal_aggregate, write_db, goal, ["Навык 1", "Навык 2"], [(1, 4), (2, 3)])
+
+    def test_save_goal_aggregate_edit(self, benchmark, write_db):
+        levels = itertools.cycle(range(1, 6))
+        goal = dict(zip(database.GOAL_FIELDS, GOAL), id=1)
+        benchmark(lambda: database.save_goal_aggregate(write_db, goal, ["Навык 1"], [(1, next(levels))]))
+
+    def test_import_goals_100(self, benchmark, write_db):
+        seeds = itertools.count(1000)
+        benchmark.pedantic(lambda: database.import_goals(write_db, generate_goals(100, next(seeds))),
+                           rounds=20, iterations=1)
+
+    def test_add_skill(self, benchmark, write_db):
+        names = (f"Новый навык {i}" for i in itertools.count())
+        benchmark(lambda: database.add_skill(write_db, next(names)))
+
+    def test_link_goal_skill(self, benchmark, write_db):
+        benchmark(database.link_goal_skill, write_db, 1, 1)
+
+    def test_add_competency_link(self, benchmark, write_db):
+        benchmark(database.add_competency_link, write_db, 1, 1, 3)
+
+    def test_add_semester_goal(self, benchmark, write_db):
+        benchmark(database.add_semester_goal, write_db, "Пройти курс", 'Количество', 'курс', 3)
+
+    def test_update_semester_progress(self, benchmark, write_db):
+        benchmark(database.update_semester_progress, write_db, 1, 2)
+
+    def test_delete_semester_goal(self, benchmark, write_db):
+        benchmark.pedantic(database.delete_semester_goal, rounds=100, setup=lambda: (
+            (write_db, database.add_semester_goal(write_db, "Цель", 'Другое', '', 1)), {}))
+
+    def test_recalculate_semester_progress(self, benchmark, write_db):
+        benchmark(database.recalculate_semester_progress, write_db)
+
+    def test_recalculate_semester_progress_types(self, benchmark, write_db):
+        benchmark(database.recalculate_semester_progress, write_db, ['Курс'])
+
+    def test_migrate(self, benchmark, write_db):
+        benchmark(database.migrate, write_db)
+
+    def test_load_competencies_to_db(self, benchmark, write_db):
+        benchmark(database.load_competencies_to_db, write_db)
+
+    def test_init_db(self, benchmark, write_db):
+        benchmark(database.init_db, write_db)
+
+
+@pytest.mark.benchmark(group='запись')
+def test_clear_all_data(benchmark, tmp_path):
+    """Очистка базы из 1000 целей (база заполняется заново перед каждым замером)"""
+    path = str(tmp_path / "iom.db")
+    database.init_db(path)
+    benchmark.pedantic(database.clear_all_data, rounds=5, setup=lambda: (
+        database.import_goals(path, generate_goals(1000)), ((path,), {}))[1])
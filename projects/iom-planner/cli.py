@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Пакетный импорт и экспорт целей IOM Planner (JSON Lines / CSV)
+
+    python cli.py import goals.jsonl [--db iom.db] [--format csv] [--batch-size 1000]
+    python cli.py export goals.csv [--db iom.db]
+
+Формат определяется по расширению файла ("-" - стандартный ввод/вывод, нужен --format).
+"""
+import argparse
+import contextlib
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import bulk, database
+
+
+def open_stream(path: str, mode: str):
+    """Файл или стандартный поток для "-" """
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def run_import(args) -> int:
+    """Загрузка целей из файла одной транзакцией"""
+    database.init_db(args.db)
+    start = time.perf_counter()
+    with open_stream(args.path, 'r') as stream:
+        result = database.import_goals(args.db, bulk.read_records(stream, args.format), args.batch_size)
+    elapsed = time.perf_counter() - start
+    if result is None:
+        return 1
+
+    print(f"✅ Импортировано целей: {result.goals} за {elapsed:.2f} с "
+          f"({result.goals / elapsed if elapsed else 0:.0f} строк/с)")
+    print(f"   новых навыков: {result.skills_created}, новых компетенций: {result.competencies_created}, "
+          f"связей с навыками: {result.skill_links}, с компетенциями: {result.competency_links}")
+
+    database.recalculate_semester_progress(args.db)
+    unlocked = database.check_achievements(args.db)
+    if unlocked:
+        print(f"🏆 Получены достижения: {', '.join(unlocked)}")
+    return 0
+
+
+def run_export(args) -> int:
+    """Выгрузка всех целей в файл"""
+    # Стандартный вывод может быть файлом выгрузки - сообщения только в stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        database.init_db(args.db)
+    start = time.perf_counter()
+    with open_stream(args.path, 'w') as stream:
+        count = bulk.write_records(stream, database.iter_goals_with_links(args.db, args.batch_size), args.format)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Экспортировано целей: {count} за {elapsed:.2f} с "
+          f"({count / elapsed if elapsed else 0:.0f} строк/с)", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетный импорт и экспорт целей IOM Planner")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('path', help='файл .jsonl или .csv, "-" - стандартный ввод/вывод')
+    parser.add_argument('--db', default='iom.db', help='путь к базе (по умолчанию iom.db)')
+    parser.add_argument('--format', choices=bulk.FORMATS, help='формат файла, если не по расширению')
+    parser.add_argument('--batch-size', type=int, default=database.BULK_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        args.format = args.format or bulk.detect_format(args.path)
+        return run_import(args) if args.command == 'import' else run_export(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,13 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import tkinter as tk
 from src.gui import IOMApp
+from src import database
 
 def main():
     root = tk.Tk()
     app = IOMApp(root)
     root.mainloop()
+    database.close_connections()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
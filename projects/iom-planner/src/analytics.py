@@ -0,0 +1,146 @@
+"""
+Аналитика сроков: динамика по месяцам, опоздания и темп по типам целей
+
+Каждый показатель считается одним запросом с оконными функциями по номерам дней
+(колонки план_день и факт_день), результаты кэшируются до изменения данных.
+"""
+from typing import List, NamedTuple, Optional
+
+from .database import COMPLETED_STATUS, cached_query, get_connection
+
+# Число месяцев в скользящем окне
+ROLLING_MONTHS = 3
+
+# Цели с этим статусом не входят в план месяца
+CANCELLED_STATUS = 'Отменена'
+
+# Месяц ГГГГ-ММ по номеру дня
+_MONTH_SQL = "strftime('%Y-%m', {column} * 86400, 'unixepoch')"
+
+
+class MonthStats(NamedTuple):
+    """Цели с плановой датой в месяце"""
+    month: str
+    planned: int
+    completed: int
+    on_time: int
+    completion_rate: Optional[float]   # % завершённых за скользящее окно месяцев
+    on_time_rate: Optional[float]      # % завершённых в срок среди завершённых за окно
+    avg_lateness: Optional[float]      # среднее опоздание завершённых позже срока, дней
+
+
+class LatenessSummary(NamedTuple):
+    """Сроки завершённых целей с обеими датами"""
+    completed: int
+    late: int
+    avg_lateness: Optional[float]      # среднее опоздание опоздавших, дней
+    max_lateness: Optional[int]
+    avg_deviation: Optional[float]     # среднее (факт - план) по всем, отрицательное - раньше срока
+
+
+class TypeThroughput(NamedTuple):
+    """Завершённые цели типа по месяцам фактической даты"""
+    goal_type: str
+    completed: int
+    months: int
+    per_month: float
+    best_month: str
+    share: float                       # % от всех завершённых
+    avg_lateness: Optional[float]
+
+
+@cached_query
+def get_monthly_completion(db_path: str, window: int = ROLLING_MONTHS) -> List[MonthStats]:
+    """Динамика выполнения по месяцам плановой даты со скользящими процентами за window месяцев
+
+    Месяцы без целей между первым и последним входят в список с нулями, поэтому
+    окно всегда охватывает window календарных месяцев.
+    """
+    try:
+        conn = get_connection(db_path)
+        rows = conn.execute(f'''
+            WITH RECURSIVE месяцы AS (
+                SELECT {_MONTH_SQL.format(column='план_день')} AS месяц,
+                       COUNT(*) AS план,
+                       SUM(статус = :completed) AS завершено,
+                       SUM(статус = :completed AND факт_день <= план_день) AS в_срок,
+                       AVG(CASE WHEN статус = :completed AND факт_день > план_день
+                                THEN факт_день - план_день END) AS опоздание
+                FROM цели
+                WHERE план_день IS NOT NULL AND статус != :cancelled
+                GROUP BY месяц
+            ), календарь(месяц) AS (
+                SELECT MIN(месяц) FROM месяцы HAVING COUNT(*) > 0
+                UNION ALL
+                SELECT strftime('%Y-%m', месяц || '-01', '+1 month') FROM календарь
+                WHERE месяц < (SELECT MAX(месяц) FROM месяцы)
+            ), по_календарю AS (
+                SELECT к.месяц, COALESCE(м.план, 0) AS план, COALESCE(м.завершено, 0) AS завершено,
+                       COALESCE(м.в_срок, 0) AS в_срок, м.опоздание
+                FROM календарь к
+                LEFT JOIN месяцы м ON м.месяц = к.месяц
+            )
+            SELECT месяц, план, завершено, в_срок,
+                   ROUND(100.0 * SUM(завершено) OVER окно / NULLIF(SUM(план) OVER окно, 0), 1),
+                   ROUND(100.0 * SUM(в_срок) OVER окно / NULLIF(SUM(завершено) OVER окно, 0), 1),
+                   ROUND(опоздание, 1)
+            FROM по_календарю
+            WINDOW окно AS (ORDER BY месяц ROWS BETWEEN :preceding PRECEDING AND CURRENT ROW)
+            ORDER BY месяц
+        ''', {'completed': COMPLETED_STATUS, 'cancelled': CANCELLED_STATUS, 'preceding': max(window, 1) - 1})
+        return [MonthStats(*row) for row in rows]
+    except Exception as e:
+        print(f"❌ Ошибка расчета динамики по месяцам: {e}")
+        return []
+
+
+@cached_query
+def get_lateness_summary(db_path: str) -> LatenessSummary:
+    """Число опозданий, среднее и максимальное опоздание завершённых целей"""
+    try:
+        conn = get_connection(db_path)
+        row = conn.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(факт_день > план_день), 0),
+                   ROUND(AVG(CASE WHEN факт_день > план_день THEN факт_день - план_день END), 1),
+                   MAX(CASE WHEN факт_день > план_день THEN факт_день - план_день END),
+                   ROUND(AVG(факт_день - план_день), 1)
+            FROM цели
+            WHERE статус = ? AND факт_день IS NOT NULL AND план_день IS NOT NULL
+        ''', (COMPLETED_STATUS,)).fetchone()
+        return LatenessSummary(*row)
+    except Exception as e:
+        print(f"❌ Ошибка расчета опозданий: {e}")
+        return LatenessSummary(0, 0, None, None, None)
+
+
+@cached_query
+def get_type_throughput(db_path: str) -> List[TypeThroughput]:
+    """Темп по типам: завершено всего, в среднем за активный месяц, лучший месяц и доля"""
+    try:
+        conn = get_connection(db_path)
+        rows = conn.execute(f'''
+            WITH по_месяцам AS (
+                SELECT тип, {_MONTH_SQL.format(column='факт_день')} AS месяц,
+                       COUNT(*) AS завершено,
+                       SUM(CASE WHEN факт_день > план_день THEN факт_день - план_день END) AS дней_опоздания,
+                       SUM(факт_день > план_день) AS опозданий
+                FROM цели
+                WHERE статус = ? AND факт_день IS NOT NULL
+                GROUP BY тип, месяц
+            ), лучшие AS (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY тип ORDER BY завершено DESC, месяц DESC) AS место
+                FROM по_месяцам
+            )
+            SELECT тип, SUM(завершено), COUNT(*), ROUND(AVG(завершено), 1),
+                   MAX(CASE WHEN место = 1 THEN месяц END),
+                   ROUND(100.0 * SUM(завершено) / SUM(SUM(завершено)) OVER (), 1),
+                   ROUND(1.0 * SUM(дней_опоздания) / NULLIF(SUM(опозданий), 0), 1)
+            FROM лучшие
+            GROUP BY тип
+            ORDER BY SUM(завершено) DESC, тип
+        ''', (COMPLETED_STATUS,))
+        return [TypeThroughput(*row) for row in rows]
+    except Exception as e:
+        print(f"❌ Ошибка расчета темпа по типам: {e}")
+        return []
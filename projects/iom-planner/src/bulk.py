@@ -0,0 +1,99 @@
+"""
+Пакетный импорт и экспорт целей в JSON Lines и CSV
+"""
+import csv
+import json
+import os
+from typing import Any, Dict, IO, Iterable, Iterator, Tuple
+
+from .database import GOAL_FIELDS
+
+FORMATS = ('jsonl', 'csv')
+
+# Колонки CSV: поля цели, навыки через ";" и компетенции "название:уровень" через ";".
+# В CSV нет NULL - пустые поля загружаются пустыми строками, как их сохраняет окно цели (даты - NULL)
+CSV_COLUMNS = GOAL_FIELDS + ('навыки', 'компетенции')
+LIST_SEPARATOR = ';'
+LEVEL_SEPARATOR = ':'
+
+DEFAULT_STATUS = 'Новая'
+
+
+def detect_format(path: str) -> str:
+    """Формат по расширению файла"""
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext in ('jsonl', 'ndjson', 'json'):
+        return 'jsonl'
+    if ext == 'csv':
+        return 'csv'
+    raise ValueError(f"неизвестный формат файла: {path}")
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Запись в формате database.import_goals: все поля цели, списки навыков и пар (компетенция, уровень)"""
+    result = {field: record.get(field) for field in GOAL_FIELDS}
+    if not result['название'] or not result['тип']:
+        raise ValueError(f"у цели нет названия или типа: {record}")
+    result['статус'] = result['статус'] or DEFAULT_STATUS
+    result['навыки'] = [name for name in record.get('навыки') or () if name]
+    competencies = []
+    for item in record.get('компетенции') or ():
+        name, level = (item['название'], item['уровень']) if isinstance(item, dict) else item
+        competencies.append((name, int(level)))
+    result['компетенции'] = competencies
+    return result
+
+
+def _split(value: str) -> list:
+    return [part.strip() for part in (value or '').split(LIST_SEPARATOR) if part.strip()]
+
+
+def _parse_competency(value: str) -> Tuple[str, int]:
+    name, _, level = value.rpartition(LEVEL_SEPARATOR)
+    return name.strip(), int(level)
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Потоковое чтение целей из JSON Lines или CSV"""
+    if fmt == 'jsonl':
+        for line_no, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield normalize_record(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f"строка {line_no}: {e}") from e
+    elif fmt == 'csv':
+        for line_no, row in enumerate(csv.DictReader(stream), 2):
+            try:
+                row['навыки'] = _split(row.get('навыки'))
+                row['компетенции'] = [_parse_competency(item) for item in _split(row.get('компетенции'))]
+                yield normalize_record(row)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"строка {line_no}: {e}") from e
+    else:
+        raise ValueError(f"неизвестный формат: {fmt}")
+
+
+def write_records(stream: IO[str], records: Iterable[Dict[str, Any]], fmt: str) -> int:
+    """Потоковая запись целей в JSON Lines или CSV, возвращает число записей"""
+    count = 0
+    if fmt == 'jsonl':
+        for record in records:
+            record = dict(record, компетенции=[{'название': name, 'уровень': level}
+                                               for name, level in record['компетенции']])
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    elif fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(dict(
+                record,
+                навыки=LIST_SEPARATOR.join(record['навыки']),
+                компетенции=LIST_SEPARATOR.join(f"{name}{LEVEL_SEPARATOR}{level}"
+                                                for name, level in record['компетенции']),
+            ))
+            count += 1
+    else:
+        raise ValueError(f"неизвестный формат: {fmt}")
+    return count
@@ -2,15 +2,409 @@
 Модуль для работы с базой данных SQLite
 """
 import sqlite3
+import functools
+from datetime import datetime
 import json
 import os
-from typing import List, Tuple, Optional
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
 
+from .query_cache import QueryCache
 
+# Размер кэша подготовленных запросов на одно соединение
+STATEMENT_CACHE_SIZE = 256
+
+# Число целей в одном executemany при пакетном импорте и экспорте
+BULK_BATCH_SIZE = 1000
+
+_local = threading.local()
+
+# Поля цели в порядке колонок таблицы цели (без id)
+GOAL_FIELDS = ('название', 'тип', 'статус', 'план_дата', 'факт_дата', 'темп', 'описание')
+
+# Статус, от которого зависят прогресс целей на семестр и статистика
+COMPLETED_STATUS = 'Завершена'
+
+# Ключевое слово в тексте или параметре цели на семестр -> тип считаемых целей
+SEMESTER_COUNT_TYPES = {'курс': 'Курс', 'проект': 'Проект', 'семинар': 'Семинар'}
+
+# Даты целей хранятся в ISO (ГГГГ-ММ-ДД); при сохранении принимаются и эти форматы
+DATE_FORMAT = '%Y-%m-%d'
+DATE_INPUT_FORMATS = (DATE_FORMAT, '%d.%m.%Y', '%Y.%m.%d', '%d/%m/%Y')
+DATE_FIELDS = ('план_дата', 'факт_дата')
+
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    """Дата в ISO; пустое значение - None, нераспознанная дата - ValueError"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    for date_format in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime(DATE_FORMAT)
+        except ValueError:
+            continue
+    raise ValueError(f"дата '{value}' не в формате ГГГГ-ММ-ДД")
+
+
+def normalize_goal_dates(goal: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    """Копия полей цели с датами в ISO"""
+    return dict(goal, **{field: normalize_date(goal.get(field)) for field in DATE_FIELDS})
+
+
+def _iso_date_or_original(value: Optional[str]) -> Optional[str]:
+    """SQL-функция iso_date для миграции: нераспознанные даты остаются как есть"""
+    try:
+        return normalize_date(value)
+    except ValueError:
+        return value
+
+
+def _epoch_day_sql(column: str) -> str:
+    """Номер дня от 1970-01-01 для ISO-даты в колонке, NULL для пустой и нераспознанной"""
+    return f"CASE WHEN {column} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' " \
+           f"THEN CAST(strftime('%s', {column}) AS INTEGER) / 86400 END"
+
+
+class AchievementRule(NamedTuple):
+    """Правило достижения: код, счётчик из таблицы счётчики и условие над его значениями по ключам"""
+    code: str
+    counter: str
+    predicate: Callable[[Dict[str, int]], bool]
+
+
+ACHIEVEMENT_RULES = [
+    # Старт - создана первая цель
+    AchievementRule('ach1', 'цели', lambda values: values.get('', 0) >= 1),
+    # Пунктуальный - 3+ целей в срок
+    AchievementRule('ach2', 'завершено_в_срок', lambda values: values.get('', 0) >= 3),
+    # Многогранный - завершённые цели 3+ разных типов
+    AchievementRule('ach3', 'завершено_по_типу', lambda values: sum(1 for n in values.values() if n > 0) >= 3),
+    # Навыковый рост - у одного навыка 4+ завершённых целей
+    AchievementRule('ach4', 'завершено_по_навыку', lambda values: max(values.values(), default=0) >= 4),
+    # Планирование - 5+ целей в процессе
+    AchievementRule('ach5', 'в_процессе', lambda values: values.get('', 0) >= 5),
+]
+
+
+def _goal_counters_sql(row: str, sign: int) -> str:
+    """Изменение счётчиков достижений на вклад строки цели (new или old) со знаком sign"""
+    completed = f"{row}.статус = '{COMPLETED_STATUS}'"
+    return f'''
+        INSERT INTO счётчики (счётчик, ключ, значение)
+        SELECT счётчик, ключ, {sign} FROM (
+            SELECT 'цели' AS счётчик, '' AS ключ
+            UNION ALL SELECT 'в_процессе', '' WHERE {row}.статус = 'В процессе'
+            UNION ALL SELECT 'завершено_по_типу', {row}.тип WHERE {completed}
+            UNION ALL SELECT 'завершено_в_срок', '' WHERE {completed}
+                AND {row}.факт_день <= {row}.план_день
+        ) WHERE true
+        ON CONFLICT (счётчик, ключ) DO UPDATE SET значение = значение + excluded.значение, изменён = 1;
+    '''
+
+
+def _skill_counters_sql(goal_id: str, skill_filter: str, sign: int) -> str:
+    """Изменение счётчиков завершённых целей по навыкам для связей цели goal_id"""
+    return f'''
+        INSERT INTO счётчики (счётчик, ключ, значение)
+        SELECT 'завершено_по_навыку', цн.навык_id, {sign} * COUNT(*)
+        FROM цель_навыки цн JOIN цели ц ON ц.id = цн.цель_id
+        WHERE цн.цель_id = {goal_id} AND ц.статус = '{COMPLETED_STATUS}' {skill_filter}
+        GROUP BY цн.навык_id
+        ON CONFLICT (счётчик, ключ) DO UPDATE SET значение = значение + excluded.значение, изменён = 1;
+    '''
+
+
+# Триггеры, которые поддерживают счётчики достижений при изменении целей и их навыков
+ACHIEVEMENT_COUNTER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_цели_insert AFTER INSERT ON цели BEGIN
+        {_goal_counters_sql('new', 1)}
+    END
+    """,
+    # Связи с навыками удаляются до цели, чтобы вычесть её из счётчиков навыков
+    """
+    CREATE TRIGGER IF NOT EXISTS счётчики_цели_delete_links BEFORE DELETE ON цели BEGIN
+        DELETE FROM цель_навыки WHERE цель_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_цели_delete AFTER DELETE ON цели BEGIN
+        {_goal_counters_sql('old', -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_цели_update_before BEFORE UPDATE OF статус, тип, план_дата, факт_дата ON цели
+    WHEN old.статус IS NOT new.статус OR old.тип IS NOT new.тип
+        OR old.план_дата IS NOT new.план_дата OR old.факт_дата IS NOT new.факт_дата BEGIN
+        {_goal_counters_sql('old', -1)}
+        {_skill_counters_sql('old.id', '', -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_цели_update_after AFTER UPDATE OF статус, тип, план_дата, факт_дата ON цели
+    WHEN old.статус IS NOT new.статус OR old.тип IS NOT new.тип
+        OR old.план_дата IS NOT new.план_дата OR old.факт_дата IS NOT new.факт_дата BEGIN
+        {_goal_counters_sql('new', 1)}
+        {_skill_counters_sql('new.id', '', 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_навыки_insert AFTER INSERT ON цель_навыки BEGIN
+        {_skill_counters_sql('new.цель_id', 'AND цн.навык_id = new.навык_id', 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS счётчики_навыки_delete BEFORE DELETE ON цель_навыки BEGIN
+        {_skill_counters_sql('old.цель_id', 'AND цн.навык_id = old.навык_id', -1)}
+    END
+    """,
+]
+
+# Удаление триггеров и таблицы счётчиков: init_db создаёт их заново и заполняет по текущим данным
+DROP_ACHIEVEMENT_COUNTERS = [
+    "DROP TRIGGER IF EXISTS счётчики_цели_insert",
+    "DROP TRIGGER IF EXISTS счётчики_цели_delete_links",
+    "DROP TRIGGER IF EXISTS счётчики_цели_delete",
+    "DROP TRIGGER IF EXISTS счётчики_цели_update_before",
+    "DROP TRIGGER IF EXISTS счётчики_цели_update_after",
+    "DROP TRIGGER IF EXISTS счётчики_навыки_insert",
+    "DROP TRIGGER IF EXISTS счётчики_навыки_delete",
+    "DROP TABLE IF EXISTS счётчики",
+]
+
+# Миграции схемы: номер версии и SQL-команды.
+# Номер последней применённой миграции хранится в PRAGMA user_version
+MIGRATIONS = [
+    (1, [
+        # Триггеры счётчиков ссылаются на таблицы связей: пересоздаются после миграций,
+        # счётчики заполняются заново по очищенным связям
+        *DROP_ACHIEVEMENT_COUNTERS,
+        # Связи с навыками: составной ключ, каскадное удаление, без дублей и висячих строк
+        '''
+        CREATE TABLE цель_навыки_new (
+            цель_id INTEGER NOT NULL,
+            навык_id INTEGER NOT NULL,
+            PRIMARY KEY (цель_id, навык_id),
+            FOREIGN KEY (цель_id) REFERENCES цели (id) ON DELETE CASCADE,
+            FOREIGN KEY (навык_id) REFERENCES навыка (id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        INSERT OR IGNORE INTO цель_навыки_new (цель_id, навык_id)
+        SELECT цель_id, навык_id FROM цель_навыки
+        WHERE цель_id IN (SELECT id FROM цели) AND навык_id IN (SELECT id FROM навыка)
+        ''',
+        "DROP TABLE цель_навыки",
+        "ALTER TABLE цель_навыки_new RENAME TO цель_навыки",
+        "CREATE INDEX idx_цель_навыки_навык ON цель_навыки (навык_id, цель_id)",
+        # Связи с компетенциями: из дублей остаётся последний указанный уровень
+        '''
+        CREATE TABLE цель_компетенции_new (
+            цель_id INTEGER NOT NULL,
+            компетенция_id INTEGER NOT NULL,
+            уровень INTEGER CHECK (уровень BETWEEN 1 AND 5),
+            PRIMARY KEY (цель_id, компетенция_id),
+            FOREIGN KEY (цель_id) REFERENCES цели (id) ON DELETE CASCADE,
+            FOREIGN KEY (компетенция_id) REFERENCES компетенции (id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        INSERT INTO цель_компетенции_new (цель_id, компетенция_id, уровень)
+        SELECT цель_id, компетенция_id, уровень FROM цель_компетенции
+        WHERE rowid IN (SELECT MAX(rowid) FROM цель_компетенции GROUP BY цель_id, компетенция_id)
+        AND цель_id IN (SELECT id FROM цели) AND компетенция_id IN (SELECT id FROM компетенции)
+        ''',
+        "DROP TABLE цель_компетенции",
+        "ALTER TABLE цель_компетенции_new RENAME TO цель_компетенции",
+        # Средние уровни читаются только из индекса
+        "CREATE INDEX idx_цель_компетенции_компетенция ON цель_компетенции (компетенция_id, цель_id, уровень)",
+        # Фильтры и группировки по статусу и типу во вкладке профиля, достижениях и прогрессе семестра;
+        # даты в индексе покрывают подсчёт целей, завершённых в срок
+        "CREATE INDEX idx_цели_статус_тип ON цели (статус, тип, план_дата, факт_дата)",
+    ]),
+    (2, [
+        # Счётчик "в срок" переходит на номера дней
+        *DROP_ACHIEVEMENT_COUNTERS,
+        # Даты в ISO, пустые - NULL (iso_date регистрирует get_connection)
+        "UPDATE цели SET план_дата = iso_date(план_дата), факт_дата = iso_date(факт_дата)",
+        # Номера дней для сравнения сроков и группировки по месяцам числами, а не строками
+        f"ALTER TABLE цели ADD COLUMN план_день INTEGER GENERATED ALWAYS AS ({_epoch_day_sql('план_дата')}) VIRTUAL",
+        f"ALTER TABLE цели ADD COLUMN факт_день INTEGER GENERATED ALWAYS AS ({_epoch_day_sql('факт_дата')}) VIRTUAL",
+        "DROP INDEX IF EXISTS idx_цели_статус_тип",
+        # Подсчёт в срок, опозданий и темпа по типам - по завершённым целям из индекса
+        "CREATE INDEX idx_цели_статус_тип ON цели (статус, тип, план_день, факт_день)",
+    ]),
+]
+
+# Значения всех счётчиков с нуля (заполнение таблицы счётчики для существующих данных)
+ACHIEVEMENT_COUNTERS_QUERY = f'''
+    SELECT 'цели', '', COUNT(*) FROM цели
+    UNION ALL SELECT 'в_процессе', '', COUNT(*) FROM цели WHERE статус = 'В процессе'
+    UNION ALL SELECT 'завершено_в_срок', '', COUNT(*) FROM цели
+        WHERE статус = '{COMPLETED_STATUS}' AND факт_день <= план_день
+    UNION ALL SELECT 'завершено_по_типу', тип, COUNT(*) FROM цели
+        WHERE статус = '{COMPLETED_STATUS}' GROUP BY тип
+    UNION ALL SELECT 'завершено_по_навыку', цн.навык_id, COUNT(*)
+        FROM цель_навыки цн JOIN цели ц ON ц.id = цн.цель_id
+        WHERE ц.статус = '{COMPLETED_STATUS}' GROUP BY цн.навык_id
+'''
+
+
+class GoalSaveResult(NamedTuple):
+    """Изменения, внесённые save_goal_aggregate"""
+    goal_id: int
+    created: bool
+    old_goal: Optional[Dict[str, str]]
+    new_goal: Dict[str, str]
+    skills_added: List[str]
+    skills_removed: List[str]
+    competencies_added: List[Tuple[int, int]]
+    competencies_removed: List[Tuple[int, int]]
+    competencies_changed: List[Tuple[int, int, int]]
+    competencies: Dict[int, int]
+
+    @property
+    def fields_changed(self) -> List[str]:
+        """Изменённые поля цели (для новой цели - все)"""
+        if self.old_goal is None:
+            return list(GOAL_FIELDS)
+        return [field for field in GOAL_FIELDS if self.old_goal[field] != self.new_goal[field]]
+
+    @property
+    def skills_changed(self) -> bool:
+        return bool(self.skills_added or self.skills_removed)
+
+    @property
+    def competency_links_changed(self) -> bool:
+        return bool(self.competencies_added or self.competencies_removed or self.competencies_changed)
+
+    def _was_completed(self) -> bool:
+        return self.old_goal is not None and self.old_goal['статус'] == COMPLETED_STATUS
+
+    def _is_completed(self) -> bool:
+        return self.new_goal['статус'] == COMPLETED_STATUS
+
+    def affected_goal_types(self) -> List[str]:
+        """Типы, у которых могло измениться число завершённых целей"""
+        types = []
+        if self._was_completed() and (not self._is_completed() or 'тип' in self.fields_changed):
+            types.append(self.old_goal['тип'])
+        if self._is_completed() and (not self._was_completed() or 'тип' in self.fields_changed):
+            types.append(self.new_goal['тип'])
+        return types
+
+    def affected_competency_ids(self) -> List[int]:
+        """Компетенции, у которых мог измениться средний уровень по завершённым целям"""
+        if self._was_completed() != self._is_completed():
+            # Цель вошла в расчёт или вышла из него вместе со всеми компетенциями
+            return list(self.competencies) + [comp_id for comp_id, _ in self.competencies_removed]
+        if not self._is_completed():
+            return []
+        return [comp_id for comp_id, _ in self.competencies_added + self.competencies_removed] + \
+            [comp_id for comp_id, _, _ in self.competencies_changed]
+
+
+class ImportResult(NamedTuple):
+    """Итог пакетного импорта целей"""
+    goals: int
+    skills_created: int
+    competencies_created: int
+    skill_links: int
+    competency_links: int
+
+
+# Кэш результатов статистических запросов (профиль, компетенции, экспорт)
+query_cache = QueryCache()
+
+
+def _db_key(db_path: str) -> str:
+    """Ключ базы для соединений и кэша"""
+    return db_path if db_path == ":memory:" else os.path.abspath(db_path)
+
+
+def _db_path_arg(args, kwargs) -> str:
+    """Путь к базе из аргументов функции модуля (первый аргумент db_path)"""
+    return args[0] if args else kwargs.get('db_path', "iom.db")
+
+
+def writes_data(func):
+    """Функция изменяет данные: после вызова увеличивается версия данных базы"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            query_cache.bump(_db_key(_db_path_arg(args, kwargs)))
+    return wrapper
+
+
+def cached_query(func):
+    """Результат функции берётся из кэша, пока версия данных базы не изменилась
+
+    Версия - счётчик записей через этот модуль и PRAGMA data_version,
+    который меняется при коммитах других соединений. Возвращаемые списки
+    общие для всех вызовов и не должны изменяться.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        db_path = _db_path_arg(args, kwargs)
+        key = (_db_key(db_path), func.__name__, args[1:], tuple(sorted(kwargs.items())))
+        version = data_version(db_path)
+        found, value = query_cache.get(key, version)
+        if found:
+            return value
+        value = func(*args, **kwargs)
+        query_cache.put(key, version, value)
+        return value
+    return wrapper
+
+
+def data_version(db_path: str = "iom.db") -> Tuple[int, int]:
+    """Версия данных: (записи через модуль, PRAGMA data_version соединения потока)"""
+    external = get_connection(db_path).execute("PRAGMA data_version").fetchone()[0]
+    return query_cache.version(_db_key(db_path)), external
+
+
+def get_cache_stats() -> Dict[str, float]:
+    """Метрики кэша запросов"""
+    return query_cache.stats()
+
+
+def get_connection(db_path: str = "iom.db") -> sqlite3.Connection:
+    """Получение долгоживущего соединения текущего потока (WAL, кэш запросов)"""
+    key = _db_key(db_path)
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("iso_date", 1, _iso_date_or_original, deterministic=True)
+        connections[key] = conn
+    return conn
+
+
+def close_connections() -> None:
+    """Закрытие всех соединений текущего потока"""
+    connections = getattr(_local, 'connections', None)
+    if not connections:
+        return
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+@writes_data
 def init_db(db_path: str = "iom.db") -> None:
     """Инициализация базы данных и создание всех таблиц"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
 
             # Таблица цели
@@ -101,15 +495,80 @@ def init_db(db_path: str = "iom.db") -> None:
                 c.executemany("INSERT INTO достижения VALUES (?, ?, ?, ?)", achievements)
 
             conn.commit()
+
+        # Миграции применяются до создания триггеров, которые ссылаются на таблицы связей
+        migrate(db_path)
+
+        with conn:
+            c = conn.cursor()
+
+            # Счётчики для достижений, которые ведут триггеры
+            c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'счётчики'")
+            counters_exist = c.fetchone() is not None
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS счётчики (
+                    счётчик TEXT NOT NULL,
+                    ключ TEXT NOT NULL DEFAULT '',
+                    значение INTEGER NOT NULL DEFAULT 0,
+                    изменён INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (счётчик, ключ)
+                )
+            ''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_счётчики_изменён ON счётчики (счётчик) WHERE изменён = 1")
+            for trigger in ACHIEVEMENT_COUNTER_TRIGGERS:
+                c.execute(trigger)
+            if not counters_exist:
+                c.execute(f"INSERT INTO счётчики (счётчик, ключ, значение) {ACHIEVEMENT_COUNTERS_QUERY}")
+
+            conn.commit()
         print("✅ База данных инициализирована")
     except Exception as e:
         print(f"❌ Ошибка инициализации БД: {e}")
 
 
+def get_schema_version(db_path: str = "iom.db") -> int:
+    """Номер последней применённой миграции"""
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
+
+
+@writes_data
+def migrate(db_path: str = "iom.db") -> int:
+    """Применение недостающих миграций, каждая в своей транзакции
+
+    Возвращает число применённых миграций
+    """
+    conn = get_connection(db_path)
+    version = get_schema_version(db_path)
+    applied = 0
+
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        # DDL в sqlite3 не открывает транзакцию сам - открываем явно
+        conn.execute("BEGIN")
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied += 1
+
+    if applied:
+        # Статистика для планировщика по новым индексам
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
+
+
+@writes_data
 def load_competencies_to_db(db_path: str = "iom.db") -> None:
     """Загрузка компетенций из JSON файла в базу данных"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
 
             c.execute("SELECT COUNT(*) FROM компетенции")
@@ -125,16 +584,18 @@ def load_competencies_to_db(db_path: str = "iom.db") -> None:
         print(f"❌ Ошибка загрузки компетенций: {e}")
 
 
+@writes_data
 def add_goal(db_path: str, name: str, goal_type: str, status: str,
              plan_date: str, fact_date: str, temp: str, description: str) -> Optional[int]:
     """Добавление новой цели"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 INSERT INTO цели (название, тип, статус, план_дата, факт_дата, темп, описание)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (name, goal_type, status, plan_date, fact_date, temp, description))
+            ''', (name, goal_type, status, normalize_date(plan_date), normalize_date(fact_date), temp, description))
             conn.commit()
             return c.lastrowid
     except Exception as e:
@@ -142,17 +603,20 @@ def add_goal(db_path: str, name: str, goal_type: str, status: str,
         return None
 
 
+@writes_data
 def update_goal(db_path: str, goal_id: int, name: str, goal_type: str, status: str,
                 plan_date: str, fact_date: str, temp: str, description: str) -> bool:
     """Обновление цели"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 UPDATE цели 
                 SET название = ?, тип = ?, статус = ?, план_дата = ?, факт_дата = ?, темп = ?, описание = ?
                 WHERE id = ?
-            ''', (name, goal_type, status, plan_date, fact_date, temp, description, goal_id))
+            ''', (name, goal_type, status, normalize_date(plan_date), normalize_date(fact_date), temp, description,
+                  goal_id))
             conn.commit()
             return True
     except Exception as e:
@@ -160,10 +624,12 @@ def update_goal(db_path: str, goal_id: int, name: str, goal_type: str, status: s
         return False
 
 
+@writes_data
 def delete_goal(db_path: str, goal_id: int) -> bool:
     """Удаление цели"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("DELETE FROM цели WHERE id = ?", (goal_id,))
             conn.commit()
@@ -176,7 +642,8 @@ def delete_goal(db_path: str, goal_id: int) -> bool:
 def get_all_goals(db_path: str) -> List[Tuple]:
     """Получение всех целей"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT id, название, тип, статус FROM цели ORDER BY статус, план_дата")
             return c.fetchall()
@@ -188,7 +655,8 @@ def get_all_goals(db_path: str) -> List[Tuple]:
 def get_goal_by_id(db_path: str, goal_id: int) -> Optional[Tuple]:
     """Получение цели по ID"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT * FROM цели WHERE id = ?", (goal_id,))
             return c.fetchone()
@@ -197,10 +665,101 @@ def get_goal_by_id(db_path: str, goal_id: int) -> Optional[Tuple]:
         return None
 
 
+@writes_data
+def save_goal_aggregate(db_path: str, goal: Dict[str, str], skills: List[str],
+                        competencies: List[Tuple[int, int]]) -> Optional[GoalSaveResult]:
+    """Сохранение цели с навыками и компетенциями одной транзакцией
+
+    goal - словарь полей GOAL_FIELDS и необязательного 'id' (для редактирования),
+    competencies - список пар (id компетенции, уровень), даты приводятся к ISO (normalize_date).
+    Связи меняются по разнице с сохранёнными, а не удалением и вставкой всех.
+    """
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
+            # Чтение старого состояния и запись в одной транзакции
+            if not conn.in_transaction:
+                c.execute("BEGIN IMMEDIATE")
+
+            new_goal = normalize_goal_dates({field: goal.get(field) for field in GOAL_FIELDS})
+            values = [new_goal[field] for field in GOAL_FIELDS]
+            goal_id = goal.get('id')
+            old_goal = None
+
+            if goal_id:
+                c.execute(f"SELECT {', '.join(GOAL_FIELDS)} FROM цели WHERE id = ?", (goal_id,))
+                row = c.fetchone()
+                if row is None:
+                    raise LookupError(f"цель {goal_id} не найдена")
+                old_goal = dict(zip(GOAL_FIELDS, row))
+                if old_goal != new_goal:
+                    c.execute(f"UPDATE цели SET {' = ?, '.join(GOAL_FIELDS)} = ? WHERE id = ?",
+                              (*values, goal_id))
+            else:
+                c.execute(f"INSERT INTO цели ({', '.join(GOAL_FIELDS)}) VALUES ({', '.join('?' * len(GOAL_FIELDS))})",
+                          values)
+                goal_id = c.lastrowid
+
+            # Навыки
+            c.execute('''
+                SELECT н.название, н.id
+                FROM навыка н
+                JOIN цель_навыки цн ON н.id = цн.навык_id
+                WHERE цн.цель_id = ?
+            ''', (goal_id,))
+            current_skills = dict(c.fetchall())
+            wanted_skills = list(dict.fromkeys(skills))
+
+            skills_added = [name for name in wanted_skills if name not in current_skills]
+            skills_removed = [name for name in current_skills if name not in wanted_skills]
+
+            if skills_added:
+                c.executemany("INSERT OR IGNORE INTO навыка (название) VALUES (?)",
+                              [(name,) for name in skills_added])
+                c.execute(f"SELECT id FROM навыка WHERE название IN ({', '.join('?' * len(skills_added))})",
+                          skills_added)
+                c.executemany("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)",
+                              [(goal_id, skill_id) for skill_id, in c.fetchall()])
+            if skills_removed:
+                c.executemany("DELETE FROM цель_навыки WHERE цель_id = ? AND навык_id = ?",
+                              [(goal_id, current_skills[name]) for name in skills_removed])
+
+            # Компетенции
+            c.execute("SELECT компетенция_id, уровень FROM цель_компетенции WHERE цель_id = ?", (goal_id,))
+            current_levels = dict(c.fetchall())
+            wanted_levels = dict(competencies)
+
+            competencies_added = [(comp_id, level) for comp_id, level in wanted_levels.items()
+                                  if comp_id not in current_levels]
+            competencies_removed = [(comp_id, level) for comp_id, level in current_levels.items()
+                                    if comp_id not in wanted_levels]
+            competencies_changed = [(comp_id, current_levels[comp_id], level)
+                                    for comp_id, level in wanted_levels.items()
+                                    if comp_id in current_levels and current_levels[comp_id] != level]
+
+            c.executemany('''
+                INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень)
+                VALUES (?, ?, ?)
+            ''', [(goal_id, comp_id, level) for comp_id, level in competencies_added])
+            c.executemany("DELETE FROM цель_компетенции WHERE цель_id = ? AND компетенция_id = ?",
+                          [(goal_id, comp_id) for comp_id, _ in competencies_removed])
+            c.executemany("UPDATE цель_компетенции SET уровень = ? WHERE цель_id = ? AND компетенция_id = ?",
+                          [(level, goal_id, comp_id) for comp_id, _, level in competencies_changed])
+
+        return GoalSaveResult(goal_id, old_goal is None, old_goal, new_goal, skills_added, skills_removed,
+                              competencies_added, competencies_removed, competencies_changed, wanted_levels)
+    except Exception as e:
+        print(f"❌ Ошибка сохранения цели: {e}")
+        return None
+
+
+@writes_data
 def add_skill(db_path: str, skill_name: str) -> int:
     """Добавление навыка (если не существует)"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT id FROM навыка WHERE название = ?", (skill_name,))
             row = c.fetchone()
@@ -215,12 +774,14 @@ def add_skill(db_path: str, skill_name: str) -> int:
         return 0
 
 
+@writes_data
 def link_goal_skill(db_path: str, goal_id: int, skill_id: int) -> bool:
     """Связывание цели с навыком"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
-            c.execute("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)", (goal_id, skill_id))
+            c.execute("INSERT OR IGNORE INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)", (goal_id, skill_id))
             conn.commit()
             return True
     except Exception as e:
@@ -231,7 +792,8 @@ def link_goal_skill(db_path: str, goal_id: int, skill_id: int) -> bool:
 def get_goal_skills(db_path: str, goal_id: int) -> List[str]:
     """Получение навыков цели"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 SELECT н.название 
@@ -248,7 +810,8 @@ def get_goal_skills(db_path: str, goal_id: int) -> List[str]:
 def get_all_skills(db_path: str) -> List[str]:
     """Получение всех навыков"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT название FROM навыка")
             return [row[0] for row in c.fetchall()]
@@ -257,14 +820,17 @@ def get_all_skills(db_path: str) -> List[str]:
         return []
 
 
+@writes_data
 def add_competency_link(db_path: str, goal_id: int, competency_id: int, level: int) -> bool:
     """Связывание цели с компетенцией"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень)
                 VALUES (?, ?, ?)
+                ON CONFLICT (цель_id, компетенция_id) DO UPDATE SET уровень = excluded.уровень
             ''', (goal_id, competency_id, level))
             conn.commit()
             return True
@@ -276,7 +842,8 @@ def add_competency_link(db_path: str, goal_id: int, competency_id: int, level: i
 def get_goal_competencies(db_path: str, goal_id: int) -> List[Tuple]:
     """Получение компетенций цели"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 SELECT к.id, к.название, цк.уровень
@@ -293,7 +860,8 @@ def get_goal_competencies(db_path: str, goal_id: int) -> List[Tuple]:
 def get_all_competencies(db_path: str) -> List[Tuple]:
     """Получение всех компетенций"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT id, название FROM компетенции")
             return c.fetchall()
@@ -302,10 +870,12 @@ def get_all_competencies(db_path: str) -> List[Tuple]:
         return []
 
 
+@cached_query
 def get_competency_averages(db_path: str) -> List[Tuple]:
     """Получение средних уровней по компетенциям"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 SELECT к.название, к.категория, ROUND(AVG(цк.уровень), 1) as средний_уровень
@@ -320,67 +890,111 @@ def get_competency_averages(db_path: str) -> List[Tuple]:
         return []
 
 
-def check_achievements(db_path: str) -> List[str]:
-    """Проверка и обновление достижений"""
-    unlocked = []
+@cached_query
+def get_skill_statistics(db_path: str) -> List[Tuple]:
+    """Навыки и число связанных с ними целей"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
+            c.execute('''
+                SELECT н.название, COUNT(цн.цель_id) as количество
+                FROM навыка н
+                LEFT JOIN цель_навыки цн ON н.id = цн.навык_id
+                LEFT JOIN цели ц ON цн.цель_id = ц.id AND ц.статус = 'Завершена'
+                GROUP BY н.id
+                HAVING количество > 0
+            ''')
+            return c.fetchall()
+    except Exception as e:
+        print(f"❌ Ошибка загрузки статистики навыков: {e}")
+        return []
 
-            # 1. Старт - создана первая цель
-            c.execute("SELECT COUNT(*) FROM цели")
-            if c.fetchone()[0] >= 1:
-                c.execute("UPDATE достижения SET получено = 1 WHERE код = 'ach1'")
-                unlocked.append('ach1')
 
-            # 2. Пунктуальный - 3+ целей в срок
+@cached_query
+def get_goal_type_statistics(db_path: str) -> List[Tuple]:
+    """Число завершённых и всех целей по типам"""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
             c.execute('''
-                SELECT COUNT(*) FROM цели 
-                WHERE статус = 'Завершена' 
-                AND факт_дата IS NOT NULL 
-                AND план_дата IS NOT NULL
-                AND факт_дата <= план_дата
+                SELECT тип,
+                       SUM(CASE WHEN статус = 'Завершена' THEN 1 ELSE 0 END) as завершено,
+                       COUNT(*) as всего
+                FROM цели
+                GROUP BY тип
             ''')
-            if c.fetchone()[0] >= 3:
-                c.execute("UPDATE достижения SET получено = 1 WHERE код = 'ach2'")
-                unlocked.append('ach2')
+            return c.fetchall()
+    except Exception as e:
+        print(f"❌ Ошибка загрузки статистики типов: {e}")
+        return []
 
-            # 3. Многогранный - цели 3+ разных типов
-            c.execute("SELECT COUNT(DISTINCT тип) FROM цели WHERE статус = 'Завершена'")
-            if c.fetchone()[0] >= 3:
-                c.execute("UPDATE достижения SET получено = 1 WHERE код = 'ach3'")
-                unlocked.append('ach3')
 
-            # 4. Навыковый рост - у одного навыка 4+ целей
+@cached_query
+def get_timely_completion(db_path: str) -> Tuple[int, int]:
+    """Число завершённых целей с фактической датой и из них завершённых в срок"""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
             c.execute('''
-                SELECT н.название, COUNT(цн.цель_id) 
-                FROM навыка н
-                JOIN цель_навыки цн ON н.id = цн.навык_id
-                JOIN цели ц ON цн.цель_id = ц.id AND ц.статус = 'Завершена'
-                GROUP BY н.id
-                HAVING COUNT(цн.цель_id) >= 4
-            ''')
-            if c.fetchone():
-                c.execute("UPDATE достижения SET получено = 1 WHERE код = 'ach4'")
-                unlocked.append('ach4')
+                SELECT COUNT(*), COALESCE(SUM(факт_день <= план_день), 0)
+                FROM цели
+                WHERE статус = ? AND факт_день IS NOT NULL
+            ''', (COMPLETED_STATUS,))
+            return c.fetchone()
+    except Exception as e:
+        print(f"❌ Ошибка загрузки статистики сроков: {e}")
+        return 0, 0
 
-            # 5. Планирование - 5+ целей в процессе
-            c.execute("SELECT COUNT(*) FROM цели WHERE статус = 'В процессе'")
-            if c.fetchone()[0] >= 5:
-                c.execute("UPDATE достижения SET получено = 1 WHERE код = 'ach5'")
-                unlocked.append('ach5')
 
-            conn.commit()
+def check_achievements(db_path: str, rules: Optional[List[AchievementRule]] = None) -> List[str]:
+    """Проверка достижений по счётчикам, которые изменились с прошлой проверки
+
+    Возвращает коды достижений, полученных при этой проверке
+    """
+    rules = ACHIEVEMENT_RULES if rules is None else rules
+    unlocked = []
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
+
+            c.execute("SELECT DISTINCT счётчик FROM счётчики WHERE изменён = 1")
+            changed = {row[0] for row in c.fetchall()}
+            if not changed:
+                return unlocked
+
+            c.execute("SELECT код FROM достижения WHERE получено = 1")
+            obtained = {row[0] for row in c.fetchall()}
+
+            counters = {}
+            for rule in rules:
+                if rule.code in obtained or rule.counter not in changed:
+                    continue
+                if rule.counter not in counters:
+                    c.execute("SELECT ключ, значение FROM счётчики WHERE счётчик = ?", (rule.counter,))
+                    counters[rule.counter] = dict(c.fetchall())
+                if rule.predicate(counters[rule.counter]):
+                    unlocked.append(rule.code)
+
+            c.executemany("UPDATE достижения SET получено = 1 WHERE код = ?", [(code,) for code in unlocked])
+            c.execute("UPDATE счётчики SET изменён = 0 WHERE изменён = 1")
+        if unlocked:
+            query_cache.bump(_db_key(db_path))
         return unlocked
     except Exception as e:
         print(f"❌ Ошибка проверки достижений: {e}")
         return []
 
 
+@cached_query
 def get_all_achievements(db_path: str) -> List[Tuple]:
     """Получение всех достижений"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT * FROM достижения ORDER BY получено DESC, название")
             return c.fetchall()
@@ -389,10 +1003,12 @@ def get_all_achievements(db_path: str) -> List[Tuple]:
         return []
 
 
+@writes_data
 def add_semester_goal(db_path: str, text: str, goal_type: str, param: str, target: int) -> Optional[int]:
     """Добавление цели на семестр"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute('''
                 INSERT INTO цель_каса (текст_цели, тип_цели, параметр, целевой_прогресс)
@@ -408,7 +1024,8 @@ def add_semester_goal(db_path: str, text: str, goal_type: str, param: str, targe
 def get_semester_goals(db_path: str) -> List[Tuple]:
     """Получение всех целей на семестр"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("SELECT id, текст_цели, тип_цели, текущий_прогресс, целевой_прогресс FROM цель_каса")
             return c.fetchall()
@@ -417,10 +1034,12 @@ def get_semester_goals(db_path: str) -> List[Tuple]:
         return []
 
 
+@writes_data
 def delete_semester_goal(db_path: str, goal_id: int) -> bool:
     """Удаление цели на семестр"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("DELETE FROM цель_каса WHERE id = ?", (goal_id,))
             conn.commit()
@@ -430,14 +1049,235 @@ def delete_semester_goal(db_path: str, goal_id: int) -> bool:
         return False
 
 
+@writes_data
 def update_semester_progress(db_path: str, goal_id: int, progress: int) -> bool:
     """Обновление прогресса цели на семестр"""
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = get_connection(db_path)
+        with conn:
             c = conn.cursor()
             c.execute("UPDATE цель_каса SET текущий_прогресс = ? WHERE id = ?", (progress, goal_id))
             conn.commit()
             return True
     except Exception as e:
         print(f"❌ Ошибка обновления прогресса: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+@writes_data
+def clear_all_data(db_path: str) -> bool:
+    """Удаление всех целей, навыков, компетенций и целей на семестр, сброс достижений"""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
+            for table in ['цели', 'навыка', 'цель_навыки', 'компетенции', 'цель_компетенции', 'цель_каса']:
+                c.execute(f"DELETE FROM {table}")
+            c.execute("UPDATE достижения SET получено = 0")
+        return True
+    except Exception as e:
+        print(f"❌ Ошибка очистки данных: {e}")
+        return False
+
+
+def _semester_goal_source(text: str, goal_type: str, param: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+    """Откуда берётся прогресс цели на семестр
+
+    ('count', тип) - число завершённых целей типа (None - всех типов),
+    ('competency', название) - средний уровень компетенции по завершённым целям,
+    None - прогресс не вычисляется автоматически
+    """
+    if goal_type == 'Количество':
+        for keyword, counted_type in SEMESTER_COUNT_TYPES.items():
+            if keyword in text.lower() or (param and keyword in param.lower()):
+                return 'count', counted_type
+        return 'count', None
+    if goal_type == 'Повышение компетенции' and param:
+        return 'competency', param
+    return None
+
+
+@writes_data
+def recalculate_semester_progress(db_path: str, goal_types: Optional[Iterable[str]] = None,
+                                  competency_ids: Optional[Iterable[int]] = None) -> int:
+    """Пересчёт прогресса целей на семестр одним проходом агрегации
+
+    Без аргументов пересчитываются все цели. Если переданы goal_types и/или competency_ids,
+    пересчитываются только цели на семестр, которые от них зависят.
+    Возвращает число обновлённых целей на семестр.
+    """
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
+            full = goal_types is None and competency_ids is None
+            goal_types = set(goal_types or ())
+            competency_names = set()
+            if competency_ids:
+                competency_ids = list(set(competency_ids))
+                c.execute(f"SELECT название FROM компетенции WHERE id IN ({', '.join('?' * len(competency_ids))})",
+                          competency_ids)
+                competency_names = {row[0] for row in c.fetchall()}
+
+            c.execute("SELECT id, текст_цели, тип_цели, параметр, текущий_прогресс FROM цель_каса")
+            affected = []
+            for goal_id, text, goal_type, param, current in c.fetchall():
+                source = _semester_goal_source(text, goal_type, param)
+                if not full:
+                    if source is None:
+                        continue
+                    kind, key = source
+                    if kind == 'count' and not (goal_types and (key is None or key in goal_types)):
+                        continue
+                    if kind == 'competency' and key not in competency_names:
+                        continue
+                affected.append((goal_id, source, current))
+
+            if not affected:
+                return 0
+
+            # Завершённые цели по типам - один сгруппированный запрос
+            counts = {}
+            if any(source and source[0] == 'count' for _, source, _ in affected):
+                c.execute("SELECT тип, COUNT(*) FROM цели WHERE статус = ? GROUP BY тип", (COMPLETED_STATUS,))
+                counts = dict(c.fetchall())
+
+            # Средние уровни только нужных компетенций - один сгруппированный запрос
+            averages = {}
+            names = list({source[1] for _, source, _ in affected if source and source[0] == 'competency'})
+            if names:
+                c.execute(f'''
+                    SELECT к.название, ROUND(AVG(цк.уровень), 0)
+                    FROM компетенции к
+                    JOIN цель_компетенции цк ON к.id = цк.компетенция_id
+                    JOIN цели ц ON цк.цель_id = ц.id AND ц.статус = ?
+                    WHERE к.название IN ({', '.join('?' * len(names))})
+                    GROUP BY к.название
+                ''', (COMPLETED_STATUS, *names))
+                averages = dict(c.fetchall())
+
+            updates = []
+            for goal_id, source, current in affected:
+                progress = 0
+                if source and source[0] == 'count':
+                    progress = counts.get(source[1], 0) if source[1] else sum(counts.values())
+                elif source:
+                    progress = int(averages.get(source[1]) or 0)
+                if progress != current:
+                    updates.append((progress, goal_id))
+
+            c.executemany("UPDATE цель_каса SET текущий_прогресс = ? WHERE id = ?", updates)
+        return len(updates)
+    except Exception as e:
+        print(f"❌ Ошибка расчета прогресса: {e}")
+        return 0
+
+
+@writes_data
+def import_goals(db_path: str, records: Iterable[Dict[str, Any]],
+                 batch_size: int = BULK_BATCH_SIZE) -> Optional[ImportResult]:
+    """Пакетная загрузка целей с навыками и компетенциями одной транзакцией
+
+    records - словари полей GOAL_FIELDS, 'навыки' (список названий) и 'компетенции'
+    (список пар (название, уровень)); читаются потоком пачками по batch_size.
+    Навыки и компетенции ищутся по названию в словарях в памяти, недостающие создаются.
+    При любой ошибке не загружается ничего.
+    """
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
+            if not conn.in_transaction:
+                c.execute("BEGIN IMMEDIATE")
+
+            c.execute("SELECT название, id FROM навыка")
+            skill_ids = dict(c.fetchall())
+            c.execute("SELECT название, MIN(id) FROM компетенции GROUP BY название")
+            competency_ids = dict(c.fetchall())
+
+            # id новых целей назначаются заранее: lastrowid после executemany не определён
+            c.execute("""
+                SELECT MAX(COALESCE((SELECT MAX(id) FROM цели), 0),
+                           COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'цели'), 0))
+            """)
+            next_goal_id = c.fetchone()[0] + 1
+
+            def resolve(name, ids, insert_sql):
+                if name not in ids:
+                    c.execute(insert_sql, (name,))
+                    ids[name] = c.lastrowid
+                return ids[name]
+
+            goals_sql = f"INSERT INTO цели (id, {', '.join(GOAL_FIELDS)}) " \
+                        f"VALUES ({', '.join('?' * (len(GOAL_FIELDS) + 1))})"
+            totals = [0, len(skill_ids), len(competency_ids), 0, 0]
+            records = iter(records)
+            while True:
+                batch = [record for _, record in zip(range(batch_size), records)]
+                if not batch:
+                    break
+
+                goals, skill_links, competency_links = [], set(), {}
+                for record in batch:
+                    goal_id = next_goal_id
+                    next_goal_id += 1
+                    goal = normalize_goal_dates(record)
+                    goals.append((goal_id, *(goal.get(field) for field in GOAL_FIELDS)))
+                    for name in record.get('навыки') or ():
+                        skill_links.add((goal_id, resolve(name, skill_ids, "INSERT INTO навыка (название) VALUES (?)")))
+                    for name, level in record.get('компетенции') or ():
+                        comp_id = resolve(name, competency_ids, "INSERT INTO компетенции (название) VALUES (?)")
+                        competency_links[goal_id, comp_id] = level
+
+                c.executemany(goals_sql, goals)
+                c.executemany("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)", sorted(skill_links))
+                c.executemany("INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень) VALUES (?, ?, ?)",
+                              [(goal_id, comp_id, level) for (goal_id, comp_id), level in competency_links.items()])
+                totals[0] += len(goals)
+                totals[3] += len(skill_links)
+                totals[4] += len(competency_links)
+
+        return ImportResult(totals[0], len(skill_ids) - totals[1], len(competency_ids) - totals[2],
+                            totals[3], totals[4])
+    except Exception as e:
+        print(f"❌ Ошибка импорта целей: {e}")
+        return None
+
+
+def iter_goals_with_links(db_path: str, batch_size: int = BULK_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Потоковое чтение целей с навыками и компетенциями в формате import_goals
+
+    Цели читаются страницами по id, связи - одним запросом на страницу.
+    """
+    conn = get_connection(db_path)
+    last_id = 0
+    while True:
+        rows = conn.execute(f"SELECT id, {', '.join(GOAL_FIELDS)} FROM цели WHERE id > ? ORDER BY id LIMIT ?",
+                            (last_id, batch_size)).fetchall()
+        if not rows:
+            return
+        first_id, last_id = rows[0][0], rows[-1][0]
+
+        skills = {}
+        for goal_id, name in conn.execute("""
+            SELECT цн.цель_id, н.название
+            FROM цель_навыки цн
+            JOIN навыка н ON н.id = цн.навык_id
+            WHERE цн.цель_id BETWEEN ? AND ?
+        """, (first_id, last_id)):
+            skills.setdefault(goal_id, []).append(name)
+
+        competencies = {}
+        for goal_id, name, level in conn.execute("""
+            SELECT цк.цель_id, к.название, цк.уровень
+            FROM цель_компетенции цк
+            JOIN компетенции к ON к.id = цк.компетенция_id
+            WHERE цк.цель_id BETWEEN ? AND ?
+        """, (first_id, last_id)):
+            competencies.setdefault(goal_id, []).append((name, level))
+
+        for goal_id, *values in rows:
+            record = dict(zip(GOAL_FIELDS, values))
+            record['навыки'] = skills.get(goal_id, [])
+            record['компетенции'] = competencies.get(goal_id, [])
+            yield record
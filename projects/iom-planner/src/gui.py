@@ -3,19 +3,21 @@
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
 import os
-from datetime import datetime
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+import queue
+import threading
 
+from . import analytics
 from . import database
 from . import models
+from . import report
 from . import utils
 
 
 class IOMApp:
     def __init__(self, root):
         self.root = root
+        self._export_events = None
         self.root.title("Планировщик индивидуального образовательного маршрута")
         self.root.geometry("1200x800")
 
@@ -64,6 +66,17 @@ class IOMApp:
         self.notebook.add(self.tab_settings, text='Настройки')
         self.create_settings_tab()
 
+        # Статистика обновляется при каждом открытии вкладки (из кэша, если данные не менялись)
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+
+    def _on_tab_changed(self, event):
+        """Обновление вкладок статистики при переключении"""
+        selected = self.notebook.select()
+        if selected == str(self.tab_profile):
+            self.update_profile_stats()
+        elif selected == str(self.tab_competencies):
+            self.update_competencies_stats()
+
     # ============= ВКЛАДКА "МОИ ЦЕЛИ" =============
     def create_goals_tab(self):
         """Создание вкладки со списком целей"""
@@ -124,11 +137,15 @@ class IOMApp:
         goal_id = item['values'][0]
 
         if messagebox.askyesno("Подтверждение", "Удалить выбранную цель?"):
+            goal = database.get_goal_by_id("iom.db", goal_id)
+            competency_ids = [row[0] for row in database.get_goal_competencies("iom.db", goal_id)]
             database.delete_goal("iom.db", goal_id)
             self.refresh_goals()
             self.check_all_achievements()
             self.update_stats()
-            self.update_semester_progress_auto()
+            # Прогресс семестра зависит только от завершённых целей
+            if goal and goal[3] == database.COMPLETED_STATUS:
+                self.update_semester_progress_auto([goal[2]], competency_ids)
 
     def _open_goal_window(self, goal_id=None):
         """Общее окно для добавления/редактирования цели"""
@@ -273,6 +290,13 @@ class IOMApp:
             messagebox.showerror("Ошибка", "Заполните обязательные поля: Название, Тип, Статус")
             return
 
+        try:
+            database.normalize_date(plan_date)
+            database.normalize_date(fact_date)
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"Неверная дата: {e}")
+            return
+
         # Обработка навыков
         skills_list = []
         if skills_text:
@@ -299,41 +323,29 @@ class IOMApp:
             messagebox.showerror("Ошибка", "Выберите хотя бы 1 компетенцию")
             return
 
-        # Сохранение в БД
-        if goal_id:  # Редактирование
-            database.update_goal("iom.db", goal_id, name, goal_type, status, plan_date, fact_date, temp, description)
-        else:  # Добавление
-            goal_id = database.add_goal("iom.db", name, goal_type, status, plan_date, fact_date, temp, description)
-
-        if not goal_id:
+        # Сохранение цели со связями одной транзакцией
+        goal = {'id': goal_id, 'название': name, 'тип': goal_type, 'статус': status, 'план_дата': plan_date,
+                'факт_дата': fact_date, 'темп': temp, 'описание': description}
+        result = database.save_goal_aggregate("iom.db", goal, skills_list, selected_competencies)
+        if result is None:
             messagebox.showerror("Ошибка", "Не удалось сохранить цель")
             return
 
-        # Сохраняем навыки (сначала удаляем старые связи)
-        with sqlite3.connect('iom.db') as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM цель_навыки WHERE цель_id = ?", (goal_id,))
-
-            for skill_name in skills_list:
-                skill_id = database.add_skill("iom.db", skill_name)
-                if skill_id:
-                    c.execute("INSERT INTO цель_навыки (цель_id, навык_id) VALUES (?, ?)", (goal_id, skill_id))
-
-            # Сохраняем компетенции (сначала удаляем старые связи)
-            c.execute("DELETE FROM цель_компетенции WHERE цель_id = ?", (goal_id,))
-            for comp_id, level in selected_competencies:
-                c.execute('''
-                    INSERT INTO цель_компетенции (цель_id, компетенция_id, уровень)
-                    VALUES (?, ?, ?)
-                ''', (goal_id, comp_id, level))
-
-            conn.commit()
-
         messagebox.showinfo("Успех", "Цель сохранена")
-        self.refresh_goals()
-        self.check_all_achievements()
-        self.update_stats()
-        self.update_semester_progress_auto()
+
+        # Пересчитывается только то, что зависит от изменившихся данных
+        fields_changed = set(result.fields_changed)
+        progress_changed = bool(fields_changed & {'тип', 'статус', 'план_дата', 'факт_дата'})
+        if fields_changed:
+            self.refresh_goals()
+        if progress_changed or result.skills_changed:
+            self.check_all_achievements()
+        if progress_changed or result.skills_changed or result.competency_links_changed:
+            self.update_stats()
+        goal_types = result.affected_goal_types()
+        competency_ids = result.affected_competency_ids()
+        if goal_types or competency_ids:
+            self.update_semester_progress_auto(goal_types, competency_ids)
 
     # ============= ВКЛАДКА "МОЙ ПРОФИЛЬ" =============
     def create_profile_tab(self):
@@ -358,17 +370,35 @@ class IOMApp:
         types_frame = ttk.LabelFrame(stats_frame, text="Статистика по типам целей")
         types_frame.pack(fill='both', expand=True, padx=5, pady=5)
 
-        self.types_tree = ttk.Treeview(types_frame, columns=('Тип', 'Завершено', 'Всего'), show='headings', height=5)
-        self.types_tree.heading('Тип', text='Тип')
-        self.types_tree.heading('Завершено', text='Завершено')
-        self.types_tree.heading('Всего', text='Всего')
+        type_columns = ('Тип', 'Завершено', 'Всего', 'В месяц', 'Лучший месяц', 'Опоздание, дн.')
+        self.types_tree = ttk.Treeview(types_frame, columns=type_columns, show='headings', height=5)
+        for column in type_columns:
+            self.types_tree.heading(column, text=column)
+            self.types_tree.column(column, width=110 if column != 'Тип' else 150)
         self.types_tree.pack(fill='both', expand=True, padx=5, pady=5)
 
+        # Динамика по месяцам плановой даты
+        months_frame = ttk.LabelFrame(stats_frame,
+                                      text=f"Динамика по месяцам (скользящее окно {analytics.ROLLING_MONTHS} мес.)")
+        months_frame.pack(fill='both', expand=True, padx=5, pady=5)
+
+        month_columns = ('Месяц', 'Запланировано', 'Завершено', 'В срок', '% завершения', '% в срок',
+                         'Опоздание, дн.')
+        self.months_tree = ttk.Treeview(months_frame, columns=month_columns, show='headings', height=6)
+        for column in month_columns:
+            self.months_tree.heading(column, text=column)
+            self.months_tree.column(column, width=100)
+        self.months_tree.pack(fill='both', expand=True, padx=5, pady=5)
+
         # Процент целей в срок
         timely_frame = ttk.Frame(stats_frame)
         timely_frame.pack(fill='x', padx=5, pady=5)
         self.timely_label = ttk.Label(timely_frame, text="Процент целей, завершённых в срок: 0%")
         self.timely_label.pack()
+        self.lateness_label = ttk.Label(timely_frame)
+        self.lateness_label.pack()
+        self.cache_label = ttk.Label(timely_frame, foreground='gray')
+        self.cache_label.pack()
 
         # Кнопка обновления
         ttk.Button(stats_frame, text="Обновить статистику", command=self.update_profile_stats).pack(pady=10)
@@ -378,56 +408,48 @@ class IOMApp:
     def update_profile_stats(self):
         """Обновление статистики в профиле"""
         # Очищаем деревья
-        for tree in [self.skills_tree, self.types_tree]:
+        for tree in [self.skills_tree, self.types_tree, self.months_tree]:
             for item in tree.get_children():
                 tree.delete(item)
 
-        with sqlite3.connect('iom.db') as conn:
-            c = conn.cursor()
-
-            # Статистика по навыкам
-            c.execute('''
-                SELECT н.название, COUNT(цн.цель_id) as количество
-                FROM навыка н
-                LEFT JOIN цель_навыки цн ON н.id = цн.навык_id
-                LEFT JOIN цели ц ON цн.цель_id = ц.id AND ц.статус = 'Завершена'
-                GROUP BY н.id
-                HAVING количество > 0
-            ''')
-            skills = c.fetchall()
-            for skill in skills:
-                self.skills_tree.insert('', 'end', values=skill)
-
-            # Статистика по типам целей
-            c.execute('''
-                SELECT тип, 
-                       SUM(CASE WHEN статус = 'Завершена' THEN 1 ELSE 0 END) as завершено,
-                       COUNT(*) as всего
-                FROM цели
-                GROUP BY тип
-            ''')
-            types = c.fetchall()
-            for type_stat in types:
-                self.types_tree.insert('', 'end', values=type_stat)
-
-            # Процент целей, завершённых в срок
-            c.execute("SELECT COUNT(*) FROM цели WHERE статус = 'Завершена' AND факт_дата IS NOT NULL")
-            completed_total = c.fetchone()[0]
-
-            c.execute('''
-                SELECT COUNT(*) FROM цели 
-                WHERE статус = 'Завершена' 
-                AND факт_дата IS NOT NULL 
-                AND план_дата IS NOT NULL
-                AND факт_дата <= план_дата
-            ''')
-            timely_completed = c.fetchone()[0]
-
-            if completed_total > 0:
-                percentage = (timely_completed / completed_total) * 100
-                self.timely_label.config(text=f"Процент целей, завершённых в срок: {percentage:.1f}%")
-            else:
-                self.timely_label.config(text="Процент целей, завершённых в срок: 0%")
+        # Статистика по навыкам
+        for skill in database.get_skill_statistics('iom.db'):
+            self.skills_tree.insert('', 'end', values=skill)
+
+        # Статистика и темп по типам целей
+        throughput = {row.goal_type: row for row in analytics.get_type_throughput('iom.db')}
+        for goal_type, completed, total in database.get_goal_type_statistics('iom.db'):
+            pace = throughput.get(goal_type)
+            self.types_tree.insert('', 'end', values=(
+                goal_type, completed, total,
+                pace.per_month if pace else '—',
+                pace.best_month if pace else '—',
+                pace.avg_lateness if pace and pace.avg_lateness is not None else '—',
+            ))
+
+        # Динамика по месяцам
+        for month in analytics.get_monthly_completion('iom.db'):
+            self.months_tree.insert('', 'end', values=tuple('—' if value is None else value for value in month))
+
+        # Процент целей, завершённых в срок
+        completed_total, timely_completed = database.get_timely_completion('iom.db')
+        if completed_total > 0:
+            percentage = (timely_completed / completed_total) * 100
+            self.timely_label.config(text=f"Процент целей, завершённых в срок: {percentage:.1f}%")
+        else:
+            self.timely_label.config(text="Процент целей, завершённых в срок: 0%")
+
+        lateness = analytics.get_lateness_summary('iom.db')
+        if lateness.late:
+            self.lateness_label.config(text=f"Завершено с опозданием: {lateness.late} из {lateness.completed}, "
+                                            f"в среднем на {lateness.avg_lateness} дн., "
+                                            f"максимум {lateness.max_lateness} дн.")
+        else:
+            self.lateness_label.config(text="Опозданий нет")
+
+        cache = database.get_cache_stats()
+        self.cache_label.config(text=f"Кэш запросов: попаданий {cache['hits']}, промахов {cache['misses']} "
+                                     f"({cache['hit_rate']:.0%})")
 
     # ============= ВКЛАДКА "КОМПЕТЕНЦИИ" =============
     def create_competencies_tab(self):
@@ -542,9 +564,9 @@ class IOMApp:
             self.achievements_tree.insert('', 'end', values=(status, ach[1], ach[2]))
 
     def check_all_achievements(self):
-        """Проверка всех достижений"""
-        unlocked = database.check_achievements("iom.db")
-        self.update_achievements_list()
+        """Проверка достижений, зависящих от изменившихся счётчиков"""
+        if database.check_achievements("iom.db"):
+            self.update_achievements_list()
 
     # ============= ВКЛАДКА "ЦЕЛИ НА СЕМЕСТР" =============
     def create_semester_tab(self):
@@ -631,9 +653,12 @@ class IOMApp:
             database.delete_semester_goal("iom.db", goal_id)
             self.update_semester_progress_auto()
 
-    def update_semester_progress_auto(self):
-        """Автоматическое обновление прогресса целей на семестр"""
-        utils.calculate_semester_progress('iom.db')
+    def update_semester_progress_auto(self, goal_types=None, competency_ids=None):
+        """Автоматическое обновление прогресса целей на семестр
+
+        Если переданы типы целей и/или id компетенций, пересчитываются только зависящие от них цели
+        """
+        utils.calculate_semester_progress('iom.db', goal_types, competency_ids)
         self._refresh_semester_goals()
 
     def _refresh_semester_goals(self):
@@ -697,17 +722,7 @@ class IOMApp:
         """Очистка всех данных (для отладки)"""
         if messagebox.askyesno("Подтверждение",
                                "Вы уверены, что хотите удалить все данные?\nЭто действие нельзя отменить."):
-            with sqlite3.connect('iom.db') as conn:
-                c = conn.cursor()
-
-                tables = ['цели', 'навыка', 'цель_навыки', 'компетенции',
-                          'цель_компетенции', 'цель_каса']
-
-                for table in tables:
-                    c.execute(f"DELETE FROM {table}")
-
-                c.execute("UPDATE достижения SET получено = 0")
-                conn.commit()
+            database.clear_all_data('iom.db')
 
             # Перезагружаем компетенции из JSON
             database.load_competencies_to_db()
@@ -727,130 +742,50 @@ class IOMApp:
         self.update_competencies_stats()
 
     def export_to_word(self):
-        """Экспорт отчёта в Word"""
-        try:
-            from docx import Document
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-            doc = Document()
-
-            title = doc.add_heading('Индивидуальный образовательный маршрут', 0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-            doc.add_paragraph(f"Отчёт сформирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
-            doc.add_paragraph()
-
-            doc.add_heading('Цели', level=1)
-
-            with sqlite3.connect('iom.db') as conn:
-                c = conn.cursor()
-                c.execute("SELECT * FROM цели ORDER BY статус, план_дата")
-                goals = c.fetchall()
-
-                if goals:
-                    for goal in goals:
-                        doc.add_heading(goal[1], level=2)
-                        doc.add_paragraph(f"Тип: {goal[2]}")
-                        doc.add_paragraph(f"Статус: {goal[3]}")
-                        doc.add_paragraph(f"Плановая дата: {goal[4] or 'Не указана'}")
-                        doc.add_paragraph(f"Фактическая дата: {goal[5] or 'Не указана'}")
-                        if goal[6]:
-                            doc.add_paragraph(f"Темп: {goal[6]}")
-
-                        if goal[7]:
-                            utils.add_formatted_text_to_doc(doc, goal[7])
-
-                        doc.add_paragraph()
-                else:
-                    doc.add_paragraph("Цели не добавлены")
-
-                doc.add_heading('Навыки', level=1)
-                c.execute('''
-                    SELECT н.название, COUNT(цн.цель_id) as количество
-                    FROM навыка н
-                    LEFT JOIN цель_навыки цн ON н.id = цн.навык_id
-                    LEFT JOIN цели ц ON цн.цель_id = ц.id AND ц.статус = 'Завершена'
-                    GROUP BY н.id
-                    HAVING количество > 0
-                ''')
-                skills = c.fetchall()
-
-                if skills:
-                    for skill in skills:
-                        doc.add_paragraph(f"{skill[0]} — {skill[1]} цели", style='List Bullet')
-                else:
-                    doc.add_paragraph("Навыки не указаны")
-
-                doc.add_heading('Компетенции', level=1)
-
-                table = doc.add_table(rows=1, cols=3)
-                table.style = 'Light Grid Accent 1'
-
-                hdr_cells = table.rows[0].cells
-                hdr_cells[0].text = 'Компетенция'
-                hdr_cells[1].text = 'Категория'
-                hdr_cells[2].text = 'Средний уровень'
-
-                comp_stats = database.get_competency_averages("iom.db")
-
-                for comp in comp_stats:
-                    row_cells = table.add_row().cells
-                    row_cells[0].text = comp[0] or ''
-                    row_cells[1].text = comp[1] or ''
-                    row_cells[2].text = str(comp[2]) if comp[2] else 'Нет данных'
-
-                doc.add_heading('Слабые зоны', level=1)
-                weak_zones = [comp for comp in comp_stats if comp[2] is not None and comp[2] < 3]
-
-                if weak_zones:
-                    for zone in weak_zones:
-                        doc.add_paragraph(f"{zone[0]} — уровень {zone[2]}", style='List Bullet')
-                else:
-                    doc.add_paragraph("Слабых зон не обнаружено")
-
-                doc.add_heading('Рекомендации', level=1)
-
-                recommendations = []
-                for comp in comp_stats:
-                    if comp[2] is not None and comp[2] < 3:
-                        if comp[0] == "Презентация результатов":
-                            recommendations.append(
-                                "Вы почти не развиваете компетенцию 'Презентация результатов'. Рекомендуем выступить на студенческой конференции.")
-                        elif comp[0] == "Работа с БД":
-                            recommendations.append(
-                                "Для развития компетенции 'Работа с БД' пройдите курс по SQL или поработайте над проектом с базами данных.")
-                        elif comp[0] == "Управление проектами":
-                            recommendations.append(
-                                "Для развития 'Управления проектами' возьмите на себя роль тимлида в учебном проекте.")
-
-                if recommendations:
-                    for rec in recommendations:
-                        doc.add_paragraph(rec, style='List Bullet')
-                else:
-                    doc.add_paragraph("Все компетенции развиваются хорошо. Продолжайте в том же духе!")
-
-                doc.add_heading('Достижения', level=1)
-                achievements = database.get_all_achievements("iom.db")
-                obtained = [a for a in achievements if a[3] == 1]
-
-                if obtained:
-                    for ach in obtained:
-                        doc.add_paragraph(f"{ach[1]} — {ach[2]}", style='List Bullet')
-                else:
-                    doc.add_paragraph("Достижения не получены")
+        """Экспорт отчёта в Word: снимок данных в потоке Tk, построение документа в рабочем потоке"""
+        if self._export_events is not None:
+            messagebox.showinfo("Отчёт", "Отчёт уже формируется")
+            return
 
-                doc.add_heading('Цели на семестр', level=1)
-                semester_goals = database.get_semester_goals("iom.db")
+        snapshot = report.take_snapshot('iom.db')
+        events = self._export_events = queue.Queue()
 
-                if semester_goals:
-                    for goal in semester_goals:
-                        doc.add_paragraph(f"{goal[1]} — {goal[3]} из {goal[4]}", style='List Bullet')
-                else:
-                    doc.add_paragraph("Цели на семестр не установлены")
+        def work():
+            try:
+                filename = report.save_report(snapshot, progress=lambda done, total: events.put(('progress', done)))
+                events.put(('done', filename))
+            except Exception as e:
+                events.put(('error', e))
 
-            filename = f"Отчет_ИОМ_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-            doc.save(filename)
-            messagebox.showinfo("Успех", f"Отчёт сохранён в файл: {filename}")
+        window = tk.Toplevel(self.root)
+        window.title("Формирование отчёта")
+        window.geometry("360x100")
+        window.transient(self.root)
+        window.protocol("WM_DELETE_WINDOW", lambda: None)
+        ttk.Label(window, text=f"Целей в отчёте: {len(snapshot.goals)}").pack(pady=(15, 5))
+        bar = ttk.Progressbar(window, maximum=snapshot.steps, length=320)
+        bar.pack(padx=20)
+
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(100, self._poll_export, window, bar)
+
+    def _poll_export(self, window, bar):
+        """Обработка событий построения отчёта в потоке Tk"""
+        events = self._export_events
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                self.root.after(100, self._poll_export, window, bar)
+                return
+            if kind == 'progress':
+                bar['value'] = value
+                continue
 
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось создать отчёт: {str(e)}")
\ No newline at end of file
+            self._export_events = None
+            window.destroy()
+            if kind == 'done':
+                messagebox.showinfo("Успех", f"Отчёт сохранён в файл: {value}")
+            else:
+                messagebox.showerror("Ошибка", f"Не удалось создать отчёт: {str(value)}")
+            return
\ No newline at end of file
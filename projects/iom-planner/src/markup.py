@@ -0,0 +1,93 @@
+"""
+Простая разметка описаний целей: разбор в дерево и вывод в текст
+
+Поддерживается: "# заголовок", "- пункт списка", **жирный**, *курсив*, __курсив__,
+[текст](ссылка) - любое число элементов в строке.
+Разобранное дерево кэшируется по содержимому текста и общее для всех способов вывода
+(предпросмотр Tk и Word - в utils).
+"""
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# Число разобранных описаний в кэше
+PARSE_CACHE_SIZE = 4096
+
+HEADING, BULLET, PARAGRAPH, BLANK = 'heading', 'bullet', 'paragraph', 'blank'
+TEXT, BOLD, ITALIC, LINK = 'text', 'bold', 'italic', 'link'
+
+_INLINE = re.compile(
+    r'\*\*(?P<bold>.+?)\*\*'
+    r'|__(?P<underscore>.+?)__'
+    r'|\*(?P<italic>.+?)\*'
+    r'|\[(?P<link_text>[^\]]*)\]\((?P<url>[^)]*)\)'
+)
+
+
+class Inline(NamedTuple):
+    """Фрагмент строки: вид, текст и адрес для ссылки"""
+    kind: str
+    text: str
+    url: Optional[str] = None
+
+
+class Block(NamedTuple):
+    """Строка описания: заголовок, пункт списка, абзац или пустая строка"""
+    kind: str
+    inlines: Tuple[Inline, ...] = ()
+
+
+_BLANK_BLOCK = Block(BLANK)
+
+
+def parse_inlines(line: str) -> Tuple[Inline, ...]:
+    """Разбор строки на фрагменты за один проход регулярным выражением"""
+    if '*' not in line and '_' not in line and '[' not in line:
+        return (Inline(TEXT, line),)
+
+    inlines = []
+    position = 0
+    for match in _INLINE.finditer(line):
+        start = match.start()
+        if start > position:
+            inlines.append(Inline(TEXT, line[position:start]))
+        group = match.lastgroup
+        if group == 'url':
+            inlines.append(Inline(LINK, match.group('link_text'), match.group('url')))
+        else:
+            inlines.append(Inline(BOLD if group == 'bold' else ITALIC, match.group(group)))
+        position = match.end()
+    if position < len(line):
+        inlines.append(Inline(TEXT, line[position:]))
+    return tuple(inlines)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(text: str) -> Tuple[Block, ...]:
+    """Разбор описания в дерево; результат неизменяемый и кэшируется по содержимому"""
+    blocks = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            blocks.append(_BLANK_BLOCK)
+        elif line.startswith('# '):
+            blocks.append(Block(HEADING, parse_inlines(line[2:])))
+        elif line.startswith('- '):
+            blocks.append(Block(BULLET, parse_inlines(line[2:])))
+        else:
+            blocks.append(Block(PARAGRAPH, parse_inlines(line)))
+    return tuple(blocks)
+
+
+def inline_plain_text(inline: Inline) -> str:
+    """Фрагмент без разметки; у ссылки адрес в скобках"""
+    if inline.kind == LINK:
+        return f"{inline.text} ({inline.url})"
+    return inline.text
+
+
+def render_plain(blocks: Tuple[Block, ...]) -> str:
+    """Вывод дерева обычным текстом для отображения в GUI"""
+    prefixes = {HEADING: 'ЗАГОЛОВОК: ', BULLET: '• '}
+    return '\n'.join(prefixes.get(block.kind, '') + ''.join(inline_plain_text(inline) for inline in block.inlines)
+                     for block in blocks)
@@ -0,0 +1,69 @@
+"""
+Кэш результатов запросов, привязанный к версии данных
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+class QueryCache:
+    """Результаты запросов по ключу (база, запрос, аргументы)
+
+    Запись действительна, пока не изменилась версия данных, с которой она сохранена.
+    Версию базы увеличивает bump() после каждой записи через модуль database.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, db_key: str) -> int:
+        """Текущая версия данных базы"""
+        with self._lock:
+            return self._versions.get(db_key, 0)
+
+    def bump(self, db_key: str) -> None:
+        """Новая версия данных: все сохранённые результаты базы устаревают"""
+        with self._lock:
+            self._versions[db_key] = self._versions.get(db_key, 0) + 1
+
+    def get(self, key: Hashable, version: Hashable) -> Tuple[bool, Any]:
+        """(найдено, результат) для ключа и версии данных"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """Сохранение результата; при переполнении вытесняется самый старый"""
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очистка результатов и метрик"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики: попадания, промахи, доля попаданий и число записей"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+            }
@@ -0,0 +1,239 @@
+"""
+Отчёт ИОМ в Word: снимок данных и построение документа
+
+Снимок (take_snapshot) читается в потоке Tk несколькими агрегирующими запросами
+и содержит только неизменяемые кортежи. Документ строится по снимку без обращений
+к базе (render_report, save_report), поэтому это можно делать в рабочем потоке.
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from . import analytics, database
+
+# progress(выполнено, всего) - вызывается из потока, строящего документ
+ProgressCallback = Callable[[int, int], None]
+
+# Средний уровень компетенции ниже этого - слабая зона
+WEAK_LEVEL = 3
+
+RECOMMENDATIONS = {
+    "Презентация результатов": "Вы почти не развиваете компетенцию 'Презентация результатов'. "
+                               "Рекомендуем выступить на студенческой конференции.",
+    "Работа с БД": "Для развития компетенции 'Работа с БД' пройдите курс по SQL "
+                   "или поработайте над проектом с базами данных.",
+    "Управление проектами": "Для развития 'Управления проектами' возьмите на себя роль тимлида в учебном проекте.",
+}
+
+MONTH_COLUMNS = ('Месяц', 'Запланировано', 'Завершено', 'В срок', '% завершения', '% в срок', 'Опоздание, дн.')
+
+
+class ReportGoal(NamedTuple):
+    """Цель в отчёте"""
+    name: str
+    goal_type: str
+    status: str
+    plan_date: Optional[str]
+    fact_date: Optional[str]
+    pace: Optional[str]
+    description: Optional[str]
+
+
+class ReportSnapshot(NamedTuple):
+    """Все данные отчёта на момент снимка"""
+    created: datetime
+    goals: List[ReportGoal]
+    skills: List[Tuple[str, int]]                              # навык, число целей
+    lateness: analytics.LatenessSummary
+    months: List[analytics.MonthStats]
+    throughput: List[analytics.TypeThroughput]
+    competencies: List[Tuple[str, str, Optional[float]]]       # название, категория, средний уровень
+    achievements: List[Tuple[str, str]]                        # полученные: название, описание
+    semester_goals: List[Tuple[str, int, int]]                 # текст, прогресс, цель
+
+    @property
+    def weak_zones(self) -> List[Tuple[str, str, Optional[float]]]:
+        return [comp for comp in self.competencies if comp[2] is not None and comp[2] < WEAK_LEVEL]
+
+    @property
+    def steps(self) -> int:
+        """Число шагов построения: по одному на цель и на каждый раздел"""
+        return len(self.goals) + len(_SECTIONS)
+
+
+def _read_goals(db_path: str) -> List[ReportGoal]:
+    """Цели отчёта одним запросом"""
+    try:
+        rows = database.get_connection(db_path).execute('''
+            SELECT название, тип, статус, план_дата, факт_дата, темп, описание
+            FROM цели
+            ORDER BY статус, план_дата
+        ''')
+        return [ReportGoal(*row) for row in rows]
+    except Exception as e:
+        print(f"❌ Ошибка загрузки целей для отчёта: {e}")
+        return []
+
+
+def take_snapshot(db_path: str = "iom.db") -> ReportSnapshot:
+    """Снимок данных отчёта
+
+    Вызывается в потоке Tk, где выполняются и все изменения данных, поэтому разделы
+    согласованы между собой. Агрегаты берутся из кэша запросов, если данные не менялись.
+    """
+    return ReportSnapshot(
+        created=datetime.now(),
+        goals=_read_goals(db_path),
+        skills=database.get_skill_statistics(db_path),
+        lateness=analytics.get_lateness_summary(db_path),
+        months=analytics.get_monthly_completion(db_path),
+        throughput=analytics.get_type_throughput(db_path),
+        competencies=database.get_competency_averages(db_path),
+        achievements=[(a[1], a[2]) for a in database.get_all_achievements(db_path) if a[3] == 1],
+        semester_goals=[(g[1], g[3], g[4]) for g in database.get_semester_goals(db_path)],
+    )
+
+
+def _add_table(doc, header, rows) -> None:
+    table = doc.add_table(rows=1, cols=len(header))
+    table.style = 'Light Grid Accent 1'
+    for cell, text in zip(table.rows[0].cells, header):
+        cell.text = text
+    for row in rows:
+        for cell, text in zip(table.add_row().cells, row):
+            cell.text = text
+
+
+def _render_skills(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Навыки', level=1)
+    if snapshot.skills:
+        for name, count in snapshot.skills:
+            doc.add_paragraph(f"{name} — {count} цели", style='List Bullet')
+    else:
+        doc.add_paragraph("Навыки не указаны")
+
+
+def _render_deadlines(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Сроки и динамика', level=1)
+    lateness = snapshot.lateness
+    doc.add_paragraph(f"Завершено с обеими датами: {lateness.completed}, с опозданием: {lateness.late}"
+                      + (f", в среднем на {lateness.avg_lateness} дн., максимум {lateness.max_lateness} дн."
+                         if lateness.late else ""))
+
+    if snapshot.months:
+        doc.add_paragraph(f"По месяцам плановой даты (скользящее окно {analytics.ROLLING_MONTHS} мес.):")
+        _add_table(doc, MONTH_COLUMNS, [['—' if value is None else str(value) for value in month]
+                                        for month in snapshot.months])
+
+    if snapshot.throughput:
+        doc.add_paragraph("Темп по типам целей:")
+        for pace in snapshot.throughput:
+            doc.add_paragraph(f"{pace.goal_type} — завершено {pace.completed} ({pace.share}%), "
+                              f"в среднем {pace.per_month} в месяц, лучший месяц {pace.best_month}",
+                              style='List Bullet')
+
+
+def _render_competencies(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Компетенции', level=1)
+    _add_table(doc, ('Компетенция', 'Категория', 'Средний уровень'),
+               [(name or '', category or '', str(level) if level else 'Нет данных')
+                for name, category, level in snapshot.competencies])
+
+
+def _render_weak_zones(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Слабые зоны', level=1)
+    if snapshot.weak_zones:
+        for name, _, level in snapshot.weak_zones:
+            doc.add_paragraph(f"{name} — уровень {level}", style='List Bullet')
+    else:
+        doc.add_paragraph("Слабых зон не обнаружено")
+
+
+def _render_recommendations(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Рекомендации', level=1)
+    recommendations = [RECOMMENDATIONS[name] for name, _, _ in snapshot.weak_zones if name in RECOMMENDATIONS]
+    if recommendations:
+        for rec in recommendations:
+            doc.add_paragraph(rec, style='List Bullet')
+    else:
+        doc.add_paragraph("Все компетенции развиваются хорошо. Продолжайте в том же духе!")
+
+
+def _render_achievements(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Достижения', level=1)
+    if snapshot.achievements:
+        for name, description in snapshot.achievements:
+            doc.add_paragraph(f"{name} — {description}", style='List Bullet')
+    else:
+        doc.add_paragraph("Достижения не получены")
+
+
+def _render_semester_goals(doc, snapshot: ReportSnapshot) -> None:
+    doc.add_heading('Цели на семестр', level=1)
+    if snapshot.semester_goals:
+        for text, progress, target in snapshot.semester_goals:
+            doc.add_paragraph(f"{text} — {progress} из {target}", style='List Bullet')
+    else:
+        doc.add_paragraph("Цели на семестр не установлены")
+
+
+# Разделы после списка целей, в порядке следования в документе
+_SECTIONS = [_render_skills, _render_deadlines, _render_competencies, _render_weak_zones,
+             _render_recommendations, _render_achievements, _render_semester_goals]
+
+
+def render_report(snapshot: ReportSnapshot, progress: Optional[ProgressCallback] = None):
+    """Построение документа Word по снимку (без обращений к базе)"""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from .utils import add_formatted_text_to_doc
+
+    total = snapshot.steps
+    done = 0
+
+    def step():
+        nonlocal done
+        done += 1
+        if progress:
+            progress(done, total)
+
+    doc = Document()
+
+    title = doc.add_heading('Индивидуальный образовательный маршрут', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    doc.add_paragraph(f"Отчёт сформирован: {snapshot.created.strftime('%d.%m.%Y %H:%M')}")
+    doc.add_paragraph()
+
+    doc.add_heading('Цели', level=1)
+    for goal in snapshot.goals:
+        doc.add_heading(goal.name, level=2)
+        doc.add_paragraph(f"Тип: {goal.goal_type}")
+        doc.add_paragraph(f"Статус: {goal.status}")
+        doc.add_paragraph(f"Плановая дата: {goal.plan_date or 'Не указана'}")
+        doc.add_paragraph(f"Фактическая дата: {goal.fact_date or 'Не указана'}")
+        if goal.pace:
+            doc.add_paragraph(f"Темп: {goal.pace}")
+        if goal.description:
+            add_formatted_text_to_doc(doc, goal.description)
+        doc.add_paragraph()
+        step()
+    if not snapshot.goals:
+        doc.add_paragraph("Цели не добавлены")
+
+    for section in _SECTIONS:
+        section(doc, snapshot)
+        step()
+    return doc
+
+
+def report_filename(snapshot: ReportSnapshot) -> str:
+    """Имя файла отчёта по времени снимка"""
+    return f"Отчет_ИОМ_{snapshot.created.strftime('%Y%m%d_%H%M%S')}.docx"
+
+
+def save_report(snapshot: ReportSnapshot, filename: Optional[str] = None,
+                progress: Optional[ProgressCallback] = None) -> str:
+    """Построение и сохранение отчёта, возвращает имя файла"""
+    filename = filename or report_filename(snapshot)
+    render_report(snapshot, progress).save(filename)
+    return filename
@@ -1,9 +1,633 @@
+import io
+import json
 import pytest
 import sys
 import os
+import sqlite3
+import threading
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src import analytics, bulk, database, markup, report
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Временная база данных с инициализированной схемой"""
+    path = str(tmp_path / "iom.db")
+    database.init_db(path)
+    yield path
+    database.close_connections()
+
+
 # Пример простого теста, замените на реальную логику
 def test_placeholder():
     """Временный тест."""
-    assert 1 + 1 == 2
\ No newline at end of file
+    assert 1 + 1 == 2
+
+
+class TestConnectionManager:
+    def test_same_connection_within_thread(self, db_path):
+        """Повторные вызовы в одном потоке используют одно соединение"""
+        assert database.get_connection(db_path) is database.get_connection(db_path)
+
+    def test_wal_mode_enabled(self, db_path):
+        """Соединение открывается в режиме WAL"""
+        mode = database.get_connection(db_path).execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == 'wal'
+
+    def test_separate_connection_per_thread(self, db_path):
+        """Каждый поток получает собственное соединение"""
+        main_conn = database.get_connection(db_path)
+        other = []
+
+        def worker():
+            other.append(database.get_connection(db_path))
+            database.close_connections()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert other[0] is not main_conn
+
+    def test_close_connections_reopens(self, db_path):
+        """После закрытия создаётся новое соединение"""
+        first = database.get_connection(db_path)
+        database.close_connections()
+        assert database.get_connection(db_path) is not first
+
+    def test_crud_through_shared_connection(self, db_path):
+        """Функции модуля работают через общее соединение"""
+        goal_id = database.add_goal(db_path, "Курс SQL", "Курс", "Новая", "2025-06-01", "", "", "")
+        skill_id = database.add_skill(db_path, "SQL")
+        assert database.link_goal_skill(db_path, goal_id, skill_id)
+        assert database.get_goal_skills(db_path, goal_id) == ["SQL"]
+        assert database.get_goal_by_id(db_path, goal_id)[1] == "Курс SQL"
+
+
+class TestSaveGoalAggregate:
+    GOAL = {'название': "Курс SQL", 'тип': "Курс", 'статус': "Новая", 'план_дата': "2025-06-01",
+            'факт_дата': "", 'темп': "", 'описание': ""}
+
+    @pytest.fixture
+    def competencies(self, db_path):
+        """id трёх компетенций"""
+        conn = database.get_connection(db_path)
+        with conn:
+            conn.executemany("INSERT INTO компетенции (название, категория) VALUES (?, 'Тест')",
+                             [("Анализ",), ("Проектирование",), ("Коммуникация",)])
+        return [row[0] for row in conn.execute("SELECT id FROM компетенции ORDER BY id")]
+
+    def test_create_goal_with_links(self, db_path, competencies):
+        """Новая цель сохраняется вместе с навыками и компетенциями"""
+        result = database.save_goal_aggregate(db_path, self.GOAL, ["SQL", "Python"], [(competencies[0], 3)])
+
+        assert result.created
+        assert result.fields_changed == list(database.GOAL_FIELDS)
+        assert result.skills_added == ["SQL", "Python"]
+        assert sorted(database.get_goal_skills(db_path, result.goal_id)) == ["Python", "SQL"]
+        assert database.get_goal_competencies(db_path, result.goal_id) == [(competencies[0], "Анализ", 3)]
+
+    def test_edit_applies_only_differences(self, db_path, competencies):
+        """При редактировании меняются только изменившиеся связи, результат описывает разницу"""
+        first, second, third = competencies
+        goal_id = database.save_goal_aggregate(
+            db_path, self.GOAL, ["SQL", "Python"], [(first, 3), (second, 2)]).goal_id
+        conn = database.get_connection(db_path)
+        kept_rowid = conn.execute("SELECT rowid FROM цель_навыки WHERE навык_id = "
+                                  "(SELECT id FROM навыка WHERE название = 'SQL')").fetchone()[0]
+
+        goal = dict(self.GOAL, id=goal_id, статус="Завершена")
+        result = database.save_goal_aggregate(db_path, goal, ["SQL", "Git"], [(first, 4), (third, 1)])
+
+        assert not result.created
+        assert result.fields_changed == ['статус']
+        assert (result.skills_added, result.skills_removed) == (["Git"], ["Python"])
+        assert result.competencies_added == [(third, 1)]
+        assert result.competencies_removed == [(second, 2)]
+        assert result.competencies_changed == [(first, 3, 4)]
+        assert conn.execute("SELECT rowid FROM цель_навыки WHERE навык_id = "
+                            "(SELECT id FROM навыка WHERE название = 'SQL')").fetchone()[0] == kept_rowid
+        assert sorted(database.get_goal_skills(db_path, goal_id)) == ["Git", "SQL"]
+
+    def test_unchanged_save_reports_no_changes(self, db_path, competencies):
+        """Повторное сохранение без изменений ничего не меняет"""
+        goal_id = database.save_goal_aggregate(db_path, self.GOAL, ["SQL"], [(competencies[0], 3)]).goal_id
+        result = database.save_goal_aggregate(db_path, dict(self.GOAL, id=goal_id), ["SQL"], [(competencies[0], 3)])
+
+        assert result.fields_changed == []
+        assert not result.skills_changed and not result.competency_links_changed
+
+    def test_failed_save_rolls_back(self, db_path, competencies):
+        """Ошибка посреди сохранения откатывает всю транзакцию"""
+        result = database.save_goal_aggregate(db_path, self.GOAL, ["SQL"], [(competencies[0], 9)])
+
+        assert result is None
+        assert database.get_all_goals(db_path) == []
+        assert database.get_all_skills(db_path) == []
+
+
+class TestSemesterProgress:
+    def fill(self, db_path):
+        """Завершённые курсы и проект с компетенциями, цели на семестр разных видов"""
+        conn = database.get_connection(db_path)
+        with conn:
+            conn.execute("INSERT INTO компетенции (название, категория) VALUES ('Анализ', 'Тест')")
+        comp_id = conn.execute("SELECT id FROM компетенции").fetchone()[0]
+
+        goal = dict(TestSaveGoalAggregate.GOAL, статус="Завершена")
+        database.save_goal_aggregate(db_path, goal, [], [(comp_id, 2)])
+        database.save_goal_aggregate(db_path, goal, [], [(comp_id, 5)])
+        database.save_goal_aggregate(db_path, dict(goal, тип="Проект"), [], [])
+        database.save_goal_aggregate(db_path, dict(goal, статус="Новая"), [], [(comp_id, 1)])
+
+        ids = {
+            'courses': database.add_semester_goal(db_path, "Пройти 3 курса", "Количество", "", 3),
+            'projects': database.add_semester_goal(db_path, "Сделать", "Количество", "проект", 2),
+            'all': database.add_semester_goal(db_path, "Завершить цели", "Количество", "", 10),
+            'competency': database.add_semester_goal(db_path, "Рост", "Повышение компетенции", "Анализ", 5),
+            'manual': database.add_semester_goal(db_path, "Прочее", "Другое", "", 1),
+        }
+        return comp_id, ids
+
+    def progress(self, db_path):
+        return {row[0]: row[3] for row in database.get_semester_goals(db_path)}
+
+    def test_full_recalculation(self, db_path):
+        """Полный пересчёт: число завершённых целей по типам и средний уровень компетенции"""
+        _, ids = self.fill(db_path)
+        database.update_semester_progress(db_path, ids['manual'], 7)
+
+        assert database.recalculate_semester_progress(db_path) == 5
+        progress = self.progress(db_path)
+        assert progress[ids['courses']] == 2
+        assert progress[ids['projects']] == 1
+        assert progress[ids['all']] == 3
+        assert progress[ids['competency']] == 4  # round(avg(2, 5))
+        assert progress[ids['manual']] == 0
+
+    def test_incremental_touches_only_matching_goals(self, db_path):
+        """Инкрементальный пересчёт обновляет только цели, зависящие от изменения"""
+        comp_id, ids = self.fill(db_path)
+        database.recalculate_semester_progress(db_path)
+        database.update_semester_progress(db_path, ids['courses'], 100)
+        database.update_semester_progress(db_path, ids['competency'], 100)
+
+        assert database.recalculate_semester_progress(db_path, goal_types=["Проект"]) == 0
+        assert self.progress(db_path)[ids['courses']] == 100
+
+        assert database.recalculate_semester_progress(db_path, goal_types=["Курс"]) == 1
+        assert self.progress(db_path)[ids['courses']] == 2
+        assert self.progress(db_path)[ids['competency']] == 100
+
+        assert database.recalculate_semester_progress(db_path, competency_ids=[comp_id]) == 1
+        assert self.progress(db_path)[ids['competency']] == 4
+
+    def test_save_result_reports_affected_sources(self, db_path):
+        """Результат сохранения цели указывает, какие типы и компетенции пересчитать"""
+        comp_id, _ = self.fill(db_path)
+        goal = dict(TestSaveGoalAggregate.GOAL, тип="Проект")
+        goal_id = database.save_goal_aggregate(db_path, goal, [], [(comp_id, 3)]).goal_id
+
+        result = database.save_goal_aggregate(db_path, dict(goal, id=goal_id, описание="текст"), [], [(comp_id, 3)])
+        assert (result.affected_goal_types(), result.affected_competency_ids()) == ([], [])
+
+        result = database.save_goal_aggregate(db_path, dict(goal, id=goal_id, статус="Завершена"), [],
+                                              [(comp_id, 3)])
+        assert (result.affected_goal_types(), result.affected_competency_ids()) == (["Проект"], [comp_id])
+
+        result = database.save_goal_aggregate(db_path, dict(goal, id=goal_id, статус="Завершена", тип="Курс"),
+                                              [], [])
+        assert result.affected_goal_types() == ["Проект", "Курс"]
+        assert result.affected_competency_ids() == [comp_id]
+
+
+class TestAchievementCounters:
+    def counters(self, db_path):
+        conn = database.get_connection(db_path)
+        rows = conn.execute("SELECT счётчик, ключ, значение FROM счётчики WHERE значение != 0").fetchall()
+        return sorted(rows)
+
+    def expected(self, db_path):
+        conn = database.get_connection(db_path)
+        rows = conn.execute(database.ACHIEVEMENT_COUNTERS_QUERY).fetchall()
+        return sorted((counter, str(key), value) for counter, key, value in rows if value)
+
+    def save(self, db_path, goal_id=None, skills=(), **fields):
+        goal = dict(TestSaveGoalAggregate.GOAL, id=goal_id, **fields)
+        return database.save_goal_aggregate(db_path, goal, list(skills), []).goal_id
+
+    def test_triggers_follow_goal_changes(self, db_path):
+        """Триггеры поддерживают счётчики при добавлении, изменении и удалении целей"""
+        first = self.save(db_path, skills=["SQL"], статус="Завершена", факт_дата="2025-05-01")
+        second = self.save(db_path, skills=["SQL", "Git"], статус="В процессе", тип="Проект")
+        self.save(db_path, second, skills=["Git"], статус="Завершена", тип="Проект", факт_дата="2025-07-01")
+        self.save(db_path, first, skills=["SQL"], статус="Завершена", тип="Семинар", факт_дата="2025-05-01")
+        assert self.counters(db_path) == self.expected(db_path)
+
+        database.delete_goal(db_path, second)
+        assert self.counters(db_path) == self.expected(db_path)
+        assert ('завершено_в_срок', '', 1) in self.counters(db_path)
+
+    def test_rules_evaluated_only_for_changed_counters(self, db_path):
+        """Правило проверяется, только когда изменились его счётчики, и срабатывает один раз"""
+        calls = []
+        rules = [database.AchievementRule('ach5', 'в_процессе',
+                                          lambda values: calls.append(values) or values.get('', 0) >= 2)]
+
+        self.save(db_path, статус="В процессе")
+        assert database.check_achievements(db_path, rules) == []
+        assert database.check_achievements(db_path, rules) == []
+        assert len(calls) == 1
+
+        self.save(db_path, статус="Завершена")
+        database.check_achievements(db_path, rules)
+        assert len(calls) == 1
+
+        self.save(db_path, статус="В процессе")
+        assert database.check_achievements(db_path, rules) == ['ach5']
+        self.save(db_path, статус="В процессе")
+        assert database.check_achievements(db_path, rules) == []
+        assert len(calls) == 2
+
+    def test_default_rules(self, db_path):
+        """Стандартные правила: старт, цели в срок, разные типы и рост навыка"""
+        for goal_type in ["Курс", "Проект", "Семинар", "Курс"]:
+            self.save(db_path, skills=["SQL"], статус="Завершена", тип=goal_type, факт_дата="2025-05-01")
+
+        assert database.check_achievements(db_path) == ['ach1', 'ach2', 'ach3', 'ach4']
+        obtained = {row[0] for row in database.get_all_achievements(db_path) if row[3] == 1}
+        assert obtained == {'ach1', 'ach2', 'ach3', 'ach4'}
+
+    def test_counters_backfilled_for_existing_database(self, db_path):
+        """Для существующей БД счётчики заполняются с нуля при инициализации"""
+        self.save(db_path, skills=["SQL"], статус="Завершена")
+        conn = database.get_connection(db_path)
+        with conn:
+            conn.execute("DROP TABLE счётчики")
+        database.init_db(db_path)
+
+        assert self.counters(db_path) == self.expected(db_path)
+        assert database.check_achievements(db_path) == ['ach1']
+
+
+class TestSchemaMigrations:
+    LEGACY_SCHEMA = '''
+        CREATE TABLE цели (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT NOT NULL, тип TEXT NOT NULL,
+                           статус TEXT DEFAULT 'Новая', план_дата TEXT, факт_дата TEXT, темп TEXT, описание TEXT);
+        CREATE TABLE навыка (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT UNIQUE NOT NULL);
+        CREATE TABLE цель_навыки (цель_id INTEGER, навык_id INTEGER);
+        CREATE TABLE компетенции (id INTEGER PRIMARY KEY AUTOINCREMENT, название TEXT NOT NULL, категория TEXT);
+        CREATE TABLE цель_компетенции (цель_id INTEGER, компетенция_id INTEGER,
+                                       уровень INTEGER CHECK (уровень BETWEEN 1 AND 5));
+        INSERT INTO цели (название, тип, статус) VALUES ('А', 'Курс', 'Завершена'), ('Б', 'Проект', 'Новая');
+        INSERT INTO навыка (название) VALUES ('SQL'), ('Git');
+        INSERT INTO компетенции (название) VALUES ('Анализ');
+        INSERT INTO цель_навыки VALUES (1, 1), (1, 1), (1, 2), (2, 1), (99, 1);
+        INSERT INTO цель_компетенции VALUES (1, 1, 2), (1, 1, 4), (2, 1, 3), (99, 1, 5);
+    '''
+
+    @pytest.fixture
+    def legacy_path(self, tmp_path):
+        """БД в схеме до миграций: связи без ключей, с дублями и висячими строками"""
+        path = str(tmp_path / "legacy.db")
+        conn = database.get_connection(path)
+        conn.executescript(self.LEGACY_SCHEMA)
+        yield path
+        database.close_connections()
+
+    def test_new_database_is_at_latest_version(self, db_path):
+        assert database.get_schema_version(db_path) == database.MIGRATIONS[-1][0]
+
+    def test_legacy_links_are_deduplicated(self, legacy_path):
+        """Миграция убирает дубли и висячие связи, из дублей компетенций остаётся последний уровень"""
+        database.init_db(legacy_path)
+        conn = database.get_connection(legacy_path)
+
+        assert database.get_schema_version(legacy_path) == database.MIGRATIONS[-1][0]
+        assert sorted(conn.execute("SELECT цель_id, навык_id FROM цель_навыки")) == [(1, 1), (1, 2), (2, 1)]
+        assert sorted(conn.execute("SELECT * FROM цель_компетенции")) == [(1, 1, 4), (2, 1, 3)]
+        assert ('завершено_по_навыку', '1', 1) in conn.execute("SELECT счётчик, ключ, значение FROM счётчики")
+
+    def test_legacy_dates_are_normalized(self, legacy_path):
+        """Даты приводятся к ISO, пустые становятся NULL, нераспознанные остаются без номера дня"""
+        conn = database.get_connection(legacy_path)
+        conn.execute("UPDATE цели SET план_дата = '01.06.2025', факт_дата = '2025-05-31' WHERE id = 1")
+        conn.execute("UPDATE цели SET план_дата = 'когда-нибудь', факт_дата = '' WHERE id = 2")
+        conn.commit()
+        database.init_db(legacy_path)
+
+        rows = conn.execute("SELECT план_дата, факт_дата, план_день, факт_день FROM цели ORDER BY id").fetchall()
+        assert rows == [('2025-06-01', '2025-05-31', 20240, 20239), ('когда-нибудь', None, None, None)]
+        # Раньше '2025-05-31' <= '01.06.2025' как строки было ложно
+        assert database.get_timely_completion(legacy_path) == (1, 1)
+
+    def test_delete_goal_cascades_to_links(self, legacy_path):
+        """Удаление цели удаляет её связи с навыками и компетенциями"""
+        database.init_db(legacy_path)
+        database.delete_goal(legacy_path, 1)
+        conn = database.get_connection(legacy_path)
+
+        assert conn.execute("SELECT COUNT(*) FROM цель_навыки WHERE цель_id = 1").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM цель_компетенции WHERE цель_id = 1").fetchone()[0] == 0
+
+    def test_duplicate_links_are_ignored(self, db_path):
+        """Повторное связывание не создаёт дублей, уровень компетенции обновляется"""
+        goal_id = database.add_goal(db_path, "Курс", "Курс", "Новая", "", "", "", "")
+        skill_id = database.add_skill(db_path, "SQL")
+        conn = database.get_connection(db_path)
+        with conn:
+            conn.execute("INSERT INTO компетенции (название) VALUES ('Анализ')")
+
+        assert database.link_goal_skill(db_path, goal_id, skill_id)
+        assert database.link_goal_skill(db_path, goal_id, skill_id)
+        assert database.add_competency_link(db_path, goal_id, 1, 2)
+        assert database.add_competency_link(db_path, goal_id, 1, 5)
+        assert database.get_goal_skills(db_path, goal_id) == ["SQL"]
+        assert database.get_goal_competencies(db_path, goal_id) == [(1, "Анализ", 5)]
+
+    @pytest.mark.parametrize('query, index', [
+        ("SELECT н.название FROM навыка н JOIN цель_навыки цн ON н.id = цн.навык_id WHERE цн.цель_id = 1",
+         "sqlite_autoindex_цель_навыки_1"),
+        ("SELECT COUNT(*) FROM цель_навыки WHERE навык_id = 1", "idx_цель_навыки_навык"),
+        ("SELECT AVG(уровень) FROM цель_компетенции WHERE компетенция_id = 1", "idx_цель_компетенции_компетенция"),
+        ("SELECT тип, COUNT(*) FROM цели WHERE статус = 'Завершена' GROUP BY тип", "idx_цели_статус_тип"),
+    ])
+    def test_queries_use_indexes(self, db_path, query, index):
+        """Выборки по связям и статусу используют индексы"""
+        plan = database.get_connection(db_path).execute("EXPLAIN QUERY PLAN " + query).fetchall()
+        assert any(index in row[3] for row in plan), plan
+
+
+class TestQueryCache:
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        database.query_cache.clear()
+
+    def test_repeated_queries_are_served_from_cache(self, db_path):
+        """Повторный запрос без изменений данных берётся из кэша"""
+        database.add_goal(db_path, "Курс", "Курс", "Завершена", "", "", "", "")
+        first = database.get_goal_type_statistics(db_path)
+        assert database.get_goal_type_statistics(db_path) is first
+        assert database.get_cache_stats()['hits'] == 1
+        assert database.get_cache_stats()['misses'] == 1
+
+    def test_writes_through_module_invalidate(self, db_path):
+        """Запись через модуль database увеличивает версию данных"""
+        database.add_goal(db_path, "Курс", "Курс", "Завершена", "", "", "", "")
+        assert database.get_goal_type_statistics(db_path) == [("Курс", 1, 1)]
+
+        database.add_goal(db_path, "Проект", "Проект", "Новая", "", "", "", "")
+        assert database.get_goal_type_statistics(db_path) == [("Курс", 1, 1), ("Проект", 0, 1)]
+        assert database.get_cache_stats()['hits'] == 0
+
+    def test_commits_from_other_connections_invalidate(self, db_path):
+        """Коммит другого соединения виден через PRAGMA data_version"""
+        assert database.get_timely_completion(db_path) == (0, 0)
+
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("INSERT INTO цели (название, тип, статус, план_дата, факт_дата) "
+                         "VALUES ('Курс', 'Курс', 'Завершена', '2025-06-01', '2025-05-01')")
+        conn.close()
+
+        assert database.get_timely_completion(db_path) == (1, 1)
+
+    def test_arguments_and_databases_are_separate_keys(self, db_path, tmp_path):
+        """Результаты разных баз не смешиваются"""
+        other = str(tmp_path / "other.db")
+        database.init_db(other)
+        database.add_goal(db_path, "Курс", "Курс", "Завершена", "", "", "", "")
+
+        assert database.get_goal_type_statistics(db_path) == [("Курс", 1, 1)]
+        assert database.get_goal_type_statistics(other) == []
+
+
+class TestMarkup:
+    def test_several_links_and_styles_in_one_line(self):
+        """В одной строке разбираются все ссылки и выделения"""
+        (block,) = markup.parse("См. [док](http://a) и [код](http://b), **важно** и *курсив*")
+        assert block.kind == markup.PARAGRAPH
+        assert [i for i in block.inlines if i.kind != markup.TEXT] == [
+            markup.Inline(markup.LINK, "док", "http://a"),
+            markup.Inline(markup.LINK, "код", "http://b"),
+            markup.Inline(markup.BOLD, "важно"),
+            markup.Inline(markup.ITALIC, "курсив"),
+        ]
+
+    def test_blocks(self):
+        """Заголовки, пункты списка и пустые строки"""
+        blocks = markup.parse("# План\n\n- пункт __один__")
+        assert [b.kind for b in blocks] == [markup.HEADING, markup.BLANK, markup.BULLET]
+        assert blocks[2].inlines == (markup.Inline(markup.TEXT, "пункт "), markup.Inline(markup.ITALIC, "один"))
+
+    def test_render_plain(self):
+        """Обычный текст без разметки, у ссылок адрес в скобках"""
+        text = "# План\n- **шаг** [тут](http://a) и [там](http://b)"
+        assert markup.render_plain(markup.parse(text)) == \
+            "ЗАГОЛОВОК: План\n• шаг тут (http://a) и там (http://b)"
+
+    def test_parse_is_cached_by_content(self):
+        """Повторный разбор того же текста возвращает готовое дерево"""
+        text = "**кэш** " + "x" * 100
+        first = markup.parse(text)
+        hits = markup.parse.cache_info().hits
+        assert markup.parse("".join(["**кэш** ", "x" * 100])) is first
+        assert markup.parse.cache_info().hits == hits + 1
+
+
+class TestBulkTransfer:
+    RECORDS = [
+        {'название': 'Курс SQL', 'тип': 'Курс', 'статус': 'Завершена', 'план_дата': '2025-06-01',
+         'факт_дата': '2025-05-20', 'темп': '', 'описание': 'Запросы, **индексы**',
+         'навыки': ['SQL', 'Python'], 'компетенции': [{'название': 'Базы данных', 'уровень': 4}]},
+        {'название': 'Проект', 'тип': 'Проект', 'навыки': ['SQL'], 'компетенции': []},
+    ]
+
+    def _jsonl(self):
+        return io.StringIO('\n'.join(json.dumps(r, ensure_ascii=False) for r in self.RECORDS))
+
+    def test_import_resolves_and_creates_skills(self, db_path):
+        """Навыки ищутся по названию, недостающие создаются один раз"""
+        skill_id = database.add_skill(db_path, 'SQL')
+        result = database.import_goals(db_path, bulk.read_records(self._jsonl(), 'jsonl'), batch_size=1)
+
+        assert result.goals == 2
+        assert result.skills_created == 1
+        assert result.skill_links == 3
+        assert result.competency_links == 1
+        assert sorted(database.get_all_skills(db_path)) == ['Python', 'SQL']
+        assert ('SQL', 2) in database.get_skill_statistics(db_path)
+        assert database.add_skill(db_path, 'SQL') == skill_id
+
+    def test_import_fills_defaults(self, db_path):
+        """Статус по умолчанию и отсутствующие поля"""
+        database.import_goals(db_path, bulk.read_records(self._jsonl(), 'jsonl'))
+        assert {row[1]: row[3] for row in database.get_all_goals(db_path)} == \
+            {'Курс SQL': 'Завершена', 'Проект': 'Новая'}
+
+    def test_invalid_record_rolls_back(self, db_path):
+        """Ошибка в любой записи отменяет весь импорт"""
+        stream = io.StringIO(self._jsonl().getvalue() + '\n{"название": "Без типа"}')
+        assert database.import_goals(db_path, bulk.read_records(stream, 'jsonl'), batch_size=1) is None
+        assert database.get_all_goals(db_path) == []
+        assert database.get_all_skills(db_path) == []
+
+    @pytest.mark.parametrize('fmt', bulk.FORMATS)
+    def test_export_import_round_trip(self, db_path, tmp_path, fmt):
+        """Выгрузка и загрузка в другую базу сохраняют цели и связи"""
+        database.import_goals(db_path, bulk.read_records(self._jsonl(), 'jsonl'))
+        exported = list(database.iter_goals_with_links(db_path, batch_size=1))
+
+        stream = io.StringIO()
+        assert bulk.write_records(stream, exported, fmt) == 2
+        stream.seek(0)
+
+        other = str(tmp_path / "other.db")
+        database.init_db(other)
+        database.import_goals(other, bulk.read_records(stream, fmt))
+        imported = list(database.iter_goals_with_links(other))
+        if fmt == 'csv':
+            # В CSV нет NULL: пустые поля (кроме дат) загружаются пустыми строками
+            def blank(records):
+                return [{key: '' if value is None else value for key, value in r.items()} for r in records]
+            exported, imported = blank(exported), blank(imported)
+        assert imported == exported
+        assert exported[0]['компетенции'] == [('Базы данных', 4)]
+        assert exported[0]['описание'] == 'Запросы, **индексы**'
+
+
+class TestGoalDates:
+    @pytest.mark.parametrize('value, expected', [
+        ('2025-06-01', '2025-06-01'), (' 01.06.2025 ', '2025-06-01'), ('2025.6.1', '2025-06-01'),
+        ('1/6/2025', '2025-06-01'), ('', None), (None, None),
+    ])
+    def test_normalize_date(self, value, expected):
+        assert database.normalize_date(value) == expected
+
+    def test_invalid_date_rejected(self, db_path):
+        """Нераспознанная дата не сохраняется"""
+        with pytest.raises(ValueError):
+            database.normalize_date('31.02.2025')
+        goal = dict(TestSaveGoalAggregate.GOAL, план_дата='завтра')
+        assert database.save_goal_aggregate(db_path, goal, [], []) is None
+        assert database.get_all_goals(db_path) == []
+
+    def test_on_time_compares_days(self, db_path):
+        """В срок - по номерам дней; завершённая цель без фактической даты не учитывается"""
+        save = TestAchievementCounters().save
+        save(db_path, статус="Завершена", план_дата="01.06.2025", факт_дата="31.05.2025")
+        save(db_path, статус="Завершена", план_дата="2025-06-01", факт_дата="2025-06-02")
+        save(db_path, статус="Завершена", план_дата="2025-06-01", факт_дата="")
+
+        assert database.get_timely_completion(db_path) == (2, 1)
+        assert ('завершено_в_срок', '', 1) in TestAchievementCounters().counters(db_path)
+
+
+class TestAnalytics:
+    GOALS = [
+        # тип, статус, план, факт
+        ("Курс", "Завершена", "2025-01-10", "2025-01-05"),
+        ("Курс", "Завершена", "2025-01-20", "2025-01-30"),
+        ("Проект", "Новая", "2025-01-25", ""),
+        ("Проект", "Завершена", "2025-02-10", "2025-02-14"),
+        ("Курс", "Отменена", "2025-02-15", ""),
+        ("Курс", "Завершена", "2025-03-01", "2025-02-20"),
+        ("Курс", "Завершена", "", "2025-03-05"),
+    ]
+
+    @pytest.fixture
+    def filled(self, db_path):
+        for goal_type, status, plan, fact in self.GOALS:
+            database.add_goal(db_path, "Цель", goal_type, status, plan, fact, "", "")
+        return db_path
+
+    def test_monthly_completion_rolling(self, filled):
+        """Проценты по месяцам плановой даты со скользящим окном; отменённые цели не входят в план"""
+        months = analytics.get_monthly_completion(filled, 2)
+        assert months == [
+            analytics.MonthStats('2025-01', 3, 2, 1, 66.7, 50.0, 10.0),
+            analytics.MonthStats('2025-02', 1, 1, 0, 75.0, 33.3, 4.0),
+            analytics.MonthStats('2025-03', 1, 1, 1, 100.0, 50.0, None),
+        ]
+
+    def test_monthly_window_counts_empty_months(self, filled):
+        """Месяцы без целей входят в окно с нулями: окно - календарные месяцы, а не строки"""
+        database.add_goal(filled, "Цель", "Курс", "Завершена", "2025-06-10", "2025-06-10", "", "")
+        months = analytics.get_monthly_completion(filled, 2)
+
+        assert [month.month for month in months] == ['2025-01', '2025-02', '2025-03', '2025-04', '2025-05', '2025-06']
+        assert months[3] == analytics.MonthStats('2025-04', 0, 0, 0, 100.0, 100.0, None)
+        assert months[4] == analytics.MonthStats('2025-05', 0, 0, 0, None, None, None)
+        assert months[5] == analytics.MonthStats('2025-06', 1, 1, 1, 100.0, 100.0, None)
+
+    def test_monthly_completion_empty(self, db_path):
+        assert analytics.get_monthly_completion(db_path) == []
+
+    def test_lateness_summary(self, filled):
+        summary = analytics.get_lateness_summary(filled)
+        assert summary == analytics.LatenessSummary(4, 2, 7.0, 10, 0.0)
+
+    def test_type_throughput(self, filled):
+        """Темп по месяцам фактической даты и доля типа среди завершённых"""
+        assert analytics.get_type_throughput(filled) == [
+            analytics.TypeThroughput('Курс', 4, 3, 1.3, '2025-01', 80.0, 10.0),
+            analytics.TypeThroughput('Проект', 1, 1, 1.0, '2025-02', 20.0, 4.0),
+        ]
+
+    def test_results_follow_data_changes(self, filled):
+        """Кэш сбрасывается при изменении целей"""
+        assert analytics.get_lateness_summary(filled).completed == 4
+        database.add_goal(filled, "Цель", "Курс", "Завершена", "2025-04-01", "2025-04-03", "", "")
+        assert analytics.get_lateness_summary(filled).late == 3
+
+
+class TestReportSnapshot:
+    @pytest.fixture
+    def filled(self, db_path):
+        database.load_competencies_to_db(db_path)
+        goal_id = database.add_goal(db_path, "Курс SQL", "Курс", "Завершена", "2025-02-01", "2025-01-25",
+                                    "Быстрый", "**SQL** [docs](https://sqlite.org)")
+        database.add_goal(db_path, "Проект", "Проект", "Новая", "2025-03-01", "", "", "")
+        database.link_goal_skill(db_path, goal_id, database.add_skill(db_path, "SQL"))
+        database.add_competency_link(db_path, goal_id, database.get_all_competencies(db_path)[0][0], 2)
+        database.add_semester_goal(db_path, "Пройти курс", 'Количество', 'курс', 3)
+        database.recalculate_semester_progress(db_path)
+        database.check_achievements(db_path)
+        return db_path
+
+    def test_snapshot_contents(self, filled):
+        snapshot = report.take_snapshot(filled)
+        assert snapshot.goals == [
+            report.ReportGoal("Курс SQL", "Курс", "Завершена", "2025-02-01", "2025-01-25",
+                              "Быстрый", "**SQL** [docs](https://sqlite.org)"),
+            report.ReportGoal("Проект", "Проект", "Новая", "2025-03-01", None, "", ""),
+        ]
+        assert snapshot.skills == [("SQL", 1)]
+        assert snapshot.semester_goals == [("Пройти курс", 1, 3)]
+        assert snapshot.lateness.completed == 1
+        assert all(len(achievement) == 2 for achievement in snapshot.achievements)
+        assert [level for _, _, level in snapshot.weak_zones] == [2.0]
+        assert snapshot.steps == 2 + len(report._SECTIONS)
+
+    def test_snapshot_is_detached_from_database(self, filled):
+        """Изменения после снимка в него не попадают"""
+        snapshot = report.take_snapshot(filled)
+        database.add_goal(filled, "Новая цель", "Курс", "Новая", "", "", "", "")
+        assert len(snapshot.goals) == 2
+        assert len(report.take_snapshot(filled).goals) == 3
+
+    def test_render_in_worker_thread(self, filled, tmp_path):
+        """Документ строится в другом потоке без обращений к базе, прогресс доходит до конца"""
+        pytest.importorskip('docx')
+        snapshot = report.take_snapshot(filled)
+        database.close_connections()
+        os.remove(filled)
+        progress = []
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(filename=report.save_report(
+            snapshot, str(tmp_path / "report.docx"), lambda done, total: progress.append((done, total)))))
+        worker.start()
+        worker.join()
+
+        assert os.path.exists(result['filename'])
+        assert progress[-1] == (snapshot.steps, snapshot.steps)
@@ -0,0 +1,12 @@
+"""
+Нужна отдельная (тестовая) база PostgreSQL - таблицы в ней перезаполняются:
+KJ_BENCH_DSN="dbname=kj_bench user=postgres password=..." python -m pytest benchmarks [--bench-size 100000]
+"""
+import os
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-size', type=int, default=100000,
+                     help='число конспектов в синтетической базе бенчмарков')
+    parser.addoption('--bench-dsn', default=os.environ.get('KJ_BENCH_DSN'),
+                     help='строка подключения к базе бенчмарков (по умолчанию KJ_BENCH_DSN)')
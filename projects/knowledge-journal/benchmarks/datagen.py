@@ -0,0 +1,51 @@
+"""
+Генератор синтетической базы журнала знаний: конспекты с текстом на русском
+и английском, теги и журнал активности. Таблицы базы очищаются перед заполнением.
+"""
+import random
+from datetime import datetime, timedelta
+
+from migrations import migrate
+
+CATEGORIES = ['Базы данных', 'Python', 'Алгоритмы', 'Сети', 'Математика', 'Английский']
+# Разные формы одних слов - поиск по основе должен находить их все
+WORDS = ['индекс', 'индексы', 'индексов', 'запрос', 'запросы', 'запросов', 'таблица', 'таблицы',
+         'транзакция', 'транзакции', 'функция', 'функции', 'алгоритм', 'алгоритма', 'сложность',
+         'граф', 'графа', 'дерево', 'деревья', 'сортировка', 'протокол', 'пакет', 'пакеты',
+         'матрица', 'вектор', 'производная', 'интеграл', 'database', 'query', 'index', 'python',
+         'generator', 'decorator', 'socket', 'lecture', 'example', 'и', 'в', 'на', 'для', 'по']
+RARE_WORDS = ['репликация', 'шардирование', 'мемоизация', 'дейкстра', 'вакуум']
+
+
+def generate_notes(count, seed=42):
+    """Кортежи (title, category, file_path, content, created_at, updated_at)"""
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(50, 400))]
+        if rnd.random() < 0.01:
+            words.insert(rnd.randrange(len(words)), rnd.choice(RARE_WORDS))
+        title = f"{rnd.choice(WORDS).capitalize()} {rnd.choice(WORDS)} {i}"
+        created = start + timedelta(minutes=rnd.randint(0, 60 * 24 * 365))
+        content = f"# {title}\n\n" + ' '.join(words)
+        yield (title, rnd.choice(CATEGORIES), f"notes_md/{i}.md", content,
+               created, created + timedelta(days=rnd.randint(0, 30)))
+
+
+def fill_db(db, notes, seed=42, tags=200):
+    """Создание схемы и заполнение базы пакетными вставками"""
+    migrate(db)
+    db.execute_query("TRUNCATE notes, tags, note_tags, activity_log RESTART IDENTITY")
+
+    db.execute_values("INSERT INTO notes (title, category, file_path, content, created_at, updated_at) VALUES %s",
+                      list(generate_notes(notes, seed)))
+    db.execute_values("INSERT INTO tags (name) VALUES %s", [(f"тег{i}",) for i in range(1, tags + 1)])
+
+    rnd = random.Random(seed)
+    links = {(rnd.randint(1, notes), rnd.randint(1, tags)) for _ in range(notes * 2)}
+    db.execute_values("INSERT INTO note_tags (note_id, tag_id) VALUES %s", sorted(links))
+    db.execute_values("INSERT INTO activity_log (note_id, event_type, event_time) VALUES %s",
+                      [(rnd.randint(1, notes), rnd.choice(['CREATE', 'UPDATE', 'VIEW', 'VIEW']),
+                        datetime.now() - timedelta(minutes=rnd.randint(0, 60 * 24 * 60)))
+                       for _ in range(notes * 3)])
+    db.execute_query("ANALYZE")
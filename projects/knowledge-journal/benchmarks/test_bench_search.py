@@ -0,0 +1,85 @@
+"""
+Бенчмарки полнотекстового поиска и запросов DatabaseManager на синтетической базе
+
+Без KJ_BENCH_DSN (или --bench-dsn) бенчмарки пропускаются.
+Группа "поиск: ILIKE" - тот же поиск перебором текста без индекса, для сравнения.
+"""
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from psycopg2.extensions import parse_dsn
+
+from database import DatabaseManager
+from datagen import fill_db
+
+SEARCHES = {
+    'частое слово': 'индекс',
+    'формы слова': 'транзакциями',
+    'редкое слово': 'репликация',
+    'фраза': '"сложность алгоритма"',
+    'исключение': 'граф -дерево',
+    'латиница': 'decorator',
+}
+
+
+@pytest.fixture(scope='session')
+def db(request):
+    dsn = request.config.getoption('--bench-dsn')
+    if not dsn:
+        pytest.skip("не задана база бенчмарков (KJ_BENCH_DSN или --bench-dsn)")
+    try:
+        db = DatabaseManager(parse_dsn(dsn), {'retries': 0})
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"база бенчмарков недоступна: {e}")
+
+    size = request.config.getoption('--bench-size')
+    count = db.execute_query("SELECT COUNT(*) FROM notes", fetch=True)
+    if not count or count[0][0] != size:
+        fill_db(db, size)
+    yield db
+    db.disconnect()
+
+
+@pytest.mark.benchmark(group='поиск')
+@pytest.mark.parametrize('name', SEARCHES)
+def test_search(benchmark, db, name):
+    results = benchmark(db.search_notes, SEARCHES[name])
+    assert all(note['rank'] > 0 for note in results)
+
+
+@pytest.mark.benchmark(group='поиск: ILIKE')
+@pytest.mark.parametrize('name', ['частое слово', 'редкое слово'])
+def test_search_ilike(benchmark, db, name):
+    query = """
+    SELECT id, title FROM notes
+    WHERE title ILIKE %(pattern)s OR content ILIKE %(pattern)s
+    ORDER BY updated_at DESC
+    LIMIT 50
+    """
+    benchmark(db.execute_query, query, {'pattern': f"%{SEARCHES[name]}%"}, fetch=True)
+
+
+READS = {
+    'get_all_notes': lambda db: db.get_all_notes(),
+    'get_note': lambda db: db.get_note(1),
+    'get_note_tags': lambda db: db.get_note_tags(1),
+    'get_recent_notes': lambda db: db.get_recent_notes(5),
+    'get_top_tags': lambda db: db.get_top_tags(10),
+    'get_notes_by_category': lambda db: db.get_notes_by_category(),
+    'get_dashboard_stats': lambda db: db.get_dashboard_stats(),
+    'get_dashboard_stats без кэша': lambda db: (db.invalidate_stats(), db.get_dashboard_stats()),
+}
+
+
+@pytest.mark.benchmark(group='чтение')
+@pytest.mark.parametrize('name', READS)
+def test_read(benchmark, db, name):
+    benchmark(READS[name], db)
+
+
+@pytest.mark.benchmark(group='запись')
+def test_update_note_content(benchmark, db):
+    """Сохранение текста конспекта с пересчётом поискового вектора"""
+    content = "# Конспект\n\n" + "индексы и запросы к таблице " * 100
+    benchmark(db.update_note, 1, None, None, content)
@@ -19,6 +19,23 @@ DB_CONFIG = {
     'port': '5432'
 }
 
+# Пул соединений и повторное подключение
+DB_POOL_CONFIG = {
+    'minconn': 1,
+    'maxconn': 5,
+    'checkout_timeout': 10,
+    'retries': 3,
+    'retry_delay': 0.5,
+    'health_check_interval': 30
+}
+
+# Буферизация журнала активности
+ACTIVITY_LOG_CONFIG = {
+    'flush_interval': 2.0,
+    'flush_size': 200,
+    'max_buffer': 10000
+}
+
 # Настройки приложения
 APP_CONFIG = {
     'app_title': 'Аналитический журнал знаний',
@@ -28,6 +28,10 @@ try:
 
     print("✅ database.py загружен")
 
+    from migrations import migrate
+
+    print("✅ migrations.py загружен")
+
     from file_manager import FileManager
 
     print("✅ file_manager.py загружен")
@@ -60,13 +64,21 @@ def main():
         print(f"📊 Папка для экспорта: {config.EXPORTS_DIR}")
 
         print("\n🔧 Инициализация базы данных...")
-        db_manager = DatabaseManager(config.DB_CONFIG)
+        db_manager = DatabaseManager(config.DB_CONFIG, config.DB_POOL_CONFIG, config.ACTIVITY_LOG_CONFIG)
         print("✅ База данных подключена")
 
+        print("\n🗄️ Проверка схемы базы данных...")
+        applied = migrate(db_manager)
+        print(f"✅ Схема актуальна, применено миграций: {len(applied)}")
+
         print("\n📁 Инициализация файлового менеджера...")
         file_manager = FileManager(config.NOTES_DIR)
         print("✅ Файловый менеджер готов")
 
+        print("\n🔍 Подготовка полнотекстового поиска...")
+        indexed = db_manager.reindex_notes(file_manager.read_md_file)
+        print(f"✅ Поиск готов, проиндексировано новых конспектов: {indexed}")
+
         print("\n🖥️ Загрузка графического интерфейса...")
         app = KnowledgeJournalGUI(db_manager, file_manager)
         print("✅ Интерфейс создан")
@@ -76,7 +88,11 @@ def main():
         print("=" * 50)
 
         # Запуск главного цикла Tkinter
-        app.run()
+        try:
+            app.run()
+        finally:
+            # Запись буфера журнала активности и закрытие пула
+            db_manager.disconnect()
 
     except Exception as e:
         print(f"\n❌ Критическая ошибка при запуске: {e}")
@@ -0,0 +1,39 @@
+# migrate.py
+"""
+Миграции схемы базы данных из командной строки
+
+Запуск: python migrate.py            - применить все недостающие миграции
+        python migrate.py --status   - показать применённые и ожидающие миграции
+        python migrate.py --target 2 - применить миграции до версии 2 включительно
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import config
+from database import DatabaseManager
+from migrations import migrate, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы базы журнала знаний")
+    parser.add_argument('--status', action='store_true', help="только показать состояние миграций")
+    parser.add_argument('--target', type=int, help="последняя применяемая версия")
+    args = parser.parse_args()
+
+    db = DatabaseManager(config.DB_CONFIG, config.DB_POOL_CONFIG)
+    try:
+        if not args.status:
+            applied = migrate(db, args.target)
+            print(f"✅ Применено миграций: {len(applied)}")
+
+        for version, description, applied in status(db):
+            print(f"  {'✅' if applied else '⏳'} {version}: {description}")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
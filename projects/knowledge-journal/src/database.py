@@ -1,59 +1,513 @@
 # src/database.py
 import psycopg2
-from datetime import datetime
+from psycopg2 import extras, pool
+from contextlib import contextmanager
+from datetime import date, datetime
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Настройки пула по умолчанию (переопределяются DB_POOL_CONFIG из config.py)
+DEFAULT_POOL_CONFIG = {
+    'minconn': 1,
+    'maxconn': 5,
+    'checkout_timeout': 10,         # сек ожидания свободного соединения
+    'retries': 3,                   # повторов запроса после потери соединения
+    'retry_delay': 0.5,             # сек перед первым повтором, дальше удваивается
+    'health_check_interval': 30,    # сек простоя, после которых соединение проверяется SELECT 1
+}
+
+# Строк в одном INSERT при пакетной вставке
+BATCH_PAGE_SIZE = 500
+
+# Буфер журнала активности (переопределяется ACTIVITY_LOG_CONFIG из config.py)
+DEFAULT_ACTIVITY_LOG_CONFIG = {
+    'flush_interval': 2.0,          # сек между записями буфера
+    'flush_size': 200,              # событий, при которых буфер пишется сразу
+    'max_buffer': 10000,            # событий, которые хранятся, пока БД недоступна
+}
+
+# Время жизни кэша метрик аналитики, сек
+STATS_CACHE_TTL = 30
+
+# Метрики аналитики за один запрос: JSON-массивы списков разбираются psycopg2
+DASHBOARD_QUERY = """
+WITH categories AS (
+    SELECT category, COUNT(*) AS note_count
+    FROM notes
+    WHERE category IS NOT NULL
+    GROUP BY category
+), top_tags AS (
+    SELECT t.name, COUNT(*) AS usage_count
+    FROM tags t
+    JOIN note_tags nt ON t.id = nt.tag_id
+    GROUP BY t.id, t.name
+    ORDER BY usage_count DESC
+    LIMIT %(top_tags)s
+), daily AS (
+    SELECT DATE(event_time) AS date,
+           COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE event_type = 'CREATE') AS creates,
+           COUNT(*) FILTER (WHERE event_type = 'UPDATE') AS updates,
+           COUNT(*) FILTER (WHERE event_type = 'VIEW') AS views
+    FROM activity_log
+    WHERE DATE(event_time) >= CURRENT_DATE - %(days)s
+    GROUP BY DATE(event_time)
+)
+SELECT (SELECT COUNT(*) FROM notes),
+       (SELECT COUNT(*) FROM tags),
+       (SELECT COALESCE(SUM(total), 0) FROM daily WHERE date = CURRENT_DATE),
+       (SELECT COALESCE(json_agg(json_build_array(category, note_count) ORDER BY note_count DESC), '[]')
+        FROM categories),
+       (SELECT COALESCE(json_agg(json_build_array(name, usage_count) ORDER BY usage_count DESC), '[]')
+        FROM top_tags),
+       (SELECT COALESCE(json_agg(json_build_array(date, total, creates, updates, views) ORDER BY date), '[]')
+        FROM daily)
+"""
+
+# Полнотекстовый поиск: текст конспекта дублируется в notes.content,
+# по нему и названию строится search_vector (см. миграцию 2 в migrations.py)
+
+# Границы найденных слов во фрагментах поиска
+HIGHLIGHT_START = '⟦'
+HIGHLIGHT_STOP = '⟧'
+SEARCH_LIMIT = 50
+
+# Фрагменты строятся только для отобранных по рангу строк
+SEARCH_QUERY = f"""
+WITH q AS (
+    SELECT websearch_to_tsquery('russian', %(query)s) || websearch_to_tsquery('simple', %(query)s) AS query
+), found AS (
+    SELECT n.id, n.title, n.category, n.updated_at, n.content,
+           ts_rank_cd(n.search_vector, q.query) AS rank
+    FROM notes n, q
+    WHERE n.search_vector @@ q.query
+    ORDER BY rank DESC, n.updated_at DESC
+    LIMIT %(limit)s
+)
+SELECT f.id, f.title, f.category,
+       TO_CHAR(f.updated_at, 'DD.MM.YYYY HH24:MI') AS updated,
+       f.rank,
+       ts_headline('russian', coalesce(f.content, ''), q.query,
+                   'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5')
+FROM found f, q
+ORDER BY f.rank DESC, f.updated_at DESC
+"""
+
+
+class WriteNotConfirmed(Exception):
+    """Соединение потеряно после отправки записи: неизвестно, зафиксирована ли она"""
+
+
+class TTLCache:
+    """Кэш результатов на ttl секунд (потокобезопасный)"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and time.monotonic() - item[0] < self.ttl:
+                self.hits += 1
+                return True, item[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class PoolMetrics:
+    """Счётчики пула соединений (потокобезопасные)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.failures = 0
+        self.reconnects = 0
+        self.last_error = None
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_release(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error).strip()
+
+    def record_reconnect(self):
+        with self._lock:
+            self.reconnects += 1
+
+    def record_success(self):
+        with self._lock:
+            self.last_error = None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'in_use': self.in_use,
+                'avg_wait_ms': 1000 * self.wait_total / self.checkouts if self.checkouts else 0.0,
+                'max_wait_ms': 1000 * self.wait_max,
+                'failures': self.failures,
+                'reconnects': self.reconnects,
+                'last_error': self.last_error,
+            }
+
+
+class ActivityLogWriter:
+    """Буферизованная запись журнала активности.
+
+    События копятся в памяти и пишутся фоновым потоком одним INSERT ... VALUES
+    по таймеру или при заполнении буфера. Повторные просмотры одного конспекта
+    между сбросами записываются один раз.
+    """
+
+    # События удалённых к моменту записи конспектов пишутся с note_id = NULL, как ON DELETE SET NULL
+    INSERT_QUERY = """
+    INSERT INTO activity_log (note_id, event_type, event_time)
+    SELECT n.id, v.event_type, v.event_time
+    FROM (VALUES %s) AS v (note_id, event_type, event_time)
+    LEFT JOIN notes n ON n.id = v.note_id
+    """
+    TEMPLATE = "(%s::integer, %s, %s::timestamp)"
+
+    def __init__(self, db, flush_interval, flush_size, max_buffer):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_buffer = max_buffer
+
+        self.written = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._pending_views = set()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+        self._thread.start()
+
+    def log(self, note_id, event_type):
+        with self._lock:
+            if event_type == 'VIEW':
+                if note_id in self._pending_views:
+                    self.coalesced += 1
+                    return
+                self._pending_views.add(note_id)
+            self._buffer.append((note_id, event_type, datetime.now()))
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Запись накопленных событий.
+
+        При недоступной БД события остаются в буфере до следующего сброса. Пакет,
+        который сервер отверг (ошибка в данных), отбрасывается и учитывается в dropped,
+        иначе он повторялся бы при каждом сбросе и задерживал все следующие события.
+        Так же отбрасывается пакет, соединение которого оборвалось после отправки
+        (WriteNotConfirmed): он мог быть записан, и повтор записал бы события дважды.
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+                self._pending_views = set()
+            if not events:
+                return 0
+
+            try:
+                written = self.db.execute_values(self.INSERT_QUERY, events, self.TEMPLATE, raise_errors=True)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                written = None
+            except Exception as e:
+                with self._lock:
+                    self.dropped += len(events)
+                logger.error(f"Пакет журнала активности отклонён, потеряно событий {len(events)}: {e}")
+                return 0
+
+            if written is None:
+                with self._lock:
+                    self._buffer[:0] = events
+                    overflow = len(self._buffer) - self.max_buffer
+                    if overflow > 0:
+                        del self._buffer[:overflow]
+                        self.dropped += overflow
+                        logger.error(f"Буфер журнала активности переполнен, потеряно событий: {overflow}")
+                    self._pending_views.update(note_id for note_id, event_type, _ in self._buffer
+                                               if event_type == 'VIEW')
+                return 0
+
+            self.written += len(events)
+            return len(events)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffered': len(self._buffer),
+                'written': self.written,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+            }
+
+    def close(self):
+        """Остановка фонового потока и запись оставшихся событий"""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._stopped:
+                self.flush()
+
 
 class DatabaseManager:
-    def __init__(self, db_config):
+    def __init__(self, db_config, pool_config=None, activity_log_config=None):
         self.db_config = db_config
-        self.connection = None
+        self.pool_config = {**DEFAULT_POOL_CONFIG, **(pool_config or {})}
+        self.pool = None
+        self.metrics = PoolMetrics()
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(self.pool_config['maxconn'])
+        self._checked_at = {}
+        self.stats_cache = TTLCache(STATS_CACHE_TTL)
         self.connect()
+        self.activity_log = ActivityLogWriter(self, **{**DEFAULT_ACTIVITY_LOG_CONFIG, **(activity_log_config or {})})
         print(f"✅ Подключение к БД: {db_config['dbname']}")
 
     def connect(self):
         try:
-            self.connection = psycopg2.connect(**self.db_config)
-            self.connection.autocommit = False
+            self.pool = pool.ThreadedConnectionPool(
+                self.pool_config['minconn'], self.pool_config['maxconn'], **self.db_config
+            )
         except Exception as e:
             logger.error(f"Ошибка подключения к БД: {e}")
             raise
 
-    def execute_query(self, query, params=None, fetch=False):
+    # СОЕДИНЕНИЯ
+    @contextmanager
+    def connection(self):
+        """Соединение текущего потока из пула.
+
+        Вложенные блоки в одном потоке (и все запросы внутри блока) используют
+        одно соединение, поэтому фоновая задача держит своё соединение до конца работы.
+        """
+        with self._held():
+            yield self._thread_connection()
+
+    @contextmanager
+    def _held(self):
+        """Блок, после внешнего уровня которого соединение потока возвращается в пул"""
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        local.depth = depth + 1
+        try:
+            yield
+        finally:
+            local.depth = depth
+            if not depth:
+                conn = getattr(local, 'conn', None)
+                local.conn = None
+                if conn is not None:
+                    self._release(conn)
+
+    def _thread_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._acquire()
+        return conn
+
+    def _acquire(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.pool_config['checkout_timeout']):
+            raise pool.PoolError("нет свободных соединений в пуле")
+        try:
+            conn = self.pool.getconn()
+            if not self._is_healthy(conn):
+                self._close_connection(conn)
+                self.metrics.record_reconnect()
+                conn = self.pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return conn
+
+    def _release(self, conn):
+        try:
+            if conn.closed:
+                self._close_connection(conn)
+            else:
+                self._checked_at[id(conn)] = time.monotonic()
+                self.pool.putconn(conn)
+        except Exception as e:
+            logger.error(f"Ошибка возврата соединения в пул: {e}")
+        finally:
+            self._slots.release()
+            self.metrics.record_release()
+
+    def _close_connection(self, conn):
+        self._checked_at.pop(id(conn), None)
+        self.pool.putconn(conn, close=True)
+
+    def _discard_thread_connection(self):
+        """Закрытие потерянного соединения потока; следующий запрос возьмёт новое"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        try:
+            self._close_connection(conn)
+        except Exception as e:
+            logger.error(f"Ошибка закрытия соединения: {e}")
+        finally:
+            self._slots.release()
+            self.metrics.record_release()
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        checked_at = self._checked_at.get(id(conn))
+        if checked_at is not None and time.monotonic() - checked_at < self.pool_config['health_check_interval']:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            self._checked_at[id(conn)] = time.monotonic()
+            return True
+        except Exception as e:
+            logger.warning(f"Соединение с БД не отвечает: {e}")
+            return False
+
+    def execute_query(self, query, params=None, fetch=False, read_only=False):
+        """Выполнение запроса с фиксацией транзакции (повторы при обрыве см. _run)"""
+        def run(cursor):
+            cursor.execute(query, params or ())
+            return cursor.fetchall() if fetch else True
+        return self._run(run, read_only=read_only)
+
+    def execute_values(self, query, rows, template=None, page_size=BATCH_PAGE_SIZE, raise_errors=False):
+        """Пакетная вставка строк одним запросом на страницу (psycopg2.extras.execute_values)"""
+        def run(cursor):
+            extras.execute_values(cursor, query, rows, template, page_size)
+            return True
+        return self._run(run, raise_errors)
+
+    def _run(self, operation, raise_errors=False, read_only=False):
+        """Выполнение operation(cursor) в транзакции на соединении потока.
+
+        При потере соединения (перезапуск сервера, обрыв сети, неудачный откат) соединение
+        закрывается, и операция повторяется на новом не более retries раз с растущей паузой.
+        Запись повторяется, только если соединение потеряно до отправки запроса: после
+        отправки неизвестно, зафиксирована ли она, и повтор мог бы записать данные дважды.
+        Прочие ошибки откатывают транзакцию и возвращают None, а с raise_errors
+        ошибка запроса передаётся вызывающему (потерянная запись - как WriteNotConfirmed).
+        """
+        attempts = self.pool_config['retries'] + 1
+        for attempt in range(attempts):
+            conn = None
+            sent = False
+            with self._held():
+                try:
+                    conn = self._thread_connection()
+                    with conn.cursor() as cursor:
+                        sent = True
+                        result = operation(cursor)
+                    conn.commit()
+                    self.metrics.record_success()
+                    return result
+                except Exception as e:
+                    lost = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+                    # Соединение живо, если откат прошёл, - ошибка в самом запросе, повтор не поможет
+                    if (conn is None and not lost) or self._rolled_back(conn):
+                        logger.error(f"Ошибка выполнения запроса: {e}")
+                        if raise_errors and conn is not None:
+                            raise
+                        return None
+                    self.metrics.record_failure(e)
+                    self._discard_thread_connection()
+                    if sent and not read_only:
+                        logger.error(f"Соединение потеряно во время записи, запись не повторяется: {e}")
+                        if raise_errors:
+                            raise WriteNotConfirmed(str(e)) from e
+                        return None
+                    logger.warning(f"Нет соединения с БД (попытка {attempt + 1} из {attempts}): {e}")
+            if attempt + 1 < attempts:
+                time.sleep(self.pool_config['retry_delay'] * 2 ** attempt)
+
+        logger.error("БД недоступна, запрос не выполнен")
+        return None
+
+    def _rolled_back(self, conn):
+        """Откат транзакции после ошибки; False, если соединение закрыто или откат не удался"""
+        if conn is None or conn.closed:
+            return False
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(query, params or ())
-                if fetch:
-                    return cursor.fetchall()
-                self.connection.commit()
-                return True
+            conn.rollback()
+            return True
         except Exception as e:
-            self.connection.rollback()
-            logger.error(f"Ошибка выполнения запроса: {e}")
-            return None
+            logger.warning(f"Не удалось откатить транзакцию: {e}")
+            return False
+
+    def get_pool_stats(self):
+        """Метрики пула для строки состояния"""
+        stats = self.metrics.snapshot()
+        stats['maxconn'] = self.pool_config['maxconn']
+        return stats
 
     # БАЗОВЫЕ МЕТОДЫ
-    def create_note(self, title, category, file_path):
+    def create_note(self, title, category, file_path, content=None):
         query = """
-        INSERT INTO notes (title, category, file_path, created_at, updated_at)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO notes (title, category, file_path, content, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
         RETURNING id
         """
         now = datetime.now()
-        result = self.execute_query(query, (title, category, file_path, now, now), fetch=True)
+        result = self.execute_query(query, (title, category, file_path, content, now, now), fetch=True)
         note_id = result[0][0] if result else None
 
         if note_id:
+            self.invalidate_stats()
             self.log_activity(note_id, 'CREATE')
 
         return note_id
 
     def get_note(self, note_id):
-        query = "SELECT * FROM notes WHERE id = %s"
-        result = self.execute_query(query, (note_id,), fetch=True)
+        query = "SELECT id, title, file_path, created_at, updated_at, category FROM notes WHERE id = %s"
+        result = self.execute_query(query, (note_id,), fetch=True, read_only=True)
         if result:
             return {
                 'id': result[0][0],
@@ -65,7 +519,7 @@ class DatabaseManager:
             }
         return None
 
-    def update_note(self, note_id, title=None, category=None):
+    def update_note(self, note_id, title=None, category=None, content=None):
         updates = []
         params = []
 
@@ -75,6 +529,10 @@ class DatabaseManager:
         if category:
             updates.append("category = %s")
             params.append(category)
+        if content is not None:
+            # Текст файла для полнотекстового поиска
+            updates.append("content = %s")
+            params.append(content)
 
         if not updates:
             return
@@ -82,11 +540,13 @@ class DatabaseManager:
         params.append(note_id)
         query = f"UPDATE notes SET {', '.join(updates)} WHERE id = %s"
         self.execute_query(query, tuple(params))
+        self.invalidate_stats()
         self.log_activity(note_id, 'UPDATE')
 
     def delete_note(self, note_id):
         query = "DELETE FROM notes WHERE id = %s"
         self.execute_query(query, (note_id,))
+        self.invalidate_stats()
 
     def get_all_notes(self):
         query = """
@@ -95,7 +555,7 @@ class DatabaseManager:
         FROM notes 
         ORDER BY updated_at DESC
         """
-        result = self.execute_query(query, fetch=True)
+        result = self.execute_query(query, fetch=True, read_only=True)
 
         notes = []
         if result:
@@ -108,6 +568,44 @@ class DatabaseManager:
                 })
         return notes
 
+    # ПОИСК
+    def reindex_notes(self, read_file, batch_size=BATCH_PAGE_SIZE):
+        """Загрузка текста файлов в notes.content для конспектов, у которых его ещё нет"""
+        rows = self.execute_query("SELECT id, file_path FROM notes WHERE content IS NULL",
+                                  fetch=True, read_only=True) or []
+        query = """
+        UPDATE notes SET content = v.content
+        FROM (VALUES %s) AS v (id, content)
+        WHERE notes.id = v.id
+        """
+        for start in range(0, len(rows), batch_size):
+            batch = [(note_id, read_file(file_path)) for note_id, file_path in rows[start:start + batch_size]]
+            self.execute_values(query, batch)
+        return len(rows)
+
+    def search_notes(self, query, limit=SEARCH_LIMIT):
+        """Поиск по названию и тексту конспектов, лучшие совпадения первыми.
+
+        Синтаксис запроса как у поисковиков: слова, "фраза", -исключение, or.
+        snippet - фрагменты текста, найденные слова между HIGHLIGHT_START и HIGHLIGHT_STOP.
+        """
+        if not query or not query.strip():
+            return []
+        result = self.execute_query(SEARCH_QUERY, {'query': query, 'limit': limit}, fetch=True, read_only=True)
+
+        notes = []
+        if result:
+            for row in result:
+                notes.append({
+                    'id': row[0],
+                    'title': row[1],
+                    'category': row[2],
+                    'updated': row[3],
+                    'rank': row[4],
+                    'snippet': row[5]
+                })
+        return notes
+
     # ТЕГИ
     def add_tag(self, note_id, tag_name):
         # Создаём тег
@@ -121,7 +619,7 @@ class DatabaseManager:
 
         # Получаем ID тега
         get_tag_query = "SELECT id FROM tags WHERE name = %s"
-        result = self.execute_query(get_tag_query, (tag_name,), fetch=True)
+        result = self.execute_query(get_tag_query, (tag_name,), fetch=True, read_only=True)
         if not result:
             return
 
@@ -134,6 +632,7 @@ class DatabaseManager:
         ON CONFLICT DO NOTHING
         """
         self.execute_query(link_query, (note_id, tag_id))
+        self.invalidate_stats()
 
     def get_note_tags(self, note_id):
         query = """
@@ -142,7 +641,7 @@ class DatabaseManager:
         JOIN note_tags nt ON t.id = nt.tag_id
         WHERE nt.note_id = %s
         """
-        result = self.execute_query(query, (note_id,), fetch=True)
+        result = self.execute_query(query, (note_id,), fetch=True, read_only=True)
         return [row[0] for row in result] if result else []
 
     def remove_tag(self, note_id, tag_name):
@@ -153,14 +652,12 @@ class DatabaseManager:
         )
         """
         self.execute_query(query, (note_id, tag_name))
+        self.invalidate_stats()
 
     # АКТИВНОСТЬ
     def log_activity(self, note_id, event_type):
-        query = """
-        INSERT INTO activity_log (note_id, event_type)
-        VALUES (%s, %s)
-        """
-        self.execute_query(query, (note_id, event_type))
+        """Событие попадает в буфер, в БД его пишет ActivityLogWriter"""
+        self.activity_log.log(note_id, event_type)
 
     def log_view(self, note_id):
         self.log_activity(note_id, 'VIEW')
@@ -174,24 +671,12 @@ class DatabaseManager:
         GROUP BY category
         ORDER BY count DESC
         """
-        result = self.execute_query(query, fetch=True)
+        result = self.execute_query(query, fetch=True, read_only=True)
         return {row[0]: row[1] for row in result} if result else {}
 
     def get_activity_stats(self, days=30):
-        query = """
-        SELECT DATE(event_time) as date, 
-               COUNT(*) as total,
-               SUM(CASE WHEN event_type = 'CREATE' THEN 1 ELSE 0 END) as creates,
-               SUM(CASE WHEN event_type = 'UPDATE' THEN 1 ELSE 0 END) as updates,
-               SUM(CASE WHEN event_type = 'VIEW' THEN 1 ELSE 0 END) as views
-        FROM activity_log
-        WHERE event_time >= CURRENT_DATE - INTERVAL '%s days'
-        GROUP BY DATE(event_time)
-        ORDER BY date
-        """
-        result = self.execute_query(query, (days,), fetch=True)
         return {
-            'daily_activity': result if result else []
+            'daily_activity': self.get_dashboard_stats(days=days)['daily_activity']
         }
 
     def get_top_tags(self, limit=5):
@@ -203,7 +688,7 @@ class DatabaseManager:
         ORDER BY usage_count DESC
         LIMIT %s
         """
-        result = self.execute_query(query, (limit,), fetch=True)
+        result = self.execute_query(query, (limit,), fetch=True, read_only=True)
         return result if result else []
 
     def get_recent_notes(self, limit=5):
@@ -214,7 +699,7 @@ class DatabaseManager:
         ORDER BY updated_at DESC
         LIMIT %s
         """
-        result = self.execute_query(query, (limit,), fetch=True)
+        result = self.execute_query(query, (limit,), fetch=True, read_only=True)
 
         notes = []
         if result:
@@ -228,33 +713,49 @@ class DatabaseManager:
         return notes
 
     def get_total_stats(self):
-        # Общее количество
-        query_total = "SELECT COUNT(*) FROM notes"
-        total_result = self.execute_query(query_total, fetch=True)
-        total_notes = total_result[0][0] if total_result else 0
-
-        # Теги
-        query_tags = "SELECT COUNT(*) FROM tags"
-        tags_result = self.execute_query(query_tags, fetch=True)
-        total_tags = tags_result[0][0] if tags_result else 0
-
-        # Активность сегодня
-        query_today = """
-        SELECT COUNT(*) 
-        FROM activity_log 
-        WHERE DATE(event_time) = CURRENT_DATE
+        return self.get_dashboard_stats()
+
+    def get_dashboard_stats(self, days=7, top_tags=5):
+        """Все метрики аналитики одним запросом.
+
+        Результат кэшируется на STATS_CACHE_TTL секунд и общий для вкладки
+        аналитики и отчётов; изменения через этот объект сбрасывают кэш.
+        Возвращаемый словарь нельзя изменять.
         """
-        today_result = self.execute_query(query_today, fetch=True)
-        today_activity = today_result[0][0] if today_result else 0
+        key = (days, top_tags)
+        found, stats = self.stats_cache.get(key)
+        if found:
+            return stats
+
+        self.activity_log.flush()
+        result = self.execute_query(DASHBOARD_QUERY, {'days': max(days, 0), 'top_tags': top_tags},
+                                    fetch=True, read_only=True)
+        if not result:
+            return {
+                'total_notes': 0,
+                'total_tags': 0,
+                'today_activity': 0,
+                'notes_by_category': {},
+                'top_tags': [],
+                'daily_activity': []
+            }
 
-        return {
+        total_notes, total_tags, today_activity, categories, tags, daily = result[0]
+        stats = {
             'total_notes': total_notes,
             'total_tags': total_tags,
             'today_activity': today_activity,
-            'notes_by_category': self.get_notes_by_category(),
-            'top_tags': self.get_top_tags(5)
+            'notes_by_category': {category: count for category, count in categories},
+            'top_tags': [tuple(tag) for tag in tags],
+            'daily_activity': [(date.fromisoformat(day), *counts) for day, *counts in daily]
         }
+        self.stats_cache.put(key, stats)
+        return stats
+
+    def invalidate_stats(self):
+        self.stats_cache.clear()
 
     def disconnect(self):
-        if self.connection:
-            self.connection.close()
\ No newline at end of file
+        self.activity_log.close()
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
\ No newline at end of file
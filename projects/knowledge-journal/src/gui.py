@@ -8,8 +8,13 @@ import webbrowser
 import tempfile
 import os
 
+from database import HIGHLIGHT_START, HIGHLIGHT_STOP
+
 logger = logging.getLogger(__name__)
 
+# Период обновления метрик пула соединений в статус баре
+POOL_STATUS_INTERVAL_MS = 5000
+
 
 class KnowledgeJournalGUI:
     """Основной класс графического интерфейса"""
@@ -27,6 +32,9 @@ class KnowledgeJournalGUI:
 
         # Текущий выбранный конспект
         self.current_note = None
+
+        # Результаты поиска по id конспекта (None - показан весь список)
+        self.search_results = None
         self.status_bar = None  # Инициализация status_bar
 
         # Создание главного окна
@@ -78,8 +86,16 @@ class KnowledgeJournalGUI:
         self.create_tags_tab()
 
         # Статус бар
-        self.status_bar = ttk.Label(self.root, text="Готово", relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.pool_status = ttk.Label(status_frame, text="", relief=tk.SUNKEN, anchor=tk.E)
+        self.pool_status.pack(side=tk.RIGHT)
+
+        self.status_bar = ttk.Label(status_frame, text="Готово", relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.update_pool_status()
 
     def create_notes_tab(self):
         """Создание вкладки конспектов"""
@@ -115,6 +131,17 @@ class KnowledgeJournalGUI:
         ttk.Button(button_frame, text="Удалить", command=self.delete_note).pack(side=tk.LEFT, padx=2)
         ttk.Button(button_frame, text="Просмотреть", command=self.view_note).pack(side=tk.LEFT, padx=2)
 
+        # Полнотекстовый поиск
+        search_frame = ttk.LabelFrame(left_frame, text="Поиск по конспектам")
+        search_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.search_entry = ttk.Entry(search_frame, width=30)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        self.search_entry.bind('<Return>', lambda event: self.search_notes())
+
+        ttk.Button(search_frame, text="Найти", command=self.search_notes).pack(side=tk.LEFT, padx=2)
+        ttk.Button(search_frame, text="Сбросить", command=self.reset_search).pack(side=tk.LEFT, padx=2)
+
         # Список конспектов
         list_frame = ttk.LabelFrame(left_frame, text="Список конспектов")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -144,6 +171,17 @@ class KnowledgeJournalGUI:
         # Привязка события выбора
         self.tree.bind('<<TreeviewSelect>>', self.on_note_select)
 
+        # Фрагмент текста найденного конспекта
+        self.snippet_display = tk.Text(
+            left_frame,
+            height=4,
+            wrap=tk.WORD,
+            font=('Arial', 9),
+            state='disabled'
+        )
+        self.snippet_display.tag_configure('match', background='yellow')
+        self.snippet_display.pack(fill=tk.X, padx=5, pady=5)
+
         # Правая панель - редактор и теги
         right_frame = ttk.Frame(paned)
 
@@ -231,7 +269,7 @@ class KnowledgeJournalGUI:
         ttk.Button(
             export_frame,
             text="🔄 Обновить статистику",
-            command=self.load_analytics,
+            command=self.refresh_analytics,
             width=25
         ).pack(side=tk.LEFT, padx=5)
 
@@ -285,31 +323,70 @@ class KnowledgeJournalGUI:
     def load_notes(self):
         """Загрузка списка конспектов из БД"""
         try:
-            # Очистка текущего списка
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
             # Получение конспектов из БД
             notes = self.db.get_all_notes()
-
-            # Добавление в Treeview
-            for note in notes:
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        note['id'],
-                        note['title'],
-                        note['category'],
-                        note['updated']
-                    )
-                )
+            self.search_results = None
+            self.show_snippet(None)
+            self.fill_notes_tree(notes)
 
             self.update_status(f"Загружено конспектов: {len(notes)}")
 
         except Exception as e:
             self.show_error(f"Ошибка загрузки конспектов: {e}")
 
+    def fill_notes_tree(self, notes):
+        """Заполнение списка конспектов"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        for note in notes:
+            self.tree.insert(
+                '',
+                tk.END,
+                values=(
+                    note['id'],
+                    note['title'],
+                    note['category'],
+                    note['updated']
+                )
+            )
+
+    def search_notes(self):
+        """Полнотекстовый поиск по названиям и тексту конспектов"""
+        try:
+            query = self.search_entry.get().strip()
+            if not query:
+                self.load_notes()
+                return
+
+            results = self.db.search_notes(query)
+            self.search_results = {note['id']: note for note in results}
+            self.fill_notes_tree(results)
+            self.show_snippet(results[0]['snippet'] if results else "Ничего не найдено")
+
+            self.update_status(f"Найдено конспектов: {len(results)}")
+
+        except Exception as e:
+            self.show_error(f"Ошибка поиска: {e}")
+
+    def reset_search(self):
+        """Возврат к полному списку конспектов"""
+        self.search_entry.delete(0, tk.END)
+        self.load_notes()
+
+    def show_snippet(self, snippet):
+        """Вывод фрагмента с подсветкой найденных слов"""
+        self.snippet_display.config(state='normal')
+        self.snippet_display.delete(1.0, tk.END)
+
+        for i, part in enumerate((snippet or '').split(HIGHLIGHT_START)):
+            # В каждой части, кроме первой, до HIGHLIGHT_STOP идёт найденное слово
+            match, _, rest = part.partition(HIGHLIGHT_STOP) if i else ('', '', part)
+            self.snippet_display.insert(tk.END, match, 'match')
+            self.snippet_display.insert(tk.END, rest)
+
+        self.snippet_display.config(state='disabled')
+
     def on_note_select(self, event):
         """Обработка выбора конспекта"""
         try:
@@ -345,6 +422,10 @@ class KnowledgeJournalGUI:
             # Загрузка тегов
             self.load_note_tags()
 
+            # Фрагмент с найденными словами
+            if self.search_results and note_id in self.search_results:
+                self.show_snippet(self.search_results[note_id]['snippet'])
+
             # Логирование просмотра
             self.db.log_view(note_id)
 
@@ -395,8 +476,8 @@ class KnowledgeJournalGUI:
             # Создание файла
             filepath = self.fm.create_md_file(title)
 
-            # Создание записи в БД
-            note_id = self.db.create_note(title, category, filepath)
+            # Создание записи в БД (текст шаблона индексируется для поиска)
+            note_id = self.db.create_note(title, category, filepath, self.fm.read_md_file(filepath))
 
             # Обновление интерфейса
             self.load_notes()
@@ -437,8 +518,8 @@ class KnowledgeJournalGUI:
             # Обновление файла
             self.fm.write_md_file(self.current_note['file_path'], content)
 
-            # Обновление записи в БД
-            self.db.update_note(self.current_note['id'], title, category)
+            # Обновление записи в БД и поискового индекса
+            self.db.update_note(self.current_note['id'], title, category, content)
 
             # Обновление списка
             self.load_notes()
@@ -585,18 +666,12 @@ class KnowledgeJournalGUI:
             for tag, count in stats['top_tags']:
                 text += f"  #{tag}: {count} использований\n"
 
-            # Активность
-            activity = self.db.get_activity_stats(7)
+            # Активность (из того же запроса)
             text += "\n📅 АКТИВНОСТЬ ЗА НЕДЕЛЮ\n"
             text += "-" * 30 + "\n"
 
-            if activity and 'daily_activity' in activity:
-                daily_data = activity['daily_activity']
-                if daily_data:
-                    for day in daily_data[-7:]:  # Последние 7 дней
-                        if isinstance(day, (list, tuple)) and len(day) > 0:
-                            date_str = str(day[0])  # Просто выводим как строку
-                            text += f"  {date_str}: {day[1] if len(day) > 1 else 0} действий\n"
+            for day in stats['daily_activity'][-7:]:  # Последние 7 дней
+                text += f"  {day[0]}: {day[1]} действий\n"
 
             # Обновление текстового поля
             self.stats_text.delete(1.0, tk.END)
@@ -607,6 +682,11 @@ class KnowledgeJournalGUI:
         except Exception as e:
             self.show_error(f"Ошибка загрузки статистики: {e}")
 
+    def refresh_analytics(self):
+        """Обновление аналитики без кэша"""
+        self.db.invalidate_stats()
+        self.load_analytics()
+
     def load_tags_stats(self):
         """Загрузка статистики тегов"""
         try:
@@ -679,6 +759,18 @@ class KnowledgeJournalGUI:
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.status_bar.config(text=f"[{timestamp}] {message}")
 
+    def update_pool_status(self):
+        """Обновление метрик пула соединений в статус баре"""
+        stats = self.db.get_pool_stats()
+        text = (f"БД: {stats['in_use']}/{stats['maxconn']} соед., "
+                f"выдач {stats['checkouts']}, "
+                f"ожидание {stats['avg_wait_ms']:.1f} мс (макс {stats['max_wait_ms']:.0f}), "
+                f"сбоев {stats['failures']}, переподключений {stats['reconnects']}")
+        if stats['last_error']:
+            text = f"⚠️ БД недоступна | {text}"
+        self.pool_status.config(text=text)
+        self.root.after(POOL_STATUS_INTERVAL_MS, self.update_pool_status)
+
     def show_error(self, message: str):
         """Показать сообщение об ошибке"""
         logger.error(message)
@@ -0,0 +1,142 @@
+# src/migrations.py
+"""
+Миграции схемы базы журнала знаний.
+
+Каждая миграция - номер версии, описание и список SQL-команд. Применённые версии
+записываются в schema_migrations; миграция выполняется в одной транзакции вместе
+с записью о ней, поэтому прерванная миграция не оставляет схему наполовину изменённой.
+Команды идемпотентны (IF NOT EXISTS) - базы, созданные по README, обновляются без ошибок.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки: одновременно запущенные копии приложения мигрируют по очереди
+MIGRATION_LOCK_ID = 7_310_215
+
+MIGRATIONS = [
+    (1, "Таблицы конспектов, тегов и журнала активности", [
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            file_path TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            category VARCHAR(100)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tags (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(50) UNIQUE NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS note_tags (
+            note_id INTEGER REFERENCES notes(id) ON DELETE CASCADE,
+            tag_id INTEGER REFERENCES tags(id) ON DELETE CASCADE,
+            PRIMARY KEY (note_id, tag_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id SERIAL PRIMARY KEY,
+            note_id INTEGER REFERENCES notes(id) ON DELETE SET NULL,
+            event_type VARCHAR(20) NOT NULL,
+            event_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    # Вектор по названию (вес A) и тексту (вес B) в конфигурациях russian (формы слов)
+    # и simple (точные слова) пересчитывает PostgreSQL при изменении title или content
+    (2, "Полнотекстовый поиск по конспектам", [
+        "ALTER TABLE notes ADD COLUMN IF NOT EXISTS content TEXT",
+        """
+        ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(content, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_notes_search ON notes USING GIN (search_vector)",
+    ]),
+    (3, "Индексы для списков, статистики и связей", [
+        # Список и последние конспекты: ORDER BY updated_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes (updated_at DESC)",
+        # Конспекты по категориям
+        "CREATE INDEX IF NOT EXISTS idx_notes_category ON notes (category)",
+        # Популярные теги и удаление тега: первичный ключ note_tags начинается с note_id
+        "CREATE INDEX IF NOT EXISTS idx_note_tags_tag_id ON note_tags (tag_id)",
+        # Выборки журнала по времени и по дням
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_event_time ON activity_log (event_time)",
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_event_date ON activity_log ((DATE(event_time)))",
+        # ON DELETE SET NULL при удалении конспекта
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_note_id ON activity_log (note_id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def applied_versions(db):
+    """Версии, записанные в schema_migrations"""
+    with db.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_MIGRATIONS_TABLE)
+            cursor.execute("SELECT version FROM schema_migrations")
+            versions = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+    return versions
+
+
+def status(db):
+    """Список (версия, описание, применена ли) по всем миграциям"""
+    applied = applied_versions(db)
+    return [(version, description, version in applied) for version, description, _ in MIGRATIONS]
+
+
+def migrate(db, target=None):
+    """Применение недостающих миграций до версии target (по умолчанию до последней).
+
+    Возвращает номера применённых версий; при ошибке миграция откатывается
+    и исключение передаётся дальше.
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = applied_versions(db)
+    done = []
+
+    for version, description, statements in MIGRATIONS:
+        if version > target or version in applied:
+            continue
+        with db.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+                    # Другая копия приложения могла применить миграцию, пока ждали блокировку
+                    cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                    if cursor.fetchone():
+                        conn.rollback()
+                        continue
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                                   (version, description))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Ошибка миграции {version} ({description}): {e}")
+                raise
+        logger.info(f"Применена миграция {version}: {description}")
+        done.append(version)
+
+    return done
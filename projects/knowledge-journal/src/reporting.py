@@ -51,8 +51,8 @@ class ReportGenerator:
             # Данные для графика (активность по дням)
             ws_charts.append(["День", "Создано", "Обновлено", "Просмотрено"])
 
-            # Получаем данные активности
-            activity = self.db.get_activity_stats(7)
+            # Данные активности приходят вместе с остальной статистикой
+            activity = {'daily_activity': stats['daily_activity']}
 
             # Если нет данных активности, создаём тестовые
             if activity and activity.get('daily_activity'):
@@ -161,5 +161,516 @@ class TestFileManager:
         assert not os.path.exists(filepath)
 
 
+class FakePool:
+    """Пул psycopg2 без сервера: соединения - MagicMock"""
+
+    def __init__(self, minconn, maxconn, **kwargs):
+        self.closed = False
+        self.created = []
+        self.idle = []
+        self.refuse = 0
+
+    def getconn(self):
+        import psycopg2
+        if self.refuse:
+            self.refuse -= 1
+            raise psycopg2.OperationalError("connection refused")
+        if self.idle:
+            return self.idle.pop()
+        conn = MagicMock(closed=0)
+        self.created.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        if not close:
+            self.idle.append(conn)
+
+    def closeall(self):
+        self.closed = True
+
+
+def cursor_of(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+
+def make_db_manager(activity_log_config=None):
+    """DatabaseManager поверх FakePool"""
+    pytest.importorskip('psycopg2')
+    from src import database
+
+    with patch.object(database.pool, 'ThreadedConnectionPool', FakePool):
+        return database.DatabaseManager({'dbname': 'test'}, {'retry_delay': 0, 'maxconn': 3}, activity_log_config)
+
+
+class TestDatabasePool:
+    """Тесты пула соединений DatabaseManager"""
+
+    @pytest.fixture
+    def db(self):
+        db = make_db_manager()
+        yield db
+        db.disconnect()
+
+    def test_reconnects_after_server_restart(self, db):
+        """Потерянное соединение закрывается, запрос повторяется на новом"""
+        import psycopg2
+
+        assert db.execute_query("SELECT 1") is True
+        lost = db.pool.created[0]
+
+        def drop(*args):
+            lost.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        cursor_of(lost).execute.side_effect = drop
+        db.pool.refuse = 1
+        result = db.execute_query("SELECT id FROM notes", fetch=True, read_only=True)
+
+        assert result is cursor_of(db.pool.created[1]).fetchall.return_value
+        stats = db.get_pool_stats()
+        assert stats['failures'] == 2
+        assert stats['in_use'] == 0
+        assert stats['last_error'] is None
+
+    def test_retries_are_bounded(self, db):
+        db.pool.refuse = 100
+        assert db.execute_query("SELECT 1") is None
+        assert 100 - db.pool.refuse == db.pool_config['retries'] + 1
+        assert db.get_pool_stats()['in_use'] == 0
+        assert "connection refused" in db.get_pool_stats()['last_error']
+
+    def test_query_errors_are_not_retried(self, db):
+        import psycopg2
+
+        assert db.execute_query("SELECT 1") is True
+        conn = db.pool.created[0]
+        cursor_of(conn).execute.side_effect = psycopg2.ProgrammingError("syntax error")
+
+        assert db.execute_query("SELEC 1") is None
+        conn.rollback.assert_called()
+        assert len(db.pool.created) == 1
+        assert db.get_pool_stats()['failures'] == 0
+
+    def test_failed_rollback_is_connection_loss(self, db):
+        """Если откат после ошибки не прошёл, соединение закрывается и чтение повторяется"""
+        import psycopg2
+
+        assert db.execute_query("SELECT 1") is True
+        broken = db.pool.created[0]
+        cursor_of(broken).execute.side_effect = psycopg2.ProgrammingError("syntax error")
+        broken.rollback.side_effect = psycopg2.InterfaceError("connection already closed")
+
+        assert db.execute_query("SELECT 1", read_only=True) is True
+        assert len(db.pool.created) == 2
+        assert broken not in db.pool.idle
+        stats = db.get_pool_stats()
+        assert stats['failures'] == 1
+        assert stats['in_use'] == 0
+
+    def test_lost_commit_is_not_retried(self, db):
+        """Обрыв на фиксации записи: запись не повторяется, иначе конспект мог бы появиться дважды"""
+        import psycopg2
+
+        assert db.execute_query("SELECT 1") is True
+        conn = db.pool.created[0]
+        cursor = cursor_of(conn)
+        cursor.execute.reset_mock()
+        cursor.fetchall.return_value = [(7,)]
+
+        def drop():
+            conn.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        conn.commit.side_effect = drop
+        assert db.create_note("Конспект", "Python", "notes/1.md") is None
+
+        inserts = [call for created in db.pool.created for call in cursor_of(created).execute.call_args_list
+                   if call.args[0].lstrip().startswith("INSERT")]
+        assert len(inserts) == 1
+        assert len(db.pool.created) == 1
+        assert db.get_pool_stats()['in_use'] == 0
+
+    def test_connection_per_thread(self, db):
+        """Вложенные блоки потока делят соединение, другой поток получает своё"""
+        import threading
+
+        other = []
+        with db.connection() as outer:
+            with db.connection() as inner:
+                db.execute_query("SELECT 1")
+                assert inner is outer
+            worker = threading.Thread(target=lambda: other.append(db.execute_query("SELECT 1")))
+            worker.start()
+            worker.join()
+            assert db.get_pool_stats()['in_use'] == 1
+
+        assert other == [True]
+        assert len(db.pool.created) == 2
+        assert db.get_pool_stats()['checkouts'] == 2
+
+    def test_health_check_replaces_dead_connection(self, db):
+        db.pool_config['health_check_interval'] = 0
+        assert db.execute_query("SELECT 1") is True
+        cursor_of(db.pool.created[0]).execute.side_effect = Exception("terminating connection")
+
+        assert db.execute_query("SELECT 1") is True
+        assert len(db.pool.created) == 2
+        assert db.get_pool_stats()['reconnects'] == 1
+
+
+class TestActivityLog:
+    """Тесты буферизованного журнала активности"""
+
+    @pytest.fixture
+    def db(self):
+        db = make_db_manager({'flush_interval': 60, 'flush_size': 3})
+        yield db
+        db.disconnect()
+
+    @pytest.fixture
+    def batches(self):
+        from src import database
+
+        batches = []
+        with patch.object(database.extras, 'execute_values',
+                          side_effect=lambda cursor, query, rows, *args: batches.append(list(rows))):
+            yield batches
+
+    def test_views_are_coalesced(self, db, batches):
+        for _ in range(3):
+            db.log_view(1)
+        db.log_activity(1, 'UPDATE')
+        assert db.activity_log.flush() == 2
+
+        assert [(note_id, event_type) for note_id, event_type, _ in batches[0]] == [(1, 'VIEW'), (1, 'UPDATE')]
+        assert db.activity_log.stats()['coalesced'] == 2
+
+        db.log_view(1)
+        db.activity_log.flush()
+        assert len(batches) == 2
+
+    def test_full_buffer_is_flushed_in_background(self, db, batches):
+        import time
+
+        for note_id in range(3):
+            db.log_view(note_id)
+        deadline = time.monotonic() + 5
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(batches) == 1 and len(batches[0]) == 3
+
+    def test_failed_flush_keeps_events(self, db):
+        """При ошибке соединения события остаются в буфере"""
+        import psycopg2
+        from src import database
+
+        db.log_view(1)
+        with patch.object(database.extras, 'execute_values',
+                          side_effect=psycopg2.OperationalError("canceling statement due to statement timeout")):
+            assert db.activity_log.flush() == 0
+        db.log_view(1)
+        assert db.activity_log.stats() == {'buffered': 1, 'written': 0, 'coalesced': 1, 'dropped': 0}
+
+    def test_rejected_batch_is_dropped(self, db, batches):
+        """Пакет, отвергнутый сервером, не повторяется и не задерживает следующие события"""
+        import psycopg2
+        from src import database
+
+        db.log_activity(1, 'UPDATE')
+        db.log_activity(2, 'BROKEN')
+        with patch.object(database.extras, 'execute_values',
+                          side_effect=psycopg2.DataError("value too long for type character varying(20)")):
+            assert db.activity_log.flush() == 0
+        assert db.activity_log.stats() == {'buffered': 0, 'written': 0, 'coalesced': 0, 'dropped': 2}
+
+        db.log_activity(3, 'CREATE')
+        assert db.activity_log.flush() == 1
+        assert [note_id for note_id, _, _ in batches[0]] == [3]
+
+    def test_unconfirmed_batch_is_not_requeued(self, db, batches):
+        """Пакет, соединение которого оборвалось после отправки, не пишется повторно"""
+        import psycopg2
+
+        assert db.execute_query("SELECT 1") is True
+        conn = db.pool.created[0]
+
+        def drop():
+            conn.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        conn.commit.side_effect = drop
+        db.log_activity(1, 'UPDATE')
+        assert db.activity_log.flush() == 0
+        assert len(batches) == 1
+        assert db.activity_log.stats() == {'buffered': 0, 'written': 0, 'coalesced': 0, 'dropped': 1}
+
+    def test_disconnect_flushes_buffer(self, batches):
+        db = make_db_manager({'flush_interval': 60})
+        db.log_activity(5, 'CREATE')
+        db.disconnect()
+        assert len(batches) == 1
+        assert db.pool.closed
+
+
+class TestDashboardStats:
+    """Тесты метрик аналитики одним запросом"""
+
+    ROW = (12, 4, 3, [["Python", 7], ["SQL", 5]], [["postgres", 6], ["orm", 2]],
+           [["2025-05-01", 2, 1, 1, 0], ["2025-05-02", 3, 0, 1, 2]])
+
+    @pytest.fixture
+    def db(self):
+        db = make_db_manager()
+        assert db.execute_query("SELECT 1") is True
+        self.cursor = cursor_of(db.pool.created[0])
+        self.cursor.fetchall.return_value = [self.ROW]
+        self.cursor.execute.reset_mock()
+        yield db
+        db.disconnect()
+
+    def test_single_round_trip(self, db):
+        from datetime import date
+
+        stats = db.get_total_stats()
+        assert self.cursor.execute.call_count == 1
+        assert stats == {
+            'total_notes': 12,
+            'total_tags': 4,
+            'today_activity': 3,
+            'notes_by_category': {"Python": 7, "SQL": 5},
+            'top_tags': [("postgres", 6), ("orm", 2)],
+            'daily_activity': [(date(2025, 5, 1), 2, 1, 1, 0), (date(2025, 5, 2), 3, 0, 1, 2)]
+        }
+        assert list(stats['notes_by_category']) == ["Python", "SQL"]
+
+    def test_cache_is_shared_and_reset_by_writes(self, db):
+        stats = db.get_total_stats()
+        assert db.get_activity_stats(7)['daily_activity'] is stats['daily_activity']
+        assert self.cursor.execute.call_count == 1
+
+        db.add_tag(1, "новый")
+        self.cursor.execute.reset_mock()
+        db.get_total_stats()
+        assert self.cursor.execute.call_count == 1
+
+    def test_cache_expires(self, db):
+        db.stats_cache.ttl = 0
+        db.get_total_stats()
+        db.get_total_stats()
+        assert self.cursor.execute.call_count == 2
+
+    def test_activity_period_is_a_separate_key(self, db):
+        db.get_total_stats()
+        db.get_activity_stats(30)
+        assert self.cursor.execute.call_args.args[1] == {'days': 30, 'top_tags': 5}
+
+
+class TestNoteSearch:
+    """Тесты полнотекстового поиска"""
+
+    @pytest.fixture
+    def db(self):
+        db = make_db_manager()
+        assert db.execute_query("SELECT 1") is True
+        self.cursor = cursor_of(db.pool.created[0])
+        self.cursor.execute.reset_mock()
+        yield db
+        db.disconnect()
+
+    def test_search_results(self, db):
+        self.cursor.fetchall.return_value = [(3, "Индексы", "Базы данных", "01.05.2025 10:00", 0.6,
+                                              "создание ⟦индексов⟧ в PostgreSQL")]
+        results = db.search_notes("индекс")
+
+        query, params = self.cursor.execute.call_args.args
+        assert "@@" in query and "ts_headline" in query
+        assert params == {'query': "индекс", 'limit': 50}
+        assert results == [{'id': 3, 'title': "Индексы", 'category': "Базы данных",
+                            'updated': "01.05.2025 10:00", 'rank': 0.6,
+                            'snippet': "создание ⟦индексов⟧ в PostgreSQL"}]
+
+    def test_empty_query_does_not_hit_database(self, db):
+        assert db.search_notes("   ") == []
+        self.cursor.execute.assert_not_called()
+
+    def test_saved_content_is_indexed(self, db):
+        db.update_note(3, "Индексы", "Базы данных", "# Индексы\nB-tree и GIN")
+        query, params = self.cursor.execute.call_args_list[0].args
+        assert "content = %s" in query
+        assert params == ("Индексы", "Базы данных", "# Индексы\nB-tree и GIN", 3)
+
+    def test_reindex_loads_missing_content(self, db):
+        from src import database
+
+        self.cursor.fetchall.return_value = [(1, "a.md"), (2, "b.md"), (3, "c.md")]
+        with patch.object(database.extras, 'execute_values') as execute_values:
+            assert db.reindex_notes(lambda path: f"текст {path}", batch_size=2) == 3
+        batches = [call.args[2] for call in execute_values.call_args_list]
+        assert batches == [[(1, "текст a.md"), (2, "текст b.md")], [(3, "текст c.md")]]
+
+
+class TestMigrations:
+    """Тесты применения миграций (без сервера)"""
+
+    @pytest.fixture
+    def db(self):
+        db = make_db_manager()
+        assert db.execute_query("SELECT 1") is True
+        self.cursor = cursor_of(db.pool.created[0])
+        self.cursor.execute.reset_mock()
+        self.cursor.fetchall.return_value = [(1,)]
+        self.cursor.fetchone.return_value = None
+        yield db
+        db.disconnect()
+
+    def recorded_versions(self):
+        return [call.args[1][0] for call in self.cursor.execute.call_args_list
+                if "INSERT INTO schema_migrations" in call.args[0]]
+
+    def test_versions_are_ordered(self):
+        from src import migrations
+
+        versions = [version for version, _, _ in migrations.MIGRATIONS]
+        assert versions == sorted(set(versions))
+        assert migrations.LATEST_VERSION == versions[-1]
+
+    def test_only_pending_migrations_are_applied(self, db):
+        from src import migrations
+
+        assert migrations.migrate(db) == [2, 3]
+        assert self.recorded_versions() == [2, 3]
+        assert db.get_pool_stats()['in_use'] == 0
+
+    def test_target_version(self, db):
+        from src import migrations
+
+        assert migrations.migrate(db, target=2) == [2]
+        assert [applied for _, _, applied in migrations.status(db)] == [True, False, False]
+
+    def test_failed_migration_is_rolled_back(self, db):
+        from src import migrations
+
+        conn = db.pool.created[0]
+        self.cursor.execute.side_effect = lambda query, *args: (
+            (_ for _ in ()).throw(Exception("permission denied")) if "GIN" in query else None)
+        with pytest.raises(Exception, match="permission denied"):
+            migrations.migrate(db)
+        conn.rollback.assert_called()
+        assert self.recorded_versions() == []
+
+
+@pytest.fixture(scope='module')
+def pg_db():
+    """DatabaseManager на временной схеме тестовой базы PostgreSQL после всех миграций"""
+    dsn = os.environ.get('KJ_TEST_DSN')
+    if not dsn:
+        pytest.skip("не задана тестовая база PostgreSQL (KJ_TEST_DSN)")
+    psycopg2 = pytest.importorskip('psycopg2')
+    from psycopg2.extensions import parse_dsn
+    from src import database, migrations
+
+    schema = f"kj_test_{os.getpid()}"
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA {schema}")
+
+    db = database.DatabaseManager({**parse_dsn(dsn), 'options': f"-c search_path={schema} -c enable_seqscan=off"},
+                                  {'retries': 0})
+    try:
+        assert migrations.migrate(db) == [version for version, _, _ in migrations.MIGRATIONS]
+        assert migrations.migrate(db) == []
+        yield db
+    finally:
+        db.disconnect()
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class TestQueryPlans:
+    """EXPLAIN всех запросов DatabaseManager на схеме после миграций.
+
+    Нужна тестовая база PostgreSQL: KJ_TEST_DSN="dbname=kj_test user=postgres ...".
+    Таблицы создаются во временной схеме, последовательное чтение отключено
+    (enable_seqscan=off), поэтому Seq Scan в плане означает, что подходящего индекса нет.
+    """
+
+    # Вызов -> индексы, которые должны быть в планах его запросов
+    QUERIES = {
+        'create_note': (lambda db: db.create_note("Конспект", "Python", "a.md", "текст"), set()),
+        'get_note': (lambda db: db.get_note(1), {'notes_pkey'}),
+        'update_note': (lambda db: db.update_note(1, "Конспект", "SQL", "новый текст"), {'notes_pkey'}),
+        'delete_note': (lambda db: db.delete_note(1), {'notes_pkey'}),
+        'get_all_notes': (lambda db: db.get_all_notes(), {'idx_notes_updated_at'}),
+        'get_recent_notes': (lambda db: db.get_recent_notes(5), {'idx_notes_updated_at'}),
+        'add_tag': (lambda db: db.add_tag(1, "тег"), {'tags_name_key'}),
+        'get_note_tags': (lambda db: db.get_note_tags(1), {'note_tags_pkey'}),
+        'remove_tag': (lambda db: db.remove_tag(1, "тег"), {'note_tags_pkey', 'tags_name_key'}),
+        'get_notes_by_category': (lambda db: db.get_notes_by_category(), {'idx_notes_category'}),
+        'get_top_tags': (lambda db: db.get_top_tags(5), set()),
+        'get_dashboard_stats': (lambda db: (db.invalidate_stats(), db.get_dashboard_stats()),
+                                {'idx_activity_log_event_date'}),
+        'search_notes': (lambda db: db.search_notes("индексы запросов"), {'idx_notes_search'}),
+    }
+
+    # Однократная загрузка текста старых конспектов читает всю таблицу
+    SEQ_SCAN_ALLOWED = {'reindex_notes': (lambda db: db.reindex_notes(lambda path: ""), {'notes'})}
+
+    def explain(self, db, call):
+        """Планы всех запросов, которые выполняет call(db)"""
+        queries = []
+        execute_query = db.execute_query
+
+        def record(query, params=None, fetch=False):
+            queries.append((query, params))
+            return execute_query(query, params, fetch)
+
+        with patch.object(db, 'execute_query', side_effect=record):
+            call(db)
+        assert queries
+
+        plans = []
+        with db.connection() as conn:
+            with conn.cursor() as cursor:
+                for query, params in queries:
+                    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+                    plans.append(cursor.fetchone()[0][0]['Plan'])
+            conn.rollback()
+        return [node for plan in plans for node in plan_nodes(plan)]
+
+    @pytest.mark.parametrize('name', QUERIES)
+    def test_queries_use_indexes(self, pg_db, name):
+        call, indexes = self.QUERIES[name]
+        nodes = self.explain(pg_db, call)
+        assert [node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'] == []
+        assert indexes <= {node.get('Index Name') for node in nodes}
+
+    @pytest.mark.parametrize('name', SEQ_SCAN_ALLOWED)
+    def test_allowed_seq_scans(self, pg_db, name):
+        call, tables = self.SEQ_SCAN_ALLOWED[name]
+        nodes = self.explain(pg_db, call)
+        assert {node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'} <= tables
+
+    def test_activity_log_insert(self, pg_db):
+        """Пакетная запись журнала находит конспекты по первичному ключу"""
+        from datetime import datetime
+        from src.database import ActivityLogWriter
+
+        with pg_db.connection() as conn:
+            with conn.cursor() as cursor:
+                values = cursor.mogrify(ActivityLogWriter.TEMPLATE, (1, 'VIEW', datetime.now())).decode()
+                cursor.execute("EXPLAIN (FORMAT JSON) " + ActivityLogWriter.INSERT_QUERY.replace('%s', values))
+                nodes = list(plan_nodes(cursor.fetchone()[0][0]['Plan']))
+            conn.rollback()
+        assert 'notes_pkey' in {node.get('Index Name') for node in nodes}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file